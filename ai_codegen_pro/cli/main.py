@@ -1,15 +1,23 @@
 """CLI Interface für AI CodeGen Pro"""
 
 import argparse
+import signal
 import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
 
+from ..core.cancellation import CancellationToken, CancelledError
+from ..core.model_catalog import FALLBACK_MODEL_IDS, ModelCatalog
 from ..core.openrouter_client import OpenRouterClient
+from ..core.response_cache import ResponseCache
 from ..core.template_service import TemplateService
 from ..utils.logger_service import LoggerService
 from ..utils.settings_service import SettingsService
 
+T = TypeVar("T")
+
 
 class CLIInterface:
     """Command Line Interface für AI CodeGen Pro"""
@@ -45,6 +53,18 @@ class CLIInterface:
 
         parser.add_argument("--verbose", "-v", action="store_true", help="Detaillierte Ausgabe")
 
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Generierten Code während der Generierung ausgeben",
+        )
+
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Antwort-Cache umgehen und frische Ausgabe erzwingen",
+        )
+
         parser.add_argument(
             "--list-templates",
             action="store_true",
@@ -94,14 +114,17 @@ class CLIInterface:
 
     def _list_models(self) -> int:
         """Models auflisten"""
+        api_key = self.settings.get("api_key")
+        catalog = ModelCatalog(OpenRouterClient(api_key) if api_key else None)
+        catalog.load_cached()
+        catalog.refresh()
+
         models = [
-            "openai/gpt-4-turbo",
-            "openai/gpt-4",
-            "openai/gpt-3.5-turbo",
-            "anthropic/claude-3-opus",
-            "anthropic/claude-3-sonnet",
-            "anthropic/claude-3-haiku",
+            f"{model.id} (Kontext: {model.context_length})"
+            for model in sorted(catalog.models(), key=lambda m: m.id)
         ]
+        if not models:
+            models = list(FALLBACK_MODEL_IDS)
         print("Verfügbare Models:")
         for model in models:
             print(f"  - {model}")
@@ -114,32 +137,120 @@ class CLIInterface:
             print("Fehler: API Key erforderlich")
             return 1
 
+        token = CancellationToken()
         try:
-            client = OpenRouterClient(api_key)
+            client = OpenRouterClient(api_key, cache=ResponseCache())
 
             system_prompt = args.system_prompt or (
                 "Du bist ein erfahrener Software-Entwickler. "
                 "Erstelle sauberen, gut dokumentierten Code."
             )
 
-            result = client.generate_code(
-                model=args.model, prompt=args.prompt, system_prompt=system_prompt
-            )
+            with cancel_on_sigint(token):
+                if args.stream:
+                    result = self._stream_code(client, args, system_prompt, token)
+                else:
+                    result = run_cancellable(
+                        token,
+                        lambda: client.generate_code(
+                            model=args.model,
+                            prompt=args.prompt,
+                            system_prompt=system_prompt,
+                            use_cache=not args.no_cache,
+                            cancel_token=token,
+                        ),
+                    )
 
             if args.output:
                 args.output.parent.mkdir(parents=True, exist_ok=True)
                 with open(args.output, "w", encoding="utf-8") as f:
                     f.write(result)
                 print(f"Code gespeichert: {args.output}")
-            else:
+            elif not args.stream:
                 print(result)
 
-            return 0
+            return 130 if token.cancelled else 0
 
+        except CancelledError:
+            print("\nAbgebrochen durch Benutzer", file=sys.stderr)
+            return 130
         except Exception as e:
             print(f"Generierung fehlgeschlagen: {e}")
             return 1
 
+    def _stream_code(
+        self,
+        client: OpenRouterClient,
+        args,
+        system_prompt: str,
+        token: Optional[CancellationToken] = None,
+    ) -> str:
+        """Code streamen und Teilstücke sofort ausgeben
+
+        Bei Abbruch wird der bis dahin empfangene Code zurückgegeben.
+        """
+        parts = []
+        with client.generate_code_stream(
+            model=args.model, prompt=args.prompt, system_prompt=system_prompt, cancel_token=token
+        ) as stream:
+            try:
+                for delta in stream:
+                    parts.append(delta)
+                    if not args.output:
+                        print(delta, end="", flush=True)
+            except CancelledError:
+                print("\nAbgebrochen, Teilergebnis wird verwendet", file=sys.stderr)
+
+        if not args.output:
+            print()
+        if args.verbose and stream.usage:
+            print(f"Tokens: {stream.usage.get('total_tokens', '?')}", file=sys.stderr)
+        return "".join(parts)
+
+
+@contextmanager
+def cancel_on_sigint(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Erstes Ctrl+C bricht ``token`` ab, ein zweites beendet sofort"""
+    if threading.current_thread() is not threading.main_thread():
+        yield token
+        return
+
+    def handle(signum, frame):
+        if token.cancelled:
+            raise KeyboardInterrupt
+        print("\nBreche ab... (erneut Ctrl+C zum sofortigen Beenden)", file=sys.stderr)
+        token.cancel("Abgebrochen durch Benutzer")
+
+    previous = signal.signal(signal.SIGINT, handle)
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+def run_cancellable(token: CancellationToken, call: Callable[[], T]) -> T:
+    """``call`` im Hintergrund ausführen, bei Abbruch sofort ``CancelledError`` werfen
+
+    So bleibt der Haupt-Thread für Ctrl+C ansprechbar, auch während eine Anfrage
+    noch auf die Antwort-Header wartet.
+    """
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome["result"] = call()
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    worker = threading.Thread(target=target, name="cli-request", daemon=True)
+    worker.start()
+    while worker.is_alive():
+        if token.wait(0.1):
+            raise CancelledError(token.reason)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
 
 def main():
     """CLI Hauptfunktion"""
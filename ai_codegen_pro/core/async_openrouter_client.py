@@ -0,0 +1,433 @@
+"""
+Asyncio-native OpenRouter API client with a pooled keep-alive transport.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.http_transport import RETRY_STATUSES, get_shared_transport
+from ai_codegen_pro.core.openrouter_client import (
+    AsyncCompletionStream,
+    CompletionResult,
+    OpenRouterClient,
+    OpenRouterError,
+    RateLimitError,
+    SSEDecoder,
+    build_chat_payload,
+    format_http_error,
+)
+from ai_codegen_pro.core.rate_limiter import (
+    RateLimiter,
+    estimate_request_tokens,
+    parse_retry_after,
+)
+from ai_codegen_pro.core.response_cache import request_key
+from ai_codegen_pro.core.single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _interrupt_on_cancel(cancel_token: Optional[CancellationToken]) -> Iterator[None]:
+    """Cancel the running task if ``cancel_token`` fires while it is inside the block.
+
+    Tokens are cancelled from any thread, so the interrupt is handed to the event
+    loop and only delivered while the block is still active.
+    """
+    if cancel_token is None:
+        yield
+        return
+    cancel_token.raise_if_cancelled()
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    active = True
+
+    def interrupt() -> None:
+        if active:
+            task.cancel()
+
+    handle = cancel_token.on_cancel(lambda: loop.call_soon_threadsafe(interrupt))
+    try:
+        yield
+    except asyncio.CancelledError:
+        if cancel_token.cancelled:
+            raise CancelledError(cancel_token.reason) from None
+        raise
+    finally:
+        active = False
+        cancel_token.remove_callback(handle)
+
+
+def _wrap_error(exc: Exception) -> OpenRouterError:
+    """Translate an httpx exception into the OpenRouterError used by the sync client."""
+    if isinstance(exc, httpx.TimeoutException):
+        return OpenRouterError("Request timed out")
+    if isinstance(exc, httpx.TransportError):
+        return OpenRouterError("Connection error")
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            error_data = exc.response.json()
+        except Exception:
+            error_data = None
+        return OpenRouterError(format_http_error(exc.response.status_code, error_data))
+    return OpenRouterError(f"Unexpected error: {str(exc)}")
+
+
+class AsyncOpenRouterClient:
+    """Async OpenRouter client sharing one connection pool across all requests.
+
+    ``max_concurrency`` bounds the number of in-flight requests issued through this
+    client; callers beyond the limit wait on a semaphore instead of opening new
+    connections. Use it as an async context manager or call ``aclose`` when done.
+
+    Throttling follows the sync transport: requests pass the same ``RateLimiter``
+    (by default the one installed on the shared ``HTTPTransport``), 429 responses
+    are retried after ``Retry-After`` and 5xx responses with exponential backoff.
+    """
+
+    BASE_URL = OpenRouterClient.BASE_URL
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 30,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: Optional[int] = None,
+        max_rate_limit_retries: Optional[int] = None,
+    ):
+        shared = get_shared_transport()
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.rate_limiter = shared.rate_limiter if rate_limiter is None else rate_limiter
+        self.max_retries = shared.max_retries if max_retries is None else max_retries
+        self.max_rate_limit_retries = (
+            shared.max_rate_limit_retries
+            if max_rate_limit_retries is None
+            else max_rate_limit_retries
+        )
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.single_flight = AsyncSingleFlight()
+
+    async def __aenter__(self) -> "AsyncOpenRouterClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client lazily so it binds to the running event loop."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "X-Title": "AI CodeGen Pro",
+                },
+                limits=self._limits,
+                timeout=self.timeout,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    def _request_timeout(
+        self, timeout: Optional[float], cancel_token: Optional[CancellationToken]
+    ) -> float:
+        """Per-request timeout, capped by the token's deadline."""
+        request_timeout = self.timeout if timeout is None else timeout
+        remaining = cancel_token.remaining() if cancel_token is not None else None
+        if remaining is not None:
+            request_timeout = max(0.001, min(request_timeout, remaining))
+        return request_timeout
+
+    async def _acquire(self, model: str, tokens: int) -> None:
+        """Wait for the rate limiter on a worker thread, keeping the event loop free."""
+        waiter = CancellationToken()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                None, self.rate_limiter.acquire, self.api_key, model, tokens, waiter
+            )
+        except asyncio.CancelledError:
+            waiter.cancel("request abandoned")
+            raise
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        payload: Optional[Dict[str, object]],
+        timeout: float,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Send a request, retrying throttled (429) and failed (5xx) attempts.
+
+        Chat requests (those with a payload) pass the rate limiter first. Once the
+        retries run out the last response is returned for the caller to raise.
+        """
+        client = self._get_client()
+        model = str(payload.get("model") or "") if payload else ""
+        tokens = estimate_request_tokens(payload) if payload else 0
+        throttled = failed = 0
+        while True:
+            if payload is not None and self.rate_limiter is not None:
+                await self._acquire(model, tokens)
+            request = client.build_request(method, f"/{endpoint}", json=payload, timeout=timeout)
+            response = await client.send(request, stream=stream)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_headers(self.api_key, model, response.headers)
+
+            if response.status_code == 429 and throttled < self.max_rate_limit_retries:
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = float(2**throttled)
+                throttled += 1
+                logger.warning(f"Rate limited on {model or endpoint}, retrying in {delay:.1f}s")
+                if payload is not None and self.rate_limiter is not None:
+                    self.rate_limiter.penalize(self.api_key, model, delay)
+                    delay = 0.0
+            elif response.status_code in RETRY_STATUSES and failed < self.max_retries:
+                delay = float(2**failed) if failed else 0.0
+                failed += 1
+                logger.warning(f"HTTP {response.status_code} from {endpoint}, retrying")
+            else:
+                return response
+
+            await response.aclose()
+            if delay:
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response) -> None:
+        if response.status_code == 429:
+            await response.aclose()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise RateLimitError("HTTP 429: Rate limit exceeded", retry_after)
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        payload: Optional[Dict[str, object]] = None,
+        timeout: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, object]:
+        """Make an authenticated request within the concurrency and rate limits.
+
+        Cancelling ``cancel_token`` abandons the request with ``CancelledError``.
+        """
+        self._get_client()
+        request_timeout = self._request_timeout(timeout, cancel_token)
+
+        async with self._semaphore:
+            try:
+                with _interrupt_on_cancel(cancel_token):
+                    response = await self._send(method, endpoint, payload, request_timeout)
+                    await self._raise_for_status(response)
+                return response.json()
+            except (OpenRouterError, CancelledError):
+                raise
+            except Exception as exc:
+                raise _wrap_error(exc) from exc
+
+    async def _stream_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, object],
+        timeout: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> AsyncIterator[str]:
+        """Make a streaming request, yielding server-sent-event data within the limit."""
+        self._get_client()
+        request_timeout = self._request_timeout(timeout, cancel_token)
+        decoder = SSEDecoder()
+
+        async with self._semaphore:
+            try:
+                with _interrupt_on_cancel(cancel_token):
+                    response = await self._send(
+                        "POST", endpoint, payload, request_timeout, stream=True
+                    )
+                try:
+                    with _interrupt_on_cancel(cancel_token):
+                        await self._raise_for_status(response)
+                    lines = response.aiter_lines()
+                    while True:
+                        # Interrupt only while reading, never while the caller holds a delta.
+                        with _interrupt_on_cancel(cancel_token):
+                            try:
+                                line = await lines.__anext__()
+                            except StopAsyncIteration:
+                                break
+                        data = decoder.feed(line)
+                        if data is not None:
+                            yield data
+                        if decoder.done:
+                            return
+                    data = decoder.flush()
+                    if data is not None:
+                        yield data
+                finally:
+                    await response.aclose()
+            except (OpenRouterError, CancelledError):
+                raise
+            except Exception as exc:
+                raise _wrap_error(exc) from exc
+
+    async def generate_code(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        timeout: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> str:
+        """Generate code using specified model."""
+        completion = await self.generate_completion(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            timeout,
+            system_prompt,
+            prompt_prefix,
+            cancel_token,
+        )
+        return completion.content
+
+    async def generate_completion(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        timeout: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> CompletionResult:
+        """Generate code and return it with token usage, latency and serving model.
+
+        Identical concurrent requests share one upstream call; if its caller cancels
+        it, the others run it again under their own tokens.
+        """
+        payload = build_chat_payload(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+
+        start = time.monotonic()
+        while True:
+            try:
+                response = await self.single_flight.do(
+                    request_key(payload),
+                    lambda: self._fetch_completion(payload, timeout, cancel_token),
+                )
+            except CancelledError:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise
+                logger.debug(f"Shared request for {model} was cancelled, retrying")
+                continue
+            break
+        completion = CompletionResult.from_response(response, model, time.monotonic() - start)
+        logger.info(f"Generated {len(completion.content)} characters of code")
+        return completion
+
+    async def _fetch_completion(
+        self,
+        payload: Dict[str, object],
+        timeout: Optional[float],
+        cancel_token: Optional[CancellationToken],
+    ) -> Dict[str, object]:
+        logger.info(f"Generating code with model: {payload['model']}")
+        response = await self._request(
+            "POST", "chat/completions", payload, timeout=timeout, cancel_token=cancel_token
+        )
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if self.rate_limiter is not None and isinstance(usage, dict):
+            charged = estimate_request_tokens(payload)
+            self.rate_limiter.record_usage(
+                self.api_key, str(payload["model"]), int(usage.get("total_tokens", 0)) - charged
+            )
+        return response
+
+    def generate_code_stream(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        timeout: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> AsyncCompletionStream:
+        """Stream generated code as text deltas; iterate with ``async for``.
+
+        Cancelling ``cancel_token`` stops the read; iteration then raises
+        ``CancelledError``.
+        """
+        payload = build_chat_payload(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            stream=True,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+
+        logger.info(f"Streaming code with model: {model}")
+        return AsyncCompletionStream(
+            self._stream_request("chat/completions", payload, timeout, cancel_token)
+        )
+
+    async def get_available_models(self) -> List[Dict[str, object]]:
+        """Get list of available models."""
+        try:
+            response = await self._request("GET", "models")
+            return response.get("data", [])
+        except Exception as exc:
+            logger.error(f"Failed to fetch models: {exc}")
+            return []
+
+    async def check_connection(self) -> bool:
+        """Test API connectivity."""
+        try:
+            await self.get_available_models()
+            return True
+        except Exception:
+            return False
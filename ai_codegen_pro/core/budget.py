@@ -0,0 +1,154 @@
+"""
+Spending limits for a generation run: tokens, cost and requests.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+from ai_codegen_pro.core.model_catalog import ModelCatalog
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of sending a request the budget cannot cover."""
+
+    pass
+
+
+@dataclass
+class Reservation:
+    model: str
+    tokens: int
+    cost: float
+
+
+@dataclass
+class BudgetUsage:
+    tokens: int = 0
+    cost: float = 0.0
+    requests: int = 0
+
+
+class GenerationBudget:
+    """Reserve-then-reconcile accounting against optional hard limits.
+
+    Before each request the caller reserves its locally estimated prompt tokens
+    plus ``max_tokens`` for the completion; the reservation counts against the
+    limits until it is reconciled with the reported usage or released. A request
+    that only fits once other open reservations are settled waits for them. A
+    request that would exceed a limit on the actual spend alone is refused; the
+    budget is then exhausted and refuses every further one, so no new work starts
+    while requests already in flight still complete.
+
+    Prices (per token, as in the OpenRouter catalog) come from ``prices`` or
+    ``catalog``; a model without a known price counts as free toward ``max_cost``.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        prices: Optional[Mapping[str, Tuple[float, float]]] = None,
+        catalog: Optional[ModelCatalog] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_requests = max_requests
+        self.prices = dict(prices or {})
+        self.catalog = catalog
+        self.spent = BudgetUsage()
+        self.reserved = BudgetUsage()
+        self.exhausted_reason = ""
+        self._lock = threading.Condition()
+        self._unpriced = set()
+
+    @property
+    def exhausted(self) -> bool:
+        return bool(self.exhausted_reason)
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self._price(model)
+        return prompt_tokens * prompt_price + completion_tokens * completion_price
+
+    def _price(self, model: str) -> Tuple[float, float]:
+        if model in self.prices:
+            return self.prices[model]
+        info = self.catalog.get(model) if self.catalog is not None else None
+        if info is not None:
+            return info.prompt_price, info.completion_price
+        if self.max_cost is not None and model not in self._unpriced:
+            self._unpriced.add(model)
+            logger.warning(f"No price known for {model}; its cost is not counted")
+        return 0.0, 0.0
+
+    def reserve(self, model: str, prompt_tokens: int, max_tokens: int) -> Reservation:
+        """Reserve one request of up to ``prompt_tokens + max_tokens`` tokens.
+
+        Blocks while the reservation fits the spend so far but not together with
+        the open reservations. Raises ``BudgetExceededError`` if it would exceed a
+        limit even after they are settled.
+        """
+        reservation = Reservation(
+            model, prompt_tokens + max_tokens, self.cost(model, prompt_tokens, max_tokens)
+        )
+        with self._lock:
+            while True:
+                if not self.exhausted_reason:
+                    self.exhausted_reason = self._overrun(reservation, self.spent)
+                    if self.exhausted_reason:
+                        logger.warning(f"Budget exhausted: {self.exhausted_reason}")
+                if self.exhausted_reason:
+                    raise BudgetExceededError(self.exhausted_reason)
+                if not self._overrun(reservation, self._committed()):
+                    break
+                logger.debug(f"Waiting for {self.reserved.requests} open reservations")
+                self._lock.wait()
+            self.reserved.tokens += reservation.tokens
+            self.reserved.cost += reservation.cost
+            self.reserved.requests += 1
+        return reservation
+
+    def _committed(self) -> BudgetUsage:
+        """Spend plus open reservations."""
+        return BudgetUsage(
+            self.spent.tokens + self.reserved.tokens,
+            self.spent.cost + self.reserved.cost,
+            self.spent.requests + self.reserved.requests,
+        )
+
+    def _overrun(self, reservation: Reservation, usage: BudgetUsage) -> str:
+        tokens = usage.tokens + reservation.tokens
+        if self.max_tokens is not None and tokens > self.max_tokens:
+            return f"{tokens} tokens would exceed the limit of {self.max_tokens}"
+        cost = usage.cost + reservation.cost
+        if self.max_cost is not None and cost > self.max_cost:
+            return f"cost {cost:.4f} would exceed the limit of {self.max_cost:.4f}"
+        requests = usage.requests + 1
+        if self.max_requests is not None and requests > self.max_requests:
+            return f"{requests} requests would exceed the limit of {self.max_requests}"
+        return ""
+
+    def reconcile(self, reservation: Reservation, prompt_tokens: int, completion_tokens: int):
+        """Replace ``reservation`` with the usage the request actually incurred."""
+        cost = self.cost(reservation.model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self._unreserve(reservation)
+            self.spent.tokens += prompt_tokens + completion_tokens
+            self.spent.cost += cost
+            self.spent.requests += 1
+            self._lock.notify_all()
+
+    def release(self, reservation: Reservation) -> None:
+        """Drop a reservation whose request was never billed (failed or served from cache)."""
+        with self._lock:
+            self._unreserve(reservation)
+            self._lock.notify_all()
+
+    def _unreserve(self, reservation: Reservation) -> None:
+        self.reserved.tokens -= reservation.tokens
+        self.reserved.cost -= reservation.cost
+        self.reserved.requests -= 1
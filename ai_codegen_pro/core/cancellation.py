@@ -0,0 +1,111 @@
+"""
+Cooperative cancellation with an optional deadline, shared by generator and clients.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CancelledError(Exception):
+    """Raised when work is abandoned because its cancellation token fired."""
+
+    pass
+
+
+class CancellationToken:
+    """Thread-safe flag set by ``cancel()`` or, with ``timeout``, by its deadline.
+
+    Callbacks registered with ``on_cancel`` run once, on the thread that cancels;
+    clients use them to abort open connections. Cancelling a ``parent`` token
+    cancels this one too.
+    """
+
+    def __init__(
+        self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None
+    ):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_handle = 0
+        self.reason = ""
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._timer: Optional[threading.Timer] = None
+        if timeout is not None:
+            self._timer = threading.Timer(max(0.0, timeout), self.cancel, ("deadline exceeded",))
+            self._timer.daemon = True
+            self._timer.start()
+        self._parent = parent
+        self._parent_handle = None
+        if parent is not None:
+            if parent.deadline is not None and (
+                self.deadline is None or parent.deadline < self.deadline
+            ):
+                self.deadline = parent.deadline
+            self._parent_handle = parent.on_cancel(lambda: self.cancel(parent.reason))
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None:
+            if time.monotonic() >= self.deadline:
+                self.cancel("deadline exceeded")
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+        logger.info(f"Cancellation requested: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                logger.warning(f"Cancellation callback failed: {exc}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> int:
+        """Run ``callback`` on cancellation (at once if already cancelled).
+
+        Returns a handle for ``remove_callback``.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                handle = self._next_handle
+                self._next_handle += 1
+                self._callbacks[handle] = callback
+                return handle
+        callback()
+        return -1
+
+    def remove_callback(self, handle: int) -> None:
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to ``timeout`` seconds; True if cancelled in the meantime."""
+        return self._event.wait(timeout)
+
+    def close(self) -> None:
+        """Stop the deadline timer and detach from the parent once the work is done."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._parent is not None and self._parent_handle is not None:
+            self._parent.remove_callback(self._parent_handle)
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise CancelledError(self.reason)
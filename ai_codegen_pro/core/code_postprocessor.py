@@ -0,0 +1,265 @@
+"""
+Single-pass post-processing of generated code: fences, imports/body split, language.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "js": "javascript",
+    "node": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "docker": "dockerfile",
+    "md": "markdown",
+}
+
+# Checked against the first code lines until one matches.
+_LANGUAGE_PATTERNS = [
+    (re.compile(r"#!.*\bpython"), "python"),
+    (re.compile(r"#!.*\b(ba|z)?sh\b"), "bash"),
+    (re.compile(r"#!.*\bnode\b"), "javascript"),
+    (re.compile(r"package\s+\w+\s*$"), "go"),
+    (re.compile(r"FROM\s+\S+"), "dockerfile"),
+    (re.compile(r"import\s.+\sfrom\s+['\"]"), "javascript"),
+    (re.compile(r"(const|let|var)\s+\w+\s*=\s*require\("), "javascript"),
+    (re.compile(r"from\s+[\w.]+\s+import\s"), "python"),
+    (re.compile(r"import\s+[\w.]+(\s*,\s*[\w.]+)*(\s+as\s+\w+)?\s*$"), "python"),
+    (re.compile(r"(async\s+)?def\s+\w+\(|class\s+\w+.*:\s*$"), "python"),
+]
+_DETECTION_LINES = 20
+_DOCSTRING = re.compile(r"[rRuUbB]{0,2}(\"\"\"|''')")
+# Shebang and PEP 263 encoding declaration, valid only on the first two lines.
+_MAGIC_COMMENT = re.compile(r"#!|[ \t\f]*#.*?coding[:=]")
+
+
+def normalize_language(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    name = name.strip().lower()
+    return LANGUAGE_ALIASES.get(name, name) or None
+
+
+@dataclass
+class ProcessedCode:
+    code: str
+    imports: str
+    body: str
+    language: Optional[str]
+    fenced: bool = False
+    docstring: str = ""  # module docstring text, without its quotes
+    preamble: str = ""  # shebang, encoding line and comments at the top of the file
+
+
+class CodePostProcessor:
+    """Incremental, line-oriented post-processor for model output.
+
+    ``feed`` accepts arbitrary chunks and handles every complete line exactly once;
+    ``finish`` handles the remainder and returns the result. Markdown fences are
+    removed, and when the output has fences any prose outside them is dropped.
+
+    Every kept line is stored once, in one of four consecutive sections: leading
+    comments, the module docstring, the import block (parenthesized and backslash
+    continued imports included, with the comments and blank lines between them)
+    and the body, which keeps the blank lines that separate it from the imports.
+    Without a docstring, the leading comments end at the last blank line before
+    the first import or statement; shebang and encoding lines always belong there.
+    ``code`` is those sections joined back together. Languages other than Python
+    have everything in the body.
+    """
+
+    def __init__(self, language: Optional[str] = None):
+        self.hint = normalize_language(language)
+        self._partial: List[str] = []
+        self._fenced = False
+        self._in_fence = False
+        self._fence_language: Optional[str] = None
+        self._reset_output()
+
+    def _reset_output(self) -> None:
+        self._preamble: List[str] = []
+        self._docstring: List[str] = []
+        self._imports: List[str] = []
+        self._body: List[str] = []
+        self._pending: List[str] = []
+        self._in_body = False
+        self._docstring_quote: Optional[str] = None
+        self._import_depth = 0
+        self._continued = False
+        self._detected: Optional[str] = None
+        self._detection_lines = 0
+
+    @property
+    def language(self) -> Optional[str]:
+        return self._fence_language or self.hint or self._detected
+
+    def feed(self, chunk: str) -> None:
+        start = 0
+        newline = chunk.find("\n")
+        while newline != -1:
+            if self._partial:
+                self._partial.append(chunk[start:newline])
+                line = "".join(self._partial)
+                self._partial = []
+            else:
+                line = chunk[start:newline]
+            self._line(line)
+            start = newline + 1
+            newline = chunk.find("\n", start)
+        if start < len(chunk):
+            self._partial.append(chunk[start:])
+
+    def finish(self) -> ProcessedCode:
+        # Fenced code always ends with a newline; unfenced code keeps its own ending.
+        terminator = "\n"
+        if self._partial:
+            line = "".join(self._partial)
+            self._partial = []
+            self._line(line)
+            if not self._fenced:
+                terminator = ""
+        if not self._in_body:
+            self._start_body()
+        sections = (self._preamble, self._docstring, self._imports, self._body)
+        code = "\n".join(line for section in sections for line in section)
+        return ProcessedCode(
+            code=code + terminator if code else "",
+            imports=_join_trimmed(self._imports),
+            body="\n".join(self._body) + terminator if self._body else "",
+            language=self.language,
+            fenced=self._fenced,
+            docstring=_docstring_text(self._docstring),
+            preamble=_join_trimmed(self._preamble),
+        )
+
+    def _line(self, line: str) -> None:
+        if line.lstrip().startswith("```"):
+            if self._in_fence:
+                self._in_fence = False
+            else:
+                if not self._fenced:
+                    # Anything before the first fence was prose, not code.
+                    self._fenced = True
+                    self._reset_output()
+                self._in_fence = True
+                info = line.lstrip()[3:].strip().split()
+                if info and self._fence_language is None:
+                    self._fence_language = normalize_language(info[0])
+            return
+        if self._fenced and not self._in_fence:
+            return  # prose between or after fenced blocks
+
+        if self._detected is None and self._detection_lines < _DETECTION_LINES and line.strip():
+            self._detection_lines += 1
+            for pattern, language in _LANGUAGE_PATTERNS:
+                if pattern.match(line.strip()):
+                    self._detected = language
+                    break
+        if self._in_body:
+            self._body.append(line)
+        elif self.language not in (None, "python"):
+            self._start_body()
+            self._body.append(line)
+        else:
+            self._header_line(line)
+
+    def _header_line(self, line: str) -> None:
+        """Classify a line of the header (docstring and imports) of a Python module."""
+        stripped = line.strip()
+        if self._import_depth > 0 or self._continued:
+            self._imports.append(line)
+            self._track_import(line)
+        elif self._docstring_quote is not None:
+            self._docstring.append(line)
+            if self._docstring_quote in line:
+                self._docstring_quote = None
+        elif not stripped or stripped.startswith("#"):
+            self._pending.append(line)
+        elif line.startswith(("import ", "from ")):
+            self._take_preamble()
+            self._imports.extend(self._pending)
+            self._pending = []
+            self._imports.append(line)
+            self._track_import(line)
+        elif not self._docstring and not self._imports and _DOCSTRING.match(stripped):
+            quote = _DOCSTRING.match(stripped).group(1)
+            self._preamble.extend(self._pending)
+            self._pending = []
+            self._docstring.append(line)
+            if stripped.count(quote) < 2:
+                self._docstring_quote = quote
+        else:
+            self._take_preamble()
+            self._start_body()
+            self._body.append(line)
+
+    def _take_preamble(self) -> None:
+        """Move the top-of-file comments from the pending lines to the preamble."""
+        if self._docstring or self._imports:
+            return
+        split = 0
+        for index, line in enumerate(self._pending):
+            if not line.strip():
+                split = index + 1
+            elif index == split and index < 2 and _MAGIC_COMMENT.match(line):
+                split = index + 1
+        self._preamble.extend(self._pending[:split])
+        del self._pending[:split]
+
+    def _start_body(self) -> None:
+        self._in_body = True
+        self._body.extend(self._pending)
+        self._pending = []
+
+    def _track_import(self, line: str) -> None:
+        """Update the open-parenthesis count and backslash continuation of an import."""
+        quote = None
+        for char in line:
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif char == "#":
+                break
+            elif char == "(":
+                self._import_depth += 1
+            elif char == ")":
+                self._import_depth = max(0, self._import_depth - 1)
+        self._continued = line.rstrip().endswith("\\")
+
+
+def _join_trimmed(lines: List[str]) -> str:
+    """``lines`` joined, without leading and trailing blank lines."""
+    start, end = 0, len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return "\n".join(lines[start:end])
+
+
+def _docstring_text(lines: List[str]) -> str:
+    if not lines:
+        return ""
+    text = "\n".join(lines).strip()
+    match = _DOCSTRING.match(text)
+    quote = match.group(1)
+    text = text[match.end() :]
+    return text[: -len(quote)] if text.endswith(quote) else text
+
+
+def process_code(text: str, language: Optional[str] = None) -> ProcessedCode:
+    """Post-process a complete model output in one pass."""
+    processor = CodePostProcessor(language)
+    processor.feed(text)
+    return processor.finish()
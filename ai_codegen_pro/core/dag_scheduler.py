@@ -0,0 +1,200 @@
+"""
+Dependency-aware scheduler: runs a DAG of tasks with maximal parallelism.
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class CycleError(ValueError):
+    """Raised when the dependency graph contains a cycle."""
+
+    def __init__(self, cycle: Sequence[Hashable]):
+        self.cycle = list(cycle)
+        super().__init__("Dependency cycle: " + " -> ".join(str(node) for node in self.cycle))
+
+
+class DependencyFailedError(Exception):
+    """Outcome of a node skipped because one of its dependencies failed."""
+
+    def __init__(self, node: Hashable, dependency: Hashable):
+        self.node = node
+        self.dependency = dependency
+        super().__init__(f"Skipped {node}: dependency {dependency} failed")
+
+
+def topological_order(dependencies: Mapping[K, Sequence[K]]) -> List[K]:
+    """Order nodes so every node comes after its dependencies.
+
+    Independent nodes keep their mapping order. Raises ``KeyError`` for a
+    dependency that is not a node and ``CycleError`` for a cycle.
+    """
+    for node, deps in dependencies.items():
+        for dep in deps:
+            if dep not in dependencies:
+                raise KeyError(f"{node} depends on unknown node {dep}")
+
+    order: List[K] = []
+    state: Dict[K, int] = {}  # 1 = on the current path, 2 = done
+    for root in dependencies:
+        if state.get(root):
+            continue
+        path = [root]
+        stack = [iter(dependencies[root])]
+        state[root] = 1
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                stack.pop()
+                node = path.pop()
+                state[node] = 2
+                order.append(node)
+            elif state.get(dep) == 1:
+                raise CycleError(path[path.index(dep) :] + [dep])
+            elif not state.get(dep):
+                state[dep] = 1
+                path.append(dep)
+                stack.append(iter(dependencies[dep]))
+    return order
+
+
+class DAGScheduler(Generic[K, T]):
+    """Run ``task(node, upstream)`` for every node of a dependency graph.
+
+    A node starts as soon as all of its dependencies have succeeded; ``upstream``
+    maps each direct dependency to its result. Nodes whose dependencies failed are
+    not run and get a ``DependencyFailedError`` outcome. The graph is validated
+    before anything runs.
+    """
+
+    def __init__(self, max_workers: int = 1, thread_name_prefix: str = "dag"):
+        self.max_workers = max(1, max_workers)
+        self.thread_name_prefix = thread_name_prefix
+
+    def run(
+        self,
+        dependencies: Mapping[K, Sequence[K]],
+        task: Callable[[K, Dict[K, T]], T],
+    ) -> Dict[K, object]:
+        """Return each node's result, or the exception it raised, keyed by node."""
+        outcomes = dict(self.iter_run(dependencies, task))
+        return {node: outcomes[node] for node in dependencies}
+
+    def iter_run(
+        self,
+        dependencies: Mapping[K, Sequence[K]],
+        task: Callable[[K, Dict[K, T]], T],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Iterator[Tuple[K, object]]:
+        """Yield ``(node, outcome)`` pairs in the order the nodes finish.
+
+        The graph is validated before the first node runs. Closing the iterator
+        early stops scheduling new nodes; running ones are waited for. Once
+        ``cancel_token`` fires, every unfinished node is yielded at once with a
+        ``CancelledError`` outcome; running tasks are left to observe the token.
+        """
+        order = topological_order(dependencies)
+        outcomes: Dict[K, object] = {}
+
+        def cancelled() -> Iterator[Tuple[K, object]]:
+            for node in order:
+                if node not in outcomes:
+                    outcomes[node] = CancelledError(cancel_token.reason)
+                    yield node, outcomes[node]
+
+        if self.max_workers == 1 or len(order) <= 1:
+            for node in order:
+                if cancel_token is not None and cancel_token.cancelled:
+                    yield from cancelled()
+                    return
+                outcomes[node] = self._run_node(node, dependencies[node], outcomes, task)
+                yield node, outcomes[node]
+            return
+
+        dependents: Dict[K, List[K]] = {node: [] for node in dependencies}
+        waiting = {node: len(set(deps)) for node, deps in dependencies.items()}
+        for node, deps in dependencies.items():
+            for dep in set(deps):
+                dependents[dep].append(node)
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+        )
+        running: Dict[Future, K] = {}
+        wake: Future = Future()
+        handle = None
+        if cancel_token is not None:
+            handle = cancel_token.on_cancel(lambda: wake.done() or wake.set_result(None))
+        try:
+
+            def submit(node: K) -> None:
+                if wake.done():
+                    return
+                running[
+                    executor.submit(self._run_node, node, dependencies[node], outcomes, task)
+                ] = node
+
+            for node in order:
+                if not waiting[node]:
+                    submit(node)
+            while running:
+                done, _ = wait([*running, wake], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future is wake:
+                        continue
+                    node = running.pop(future)
+                    outcomes[node] = future.result()
+                    for dependent in dependents[node]:
+                        waiting[dependent] -= 1
+                        if not waiting[dependent]:
+                            submit(dependent)
+                    yield node, outcomes[node]
+                if wake.done():
+                    yield from cancelled()
+                    return
+        finally:
+            if handle is not None:
+                cancel_token.remove_callback(handle)
+            abandon = wake.done()
+            if abandon:
+                for future in running:
+                    future.cancel()  # only queued ones; running tasks observe the token
+            executor.shutdown(wait=not abandon)
+
+    def _run_node(
+        self,
+        node: K,
+        deps: Sequence[K],
+        outcomes: Mapping[K, object],
+        task: Callable[[K, Dict[K, T]], T],
+    ) -> object:
+        upstream: Dict[K, T] = {}
+        for dep in deps:
+            outcome = outcomes[dep]
+            if isinstance(outcome, BaseException):
+                return DependencyFailedError(node, dep)
+            upstream[dep] = outcome
+        try:
+            return task(node, upstream)
+        except Exception as exc:
+            return exc
@@ -0,0 +1,108 @@
+"""
+Append-only journal of completed components, for resuming interrupted runs.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = ".ai_codegen_journal.jsonl"
+
+
+class GenerationJournal:
+    """JSON-lines journal with one fsynced record per completed component.
+
+    Records are only ever appended, so a crash can at worst leave a truncated last
+    line, which ``load`` ignores. Each record holds the component's input hash and
+    the full generated file; a record is replayed only while the hash still matches.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "GenerationJournal":
+        journal = cls(path)
+        try:
+            with open(journal.path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                        journal.records[record["name"]] = record
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Ignoring damaged journal line {number} in {path}")
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning(f"Cannot read journal {path}: {exc}")
+        if journal.records:
+            logger.info(f"Journal {path} holds {len(journal.records)} completed components")
+        return journal
+
+    def start(self, resume: bool) -> None:
+        """Open the journal for appending; a fresh run discards previous records."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            self.records = {}
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._ends_mid_line():
+            # Terminate a line truncated by a crash so the next record starts cleanly.
+            self._file.write("\n")
+
+    def _ends_mid_line(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if not f.tell():
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False
+
+    def replay(self, name: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """The generated file recorded for ``name``, if its inputs are unchanged."""
+        with self._lock:
+            record = self.records.get(name)
+        if record is None or record.get("input_hash") != input_hash:
+            return None
+        return record.get("file")
+
+    def record(self, name: str, input_hash: str, file: Dict[str, Any]) -> None:
+        line = json.dumps(
+            {"name": name, "input_hash": input_hash, "file": file}, ensure_ascii=False
+        )
+        with self._lock:
+            self.records[name] = {"name": name, "input_hash": input_hash, "file": file}
+            if self._file is None:
+                return
+            try:
+                self._file.write(line + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as exc:
+                logger.warning(f"Failed to journal {name}: {exc}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Close and delete the journal once the run it covers has completed."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning(f"Failed to remove journal {self.path}: {exc}")
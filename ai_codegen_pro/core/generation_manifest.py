@@ -0,0 +1,146 @@
+"""
+Generation manifest: per-component input hashes for incremental regeneration.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".ai_codegen_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def component_input_hash(
+    component: Dict[str, Any],
+    prompt: str,
+    model: str,
+    template_name: Optional[str],
+    template_source: Optional[str],
+    upstream_hashes: Iterable[str] = (),
+) -> str:
+    """Hash everything that determines a component's output.
+
+    ``upstream_hashes`` are the content hashes of the files the component depends
+    on, so a change upstream invalidates its dependents.
+    """
+    data = {
+        "component": component,
+        "prompt": prompt,
+        "model": model,
+        "template": template_name,
+        "template_source": template_source,
+        "upstream": sorted(upstream_hashes),
+    }
+    encoded = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    input_hash: str
+    file: str
+    content_hash: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class GenerationManifest:
+    """Manifest stored next to the generated files.
+
+    An entry is fresh when its input hash matches and the file on disk still has
+    the content that was generated, so hand-edited or deleted files are regenerated.
+    """
+
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_dir: Union[str, Path]) -> "GenerationManifest":
+        manifest = cls(output_dir)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable manifest {manifest.path}: {exc}")
+            return manifest
+
+        if data.get("version") != MANIFEST_VERSION:
+            return manifest
+        for name, entry in data.get("components", {}).items():
+            try:
+                manifest.entries[name] = ManifestEntry(**entry)
+            except TypeError:
+                logger.warning(f"Ignoring malformed manifest entry for {name}")
+        return manifest
+
+    def fresh_content(self, name: str, input_hash: str) -> Optional[str]:
+        """Return the file content on disk if ``name`` is up to date, else None."""
+        with self._lock:
+            entry = self.entries.get(name)
+        if entry is None or entry.input_hash != input_hash:
+            return None
+        try:
+            content = (self.output_dir / entry.file).read_text(encoding="utf-8")
+        except OSError:
+            return None
+        if content_hash(content) != entry.content_hash:
+            logger.info(f"{entry.file} changed on disk, regenerating")
+            return None
+        return content
+
+    def get(self, name: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            return self.entries.get(name)
+
+    def record(
+        self,
+        name: str,
+        input_hash: str,
+        file: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        with self._lock:
+            self.entries[name] = ManifestEntry(
+                input_hash=input_hash,
+                file=file,
+                content_hash=content_hash(content),
+                metadata=dict(metadata or {}),
+            )
+
+    def retain(self, names: Iterable[str]) -> None:
+        """Drop entries for components that are no longer part of the spec."""
+        keep = set(names)
+        with self._lock:
+            self.entries = {name: e for name, e in self.entries.items() if name in keep}
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "components": {name: asdict(entry) for name, entry in self.entries.items()},
+            }
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.output_dir, prefix=".manifest-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_name, self.path)
+        except OSError as exc:
+            logger.warning(f"Failed to write manifest {self.path}: {exc}")
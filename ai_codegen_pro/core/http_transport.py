@@ -0,0 +1,242 @@
+"""
+Shared pooled HTTP transport with one retry and rate-limit policy for all providers.
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from ai_codegen_pro.core.cancellation import CancellationToken
+from ai_codegen_pro.core.rate_limiter import RateLimiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Server errors retried with exponential backoff (also by the asyncio client).
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Cancel token of the request being sent on this thread, picked up by its connection.
+_sending = threading.local()
+
+
+class _AbortableConnection:
+    """Connection mixin that shuts its socket down when the request's token fires.
+
+    This aborts a request still waiting for the response headers, which closing
+    the ``Response`` cannot do because none exists yet. Once the headers are in,
+    the caller closes the response instead.
+    """
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        self._aborted = False
+        token = getattr(_sending, "cancel_token", None)
+        self._abort_token = token
+        self._abort_handle = token.on_cancel(self._abort) if token is not None else None
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args: Any, **kwargs: Any):
+        if getattr(self, "_aborted", False):
+            self._abort()  # cancelled before the socket was connected
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            if getattr(self, "_abort_handle", None) is not None:
+                self._abort_token.remove_callback(self._abort_handle)
+                self._abort_handle = None
+
+    def _abort(self) -> None:
+        self._aborted = True
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _AbortableHTTPConnection(_AbortableConnection, HTTPConnection):
+    pass
+
+
+class _AbortableHTTPSConnection(_AbortableConnection, HTTPSConnection):
+    pass
+
+
+class _AbortableHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _AbortableHTTPConnection
+
+
+class _AbortableHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _AbortableHTTPSConnection
+
+
+class _AbortableAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connections can be aborted by a cancel token."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _AbortableHTTPConnectionPool,
+            "https": _AbortableHTTPSConnectionPool,
+        }
+
+
+class HTTPTransport:
+    """Keep-alive connection pool shared by every provider client.
+
+    Transient server errors (5xx) are retried with exponential backoff by urllib3.
+    429 responses are handled here instead: the optional rate limiter learns from
+    ``Retry-After`` and rate-limit headers, and the request is retried up to
+    ``max_rate_limit_retries`` times. If retries run out, the last 429 response is
+    returned so the caller can surface it as a provider error. Both settings are
+    defaults: clients sharing the pool can pass their own per request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        max_retries: int = 3,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: int = 3,
+    ):
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.session = self._create_session(pool_connections, pool_maxsize, max_retries)
+
+    def _create_session(
+        self, pool_connections: int, pool_maxsize: int, max_retries: int
+    ) -> requests.Session:
+        """Create session with pooled adapters and retry strategy."""
+        session = requests.Session()
+
+        retry_strategy = Retry(
+            total=max_retries,
+            # A POST that timed out mid-read may already be processed (and billed), and
+            # resending it would overrun a caller's deadline; surface the timeout instead.
+            read=0,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["HEAD", "GET", "POST"],
+            backoff_factor=1,
+            respect_retry_after_header=False,
+        )
+
+        adapter = _AbortableAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry_strategy,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    def post(
+        self,
+        url: str,
+        api_key: str = "",
+        model: str = "",
+        tokens: int = 0,
+        cancel_token: Optional[CancellationToken] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: Optional[int] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """POST within the rate limit of (``api_key``, ``model``).
+
+        With ``cancel_token``, no attempt starts after cancellation and retry waits
+        end early with ``CancelledError``. Cancelling while the request waits for
+        the response headers shuts its connection down. ``rate_limiter`` and
+        ``max_rate_limit_retries`` override the transport's defaults for this call.
+        """
+        return self._send(
+            self.session.post,
+            url,
+            api_key,
+            model,
+            tokens,
+            cancel_token,
+            self.rate_limiter if rate_limiter is None else rate_limiter,
+            (
+                self.max_rate_limit_retries
+                if max_rate_limit_retries is None
+                else max_rate_limit_retries
+            ),
+            **kwargs,
+        )
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def _send(
+        self,
+        send: Callable[..., requests.Response],
+        url: str,
+        api_key: str,
+        model: str,
+        tokens: int,
+        cancel_token: Optional[CancellationToken],
+        rate_limiter: Optional[RateLimiter],
+        max_rate_limit_retries: int,
+        **kwargs: Any,
+    ) -> requests.Response:
+        for attempt in range(max_rate_limit_retries + 1):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if rate_limiter is not None:
+                rate_limiter.acquire(api_key, model, tokens, cancel_token)
+
+            _sending.cancel_token = cancel_token
+            try:
+                response = send(url, **kwargs)
+            finally:
+                _sending.cancel_token = None
+
+            if rate_limiter is not None:
+                rate_limiter.update_from_headers(api_key, model, response.headers)
+            if response.status_code != 429 or attempt >= max_rate_limit_retries:
+                return response
+
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = float(2**attempt)
+            response.close()
+            logger.warning(f"Rate limited on {model or url}, retrying in {delay:.1f}s")
+            if rate_limiter is not None:
+                rate_limiter.penalize(api_key, model, delay)
+            elif cancel_token is not None:
+                cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_transport: Optional[HTTPTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> HTTPTransport:
+    """Return the process-wide transport, creating it on first use."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HTTPTransport()
+        return _shared_transport
+
+
+def set_shared_transport(transport: HTTPTransport) -> None:
+    """Replace the process-wide transport, e.g. to install a rate limiter."""
+    global _shared_transport
+    with _shared_lock:
+        _shared_transport = transport
@@ -0,0 +1,89 @@
+"""
+Incremental parser for a JSON array arriving in arbitrary text chunks.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class JSONArrayStreamParser:
+    """Yield the elements of a top-level JSON array as soon as each one closes.
+
+    Text before the opening ``[`` (such as a Markdown code fence) is ignored, and
+    so is everything after the closing ``]``. An element that does not decode is
+    logged and skipped without affecting its siblings.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.skipped = 0
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume ``text`` and return the elements completed by it."""
+        elements: List[Any] = []
+        for char in text:
+            if self._finished:
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                continue
+
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if char in ",]":
+                    if self._buffer:  # a scalar element
+                        self._emit(elements)
+                    self._finished = char == "]"
+                    continue
+                if char in "\r\n\t }":
+                    continue
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+            self._buffer.append(char)
+            if self._depth == 0 and char in "]}":
+                self._emit(elements)
+        return elements
+
+    def _emit(self, elements: List[Any]) -> None:
+        raw = "".join(self._buffer)
+        self._buffer = []
+        try:
+            elements.append(json.loads(raw))
+        except ValueError as exc:
+            self.skipped += 1
+            logger.warning(f"Skipping malformed array element ({exc}): {raw[:80]!r}")
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """Yield array elements from a stream of text chunks as they complete."""
+    parser = JSONArrayStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            return
@@ -0,0 +1,203 @@
+"""
+Model catalog: the OpenRouter model list cached on disk and indexed in memory.
+"""
+
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient, OpenRouterError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = Path.home() / ".ai_codegen_pro" / "cache" / "models.json"
+
+# Shown when no catalog has been cached or fetched yet (e.g. without an API key).
+FALLBACK_MODEL_IDS = [
+    "openai/gpt-4-turbo",
+    "openai/gpt-4",
+    "openai/gpt-3.5-turbo",
+    "anthropic/claude-3-opus",
+    "anthropic/claude-3-sonnet",
+    "anthropic/claude-3-haiku",
+]
+
+
+def _price(pricing: Dict[str, Any], key: str) -> float:
+    try:
+        return float(pricing.get(key) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class ModelInfo:
+    id: str
+    name: str
+    provider: str
+    context_length: int
+    prompt_price: float
+    completion_price: float
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "ModelInfo":
+        model_id = str(data.get("id", ""))
+        pricing = data.get("pricing") or {}
+        return cls(
+            id=model_id,
+            name=str(data.get("name") or model_id),
+            provider=model_id.split("/", 1)[0] if "/" in model_id else "unknown",
+            context_length=int(data.get("context_length") or 0),
+            prompt_price=_price(pricing, "prompt"),
+            completion_price=_price(pricing, "completion"),
+            raw=data,
+        )
+
+
+class _CatalogIndex:
+    """Immutable lookup structures, swapped atomically on refresh."""
+
+    def __init__(self, models: List[ModelInfo]):
+        self.models = models
+        self.by_id = {model.id: model for model in models}
+        self.by_provider: Dict[str, List[ModelInfo]] = {}
+        for model in models:
+            self.by_provider.setdefault(model.provider, []).append(model)
+        self.by_context = sorted(models, key=lambda model: model.context_length)
+        self.context_keys = [model.context_length for model in self.by_context]
+
+
+class ModelCatalog:
+    """Cached, indexed model catalog.
+
+    ``load_cached`` makes the last known catalog available instantly; ``refresh``
+    revalidates it against the API once the TTL has expired, using the stored ETag
+    so an unchanged catalog costs a 304 instead of a full download.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OpenRouterClient] = None,
+        path: Optional[Union[str, Path]] = None,
+        ttl: float = 24 * 3600,
+    ):
+        self.client = client
+        self.path = Path(path) if path else DEFAULT_CATALOG_PATH
+        self.ttl = ttl
+        self.fetched_at = 0.0
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self._index = _CatalogIndex([])
+        self._refresh_lock = threading.Lock()
+
+    def load_cached(self) -> bool:
+        """Load the catalog persisted on disk. Returns False if there is none."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable model catalog {self.path}: {exc}")
+            return False
+
+        self.fetched_at = float(data.get("fetched_at", 0.0))
+        self.etag = data.get("etag")
+        self.last_modified = data.get("last_modified")
+        self._index = _CatalogIndex([ModelInfo.from_api(m) for m in data.get("models", [])])
+        logger.debug(f"Loaded {len(self._index.models)} cached models")
+        return True
+
+    def is_stale(self) -> bool:
+        return not self._index.models or time.time() - self.fetched_at > self.ttl
+
+    def refresh(self, force: bool = False) -> bool:
+        """Revalidate the catalog if stale (or ``force``). Returns True if it changed."""
+        if self.client is None or not (force or self.is_stale()):
+            return False
+
+        with self._refresh_lock:
+            if not (force or self.is_stale()):
+                return False
+            has_models = bool(self._index.models)
+            try:
+                result = self.client.fetch_models(
+                    etag=self.etag if has_models else None,
+                    last_modified=self.last_modified if has_models else None,
+                )
+            except OpenRouterError as exc:
+                logger.warning(f"Model catalog refresh failed: {exc}")
+                return False
+
+            self.fetched_at = time.time()
+            changed = not result.not_modified
+            if changed:
+                self.etag = result.etag
+                self.last_modified = result.last_modified
+                self._index = _CatalogIndex([ModelInfo.from_api(m) for m in result.models])
+                logger.info(f"Model catalog refreshed: {len(result.models)} models")
+            self._save()
+            return changed
+
+    def ensure_loaded(self) -> "ModelCatalog":
+        """Load the cached catalog, fetching synchronously only if none exists."""
+        if not self._index.models:
+            self.load_cached()
+        if not self._index.models:
+            self.refresh(force=True)
+        return self
+
+    def _save(self) -> None:
+        data = {
+            "fetched_at": self.fetched_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "models": [model.raw for model in self._index.models],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".models-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_name, self.path)
+        except OSError as exc:
+            logger.warning(f"Failed to persist model catalog: {exc}")
+
+    def models(self) -> List[ModelInfo]:
+        return list(self._index.models)
+
+    def get(self, model_id: str) -> Optional[ModelInfo]:
+        return self._index.by_id.get(model_id)
+
+    def by_provider(self, provider: str) -> List[ModelInfo]:
+        return list(self._index.by_provider.get(provider, []))
+
+    def providers(self) -> List[str]:
+        return sorted(self._index.by_provider)
+
+    def find(
+        self,
+        provider: Optional[str] = None,
+        min_context: int = 0,
+        max_prompt_price: Optional[float] = None,
+        max_completion_price: Optional[float] = None,
+    ) -> List[ModelInfo]:
+        """Models matching all given criteria, cheapest prompt price first."""
+        index = self._index
+        start = bisect.bisect_left(index.context_keys, min_context)
+        matches = [
+            model
+            for model in index.by_context[start:]
+            if (provider is None or model.provider == provider)
+            and (max_prompt_price is None or model.prompt_price <= max_prompt_price)
+            and (max_completion_price is None or model.completion_price <= max_completion_price)
+        ]
+        return sorted(matches, key=lambda model: (model.prompt_price, model.id))
@@ -1,10 +1,116 @@
 """
 Model Router to select AI model based on task type.
+
+Optionally hedges slow requests: once a request outlives a latency percentile of its
+model, a second request goes to a fallback model and the first to finish wins.
 """
 
+import bisect
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from ai_codegen_pro.core.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_FALLBACKS = {
+    "anthropic/claude-3-sonnet-20240229": "openai/gpt-4o-mini",
+    "openai/gpt-4o-mini": "anthropic/claude-3-haiku-20240307",
+    "openai/gpt-3.5-turbo": "anthropic/claude-3-haiku-20240307",
+}
+
+
+def _bucket_bounds(smallest: float = 0.01, largest: float = 600.0, growth: float = 1.2):
+    bounds = []
+    bound = smallest
+    while bound < largest:
+        bounds.append(bound)
+        bound *= growth
+    bounds.append(largest)
+    return bounds
+
+
+_BUCKET_BOUNDS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with exponential decay.
+
+    Buckets grow by 20%, so percentiles are accurate to within one bucket. Once
+    ``max_samples`` have been recorded all counts are halved, letting the histogram
+    follow a provider whose latency drifts.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._counts = [0.0] * (len(_BUCKET_BOUNDS) + 1)
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        index = bisect.bisect_left(_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            if self._total >= self.max_samples:
+                self._counts = [count / 2 for count in self._counts]
+                self._total /= 2
+
+    @property
+    def count(self) -> float:
+        return self._total
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``p`` quantile (0 < p <= 1)."""
+        with self._lock:
+            if not self._total:
+                return None
+            target = p * self._total
+            cumulative = 0.0
+            for index, count in enumerate(self._counts):
+                cumulative += count
+                if count and cumulative >= target:
+                    break
+        return _BUCKET_BOUNDS[min(index, len(_BUCKET_BOUNDS) - 1)]
+
+
+@dataclass
+class HedgeStats:
+    calls: int
+    hedged: int
+    fallback_wins: int
+
+
+@dataclass
+class _Attempt:
+    model: str
+    token: CancellationToken
+    started: float = 0.0
+
 
 class ModelRouter:
-    def __init__(self):
+    """Maps task types to models and optionally hedges slow requests.
+
+    Hedging is off unless ``hedge_percentile`` is set. A model's hedge threshold is
+    that percentile of its observed latency; until ``min_samples`` latencies have
+    been recorded, ``initial_hedge_delay`` is used (no hedging if it is None).
+    Attempts run on a shared pool of at most ``max_hedge_workers`` threads.
+    """
+
+    def __init__(
+        self,
+        fallback_map: Optional[Dict[str, str]] = None,
+        hedge_percentile: Optional[float] = None,
+        min_samples: int = 20,
+        initial_hedge_delay: Optional[float] = None,
+        max_hedge_workers: int = 16,
+    ):
         self.model_map = {
             "module": "anthropic/claude-3-sonnet-20240229",
             "service": "openai/gpt-4o-mini",
@@ -12,6 +118,138 @@ class ModelRouter:
             "test": "openai/gpt-3.5-turbo",
             "default": "openai/gpt-3.5-turbo",
         }
+        self.fallback_map = dict(DEFAULT_FALLBACKS if fallback_map is None else fallback_map)
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_hedge_delay = initial_hedge_delay
+        self.max_hedge_workers = max(2, max_hedge_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedged = 0
+        self._fallback_wins = 0
 
     def select_model(self, task_type: str) -> str:
         return self.model_map.get(task_type, self.model_map["default"])
+
+    def select_fallback(self, model: str) -> Optional[str]:
+        fallback = self.fallback_map.get(model)
+        return fallback if fallback != model else None
+
+    def _histogram(self, model: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(model)
+            if histogram is None:
+                histogram = LatencyHistogram()
+                self._histograms[model] = histogram
+            return histogram
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        self._histogram(model).record(seconds)
+
+    def latency_percentile(self, model: str, p: float) -> Optional[float]:
+        return self._histogram(model).percentile(p)
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait on ``model`` before hedging, or None to never hedge."""
+        if self.hedge_percentile is None or self.select_fallback(model) is None:
+            return None
+        histogram = self._histogram(model)
+        if histogram.count < self.min_samples:
+            return self.initial_hedge_delay
+        return histogram.percentile(self.hedge_percentile)
+
+    def should_hedge(self, task_type: str) -> bool:
+        return self.hedge_delay(self.select_model(task_type)) is not None
+
+    def hedged_call(
+        self,
+        task_type: str,
+        call: Callable[[str, CancellationToken], T],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Tuple[T, str]:
+        """Run ``call(model, token)`` for the task's model, hedging if it is slow.
+
+        Returns the first successful result and the model that produced it. Each
+        attempt gets its own child of ``cancel_token``; the loser's is cancelled and
+        its result discarded, so calls should hand the token to their request to
+        have it aborted. If the primary model fails before the hedge threshold, the
+        fallback is tried at once.
+        """
+        primary = self.select_model(task_type)
+        fallback = self.select_fallback(primary)
+        delay = self.hedge_delay(primary)
+        with self._lock:
+            self._calls += 1
+
+        attempts: Dict[Future, _Attempt] = {}
+        first = self._start(call, primary, attempts, cancel_token)
+        done, _ = wait([first], timeout=delay)
+        primary_ok = bool(done) and first.exception() is None
+        if primary_ok or fallback is None:
+            result = first.result()
+            self.record_latency(primary, time.monotonic() - attempts[first].started)
+            return result, primary
+
+        if done:
+            logger.warning(f"{primary} failed, falling back to {fallback}")
+        else:
+            logger.info(f"Hedging {primary} with {fallback} after {delay:.2f}s")
+        with self._lock:
+            self._hedged += 1
+        self._start(call, fallback, attempts, cancel_token)
+
+        errors: Dict[str, BaseException] = {}
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempt = attempts[future]
+                if future.exception() is not None:
+                    errors[attempt.model] = future.exception()
+                    continue
+                now = time.monotonic()
+                self.record_latency(attempt.model, now - attempt.started)
+                for other in pending:
+                    loser = attempts[other]
+                    loser.token.cancel(f"hedged request to {attempt.model} finished first")
+                    if loser.started:
+                        # The loser took at least this long; record it as a lower bound.
+                        self.record_latency(loser.model, now - loser.started)
+                if attempt.model != primary:
+                    with self._lock:
+                        self._fallback_wins += 1
+                return future.result(), attempt.model
+        raise errors[primary]
+
+    def _start(
+        self,
+        call: Callable[[str, CancellationToken], T],
+        model: str,
+        attempts: Dict[Future, _Attempt],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Future:
+        attempt = _Attempt(model, CancellationToken(parent=cancel_token))
+
+        def run() -> T:
+            attempt.started = time.monotonic()
+            try:
+                return call(model, attempt.token)
+            finally:
+                attempt.token.close()
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_hedge_workers, thread_name_prefix="hedge"
+                )
+            future = self._executor.submit(run)
+        attempts[future] = attempt
+        return future
+
+    def hedge_stats(self) -> HedgeStats:
+        with self._lock:
+            return HedgeStats(
+                calls=self._calls, hedged=self._hedged, fallback_wins=self._fallback_wins
+            )
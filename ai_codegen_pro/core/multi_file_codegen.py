@@ -2,15 +2,49 @@
 Multi-file code generator with real AI integration.
 """
 
+import ast
+import asyncio
 import logging
+import threading
 import time
-from dataclasses import dataclass
+import zipfile
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from ai_codegen_pro.core.budget import BudgetExceededError, GenerationBudget
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.code_postprocessor import ProcessedCode, process_code
+from ai_codegen_pro.core.dag_scheduler import CycleError, DAGScheduler, DependencyFailedError
+from ai_codegen_pro.core.generation_journal import JOURNAL_NAME, GenerationJournal
+from ai_codegen_pro.core.generation_manifest import (
+    GenerationManifest,
+    component_input_hash,
+    content_hash,
+)
+from ai_codegen_pro.core.json_stream import JSONArrayStreamParser, iter_json_array
 from ai_codegen_pro.core.model_router import ModelRouter
-from ai_codegen_pro.core.openrouter_client import OpenRouterClient, OpenRouterError
+from ai_codegen_pro.core.openrouter_client import (
+    CompletionResult,
+    OpenRouterClient,
+    OpenRouterError,
+)
+from ai_codegen_pro.core.rate_limiter import estimate_tokens
+from ai_codegen_pro.core.response_cache import ResponseCache
 from ai_codegen_pro.core.template_service import TemplateService
+from ai_codegen_pro.utils.file_writer import write_files
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +58,31 @@ class GeneratedFile:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class ModelUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+    total_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def add(self, metadata: Dict[str, Any]) -> None:
+        # Files generated in one batched request carry requests=1 on the first file only.
+        requests = metadata.get("requests", 1)
+        self.requests += requests
+        self.prompt_tokens += metadata.get("prompt_tokens", 0)
+        self.completion_tokens += metadata.get("completion_tokens", 0)
+        self.total_tokens += metadata.get("tokens_used", 0)
+        self.cached_tokens += metadata.get("cached_tokens", 0)
+        if requests:
+            self.total_latency += metadata.get("latency", 0.0)
+
+
 @dataclass
 class GenerationResult:
     files: List[GeneratedFile]
@@ -31,21 +90,238 @@ class GenerationResult:
     errors: List[str]
     total_tokens: int
     generation_time: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model_usage: Dict[str, ModelUsage] = field(default_factory=dict)
+    reused: List[str] = field(default_factory=list)
+    cached_tokens: int = 0
+    resumed: List[str] = field(default_factory=list)
+    cancelled: bool = False
+    skipped: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ComponentFailure:
+    """A component that could not be generated, as yielded by ``iter_project``."""
+
+    name: str
+    error: Exception
+
+    @property
+    def message(self) -> str:
+        return f"Failed to generate {self.name}: {self.error}"
+
+
+def file_from_entry(
+    entry: Any, template_service: TemplateService, language: str = "python"
+) -> Optional[GeneratedFile]:
+    """Render one ``{filename, template, context}`` entry of a multi-file response.
+
+    Returns None (and logs why) for entries that are incomplete, name an unknown
+    template or fail to render.
+    """
+    if not isinstance(entry, dict):
+        logger.warning(f"Skipping multi-file entry that is not an object: {entry!r:.80}")
+        return None
+    filename = entry.get("filename")
+    template_name = entry.get("template")
+    context = entry.get("context")
+    if not (isinstance(filename, str) and isinstance(template_name, str)) or not isinstance(
+        context, dict
+    ):
+        logger.warning(f"Skipping incomplete multi-file entry: {filename or entry!r:.80}")
+        return None
+    if not template_service.template_exists(template_name):
+        logger.warning(f"Skipping {filename}: unknown template {template_name}")
+        return None
+    if isinstance(context.get("body"), str):
+        # Models fence code even inside JSON strings; clean it as single responses are.
+        context = {**context, "body": process_code(context["body"], language).code}
+    try:
+        content = template_service.render_template(template_name, context)
+    except Exception as exc:
+        logger.warning(f"Skipping {filename}: {exc}")
+        return None
+    return GeneratedFile(
+        name=filename,
+        content=content,
+        language=language,
+        template=template_name,
+        metadata={"batched": True},
+    )
+
+
+def iter_multi_file_response(
+    chunks: Iterable[str],
+    template_service: Optional[TemplateService] = None,
+    language: str = "python",
+) -> Iterator[GeneratedFile]:
+    """Yield each file of a streamed JSON-array response as soon as its object closes."""
+    template_service = template_service or TemplateService()
+    for entry in iter_json_array(chunks):
+        file = file_from_entry(entry, template_service, language)
+        if file is not None:
+            yield file
+
+
+def parse_multi_file_response(
+    raw: str, template_service: Optional[TemplateService] = None
+) -> Dict[str, str]:
+    """Map file names to rendered content for a complete multi-file response."""
+    return {file.name: file.content for file in iter_multi_file_response([raw], template_service)}
+
+
+def export_zip(files: Dict[str, str], zip_path: Union[str, Path]) -> Path:
+    """Write ``{name: content}`` into a deflated ZIP archive."""
+    zip_path = Path(zip_path)
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return zip_path
+
+
+@lru_cache(maxsize=64)
+def build_project_prefix(
+    project_type: str, architecture: str, dependencies: Tuple[str, ...]
+) -> str:
+    """Byte-stable project context and code requirements shared by all prompts."""
+    prefix = (
+        "Project Context:\n"
+        f"- Type: {project_type}\n"
+        f"- Architecture: {architecture}\n"
+        "- Dependencies:\n"
+    )
+    for dep in dependencies:
+        prefix += f"  - {dep}\n"
+    prefix += (
+        "\n"
+        "Code Requirements:\n"
+        "- Include comprehensive docstrings\n"
+        "- Add type hints where applicable\n"
+        "- Include error handling\n"
+        f"- Follow best practices for {project_type}\n"
+        "- Make code production-ready\n"
+        "- Add logging where appropriate\n\n"
+    )
+    return prefix
 
 
 class MultiFileCodeGenerator:
-    def __init__(self, api_key: str):
-        self.openrouter = OpenRouterClient(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        max_workers: int = 1,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        cache: Optional[ResponseCache] = None,
+        model_router: Optional[ModelRouter] = None,
+        batch_size: int = 1,
+    ):
+        self.openrouter = OpenRouterClient(api_key, cache=cache)
         self.template_service = TemplateService()
-        self.model_router = ModelRouter()
+        self.model_router = model_router or ModelRouter()
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.model_concurrency = dict(model_concurrency or {})
+        self._model_semaphores: Dict[str, threading.Semaphore] = {}
+        self._semaphore_lock = threading.Lock()
 
     def generate_project(
-        self, project_spec: Dict[str, Any], output_dir: Optional[str] = None
+        self,
+        project_spec: Dict[str, Any],
+        output_dir: Optional[str] = None,
+        force: bool = False,
+        journal_path: Optional[Union[str, Path]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        budget: Optional[GenerationBudget] = None,
+    ) -> GenerationResult:
+        """Generate all components of ``project_spec``.
+
+        With ``output_dir``, a manifest of per-component input hashes is kept next to
+        the files; components whose inputs and dependencies are unchanged are reused
+        from disk instead of regenerated. ``force`` regenerates everything.
+
+        Every completed component is appended to a journal (``journal_path``, by
+        default inside ``output_dir``) as soon as it finishes, so an interrupted run
+        can be continued with ``resume``. The journal is removed after a clean run.
+
+        Cancelling ``cancel_token``, or running past ``timeout`` seconds, aborts the
+        open requests, drops pending components and returns the partial result.
+
+        With a ``budget``, no request starts that could exceed it; once it is exhausted
+        the remaining components are listed in ``GenerationResult.skipped``.
+        """
+        return self._final_result(
+            self.iter_project(
+                project_spec,
+                output_dir,
+                force,
+                journal_path,
+                cancel_token=cancel_token,
+                timeout=timeout,
+                budget=budget,
+            )
+        )
+
+    def resume(
+        self,
+        project_spec: Dict[str, Any],
+        output_dir: Optional[str] = None,
+        journal_path: Optional[Union[str, Path]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        budget: Optional[GenerationBudget] = None,
     ) -> GenerationResult:
+        """Continue an interrupted ``generate_project`` run.
+
+        Components recorded in the journal with unchanged inputs are replayed from it;
+        only the missing ones are requested from the model.
+        """
+        return self._final_result(
+            self.iter_project(
+                project_spec,
+                output_dir,
+                journal_path=journal_path,
+                resume=True,
+                cancel_token=cancel_token,
+                timeout=timeout,
+                budget=budget,
+            )
+        )
+
+    def iter_project(
+        self,
+        project_spec: Dict[str, Any],
+        output_dir: Optional[str] = None,
+        force: bool = False,
+        journal_path: Optional[Union[str, Path]] = None,
+        resume: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        budget: Optional[GenerationBudget] = None,
+    ) -> Iterator[Union[GeneratedFile, ComponentFailure, GenerationResult]]:
+        """Generate like ``generate_project`` (or ``resume``), reporting progress.
+
+        Each component's ``GeneratedFile`` or ``ComponentFailure`` is yielded as soon
+        as it finishes, in completion order; the last item is the ``GenerationResult``.
+        Files are saved and the manifest updated just before the result is yielded.
+        Components dropped by cancellation are not yielded; the result is then marked
+        ``cancelled`` and the journal is kept for ``resume``.
+        """
         start_time = time.time()
         files = []
         errors = []
-        total_tokens = 0
+        reused = []
+        resumed = []
+        dropped = []
+        skipped = []
+        model_usage: Dict[str, ModelUsage] = {}
+        manifest = None
+        journal = None
+        completed = False
+        token = cancel_token
+        if timeout is not None:
+            token = CancellationToken(timeout=timeout, parent=cancel_token)
 
         try:
             project_type = project_spec.get("type", "python")
@@ -54,88 +330,819 @@ class MultiFileCodeGenerator:
 
             logger.info(f"Generating {project_type} project: {project_name}")
 
-            for component in components:
-                try:
-                    file_result = self._generate_component(component, project_spec)
-                    if file_result:
-                        files.append(file_result)
-                        total_tokens += file_result.metadata.get("tokens_used", 0)
-                except Exception as exc:
-                    error_msg = f"Failed to generate {component.get('name', 'unknown')}: {str(exc)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+            if output_dir:
+                manifest = (
+                    GenerationManifest(output_dir) if force else GenerationManifest.load(output_dir)
+                )
+            if journal_path is None and output_dir:
+                journal_path = Path(output_dir) / JOURNAL_NAME
+            if journal_path is not None:
+                journal = (
+                    GenerationJournal.load(journal_path)
+                    if resume
+                    else GenerationJournal(journal_path)
+                )
+                journal.start(resume)
+
+            outcomes: List[Any] = [None] * len(components)
+            for index, outcome in self._iter_components(
+                components, project_spec, manifest, journal, token, budget
+            ):
+                outcomes[index] = outcome
+                if isinstance(outcome, CancelledError):
+                    continue
+                if isinstance(outcome, Exception):
+                    failure = ComponentFailure(components[index].get("name", "unknown"), outcome)
+                    logger.error(failure.message)
+                    yield failure
+                elif outcome:
+                    yield outcome
 
+            by_name = {
+                component.get("name"): outcome for component, outcome in zip(components, outcomes)
+            }
+            for component, outcome in zip(components, outcomes):
+                if isinstance(outcome, CancelledError):
+                    dropped.append(component.get("name", "unknown"))
+                elif self._skipped_by_budget(outcome, by_name):
+                    skipped.append(component.get("name", "unknown"))
+                elif isinstance(outcome, Exception):
+                    errors.append(
+                        ComponentFailure(component.get("name", "unknown"), outcome).message
+                    )
+                elif outcome and outcome.metadata.get("reused"):
+                    files.append(outcome)
+                    reused.append(outcome.name)
+                elif outcome and outcome.metadata.get("resumed"):
+                    files.append(outcome)
+                    resumed.append(outcome.name)
+                elif outcome:
+                    files.append(outcome)
+                    model_id = outcome.metadata.get("model_id", "unknown")
+                    model_usage.setdefault(model_id, ModelUsage()).add(outcome.metadata)
+
+            if dropped:
+                errors.append(
+                    f"Generation cancelled ({token.reason}), not generated: {', '.join(dropped)}"
+                )
+                logger.warning(errors[-1])
+            if skipped:
+                errors.append(
+                    f"Budget exhausted ({budget.exhausted_reason}), skipped: {', '.join(skipped)}"
+                )
+                logger.warning(errors[-1])
+            if reused:
+                logger.info(f"Reused {len(reused)} unchanged files")
+            if resumed:
+                logger.info(f"Resumed {len(resumed)} files from the journal")
             if output_dir and files:
-                self._save_files(files, output_dir)
+                errors.extend(
+                    self._save_files(
+                        [file for file in files if not file.metadata.get("reused")], output_dir
+                    )
+                )
+            if manifest is not None:
+                self._update_manifest(manifest, components, outcomes)
+            completed = True
 
         except Exception as exc:
             errors.append(f"Project generation failed: {str(exc)}")
             logger.error(f"Project generation failed: {exc}")
+        finally:
+            if timeout is not None:
+                token.close()
+            # A consumer that stops iterating early leaves the journal for ``resume``.
+            if journal is not None:
+                if completed and not errors:
+                    journal.discard()
+                else:
+                    journal.close()
 
         generation_time = time.time() - start_time
         success = len(files) > 0 and not errors
 
-        return GenerationResult(
+        yield GenerationResult(
             files=files,
             success=success,
             errors=errors,
-            total_tokens=total_tokens,
+            total_tokens=sum(usage.total_tokens for usage in model_usage.values()),
             generation_time=generation_time,
+            prompt_tokens=sum(usage.prompt_tokens for usage in model_usage.values()),
+            completion_tokens=sum(usage.completion_tokens for usage in model_usage.values()),
+            model_usage=model_usage,
+            reused=reused,
+            cached_tokens=sum(usage.cached_tokens for usage in model_usage.values()),
+            resumed=resumed,
+            cancelled=bool(dropped),
+            skipped=skipped,
         )
 
+    async def aiter_project(
+        self, project_spec: Dict[str, Any], **kwargs
+    ) -> AsyncIterator[Union[GeneratedFile, ComponentFailure, GenerationResult]]:
+        """Async variant of ``iter_project``; generation runs in a worker thread.
+
+        Accepts the same keyword arguments as ``iter_project``. If the consumer stops
+        early (``break``, ``aclose()`` or task cancellation), in-flight requests are
+        cancelled and the worker thread is awaited before this generator closes.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stopped = threading.Event()
+        token = CancellationToken(parent=kwargs.pop("cancel_token", None))
+
+        def produce() -> None:
+            items = self.iter_project(project_spec, cancel_token=token, **kwargs)
+            try:
+                for item in items:
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                items.close()
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(None, produce)
+        finished = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    finished = True
+                    break
+                yield item
+        finally:
+            if not finished:
+                stopped.set()
+                token.cancel("consumer stopped")
+            await producer
+            token.close()
+
+    @staticmethod
+    def _final_result(
+        items: Iterable[Union[GeneratedFile, ComponentFailure, GenerationResult]],
+    ) -> GenerationResult:
+        result = None
+        for result in items:
+            pass
+        return result
+
+    def _update_manifest(
+        self,
+        manifest: GenerationManifest,
+        components: List[Dict[str, Any]],
+        outcomes: List[Any],
+    ) -> None:
+        for component, outcome in zip(components, outcomes):
+            if isinstance(outcome, GeneratedFile) and not outcome.metadata.get("reused"):
+                metadata = {
+                    key: outcome.metadata.get(key)
+                    for key in ("component_type", "model_used", "model_id", "description")
+                }
+                manifest.record(
+                    component.get("name", outcome.name),
+                    outcome.metadata["input_hash"],
+                    outcome.name,
+                    outcome.content,
+                    metadata,
+                )
+        manifest.retain(component.get("name") for component in components)
+        manifest.save()
+
+    def _iter_components(
+        self,
+        components: List[Dict[str, Any]],
+        project_spec: Dict[str, Any],
+        manifest: Optional[GenerationManifest] = None,
+        journal: Optional[GenerationJournal] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        budget: Optional[GenerationBudget] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        """Generate all components, yielding ``(index, outcome)`` as each one finishes.
+
+        An outcome is either the ``GeneratedFile`` (or ``None``) or the exception raised
+        for that component, so a single failure never cancels its siblings. Components
+        naming others in ``depends_on`` start once those are generated and see their
+        interfaces in the prompt; independent components run in parallel. Each newly
+        generated file is written to ``journal`` as soon as its node finishes. After
+        ``cancel_token`` fires, unfinished components are yielded with ``CancelledError``;
+        components the ``budget`` cannot cover fail with ``BudgetExceededError``.
+        """
+        dependencies: Dict[Any, List[Any]] = dict(self._component_dependencies(components))
+        batches = self._plan_batches(components, project_spec, dependencies)
+        for number, batch in enumerate(batches):
+            for index in batch:
+                del dependencies[index]
+            dependencies[("batch", number)] = []
+
+        workers = min(self.max_workers, len(dependencies))
+        if workers > 1:
+            logger.info(f"Generating {len(components)} components with {workers} workers")
+
+        def name(index: int) -> str:
+            return components[index].get("name", str(index))
+
+        def run(node: Any, upstream: Dict[Any, Any]) -> Any:
+            if isinstance(node, tuple):
+                batch = [components[index] for index in batches[node[1]]]
+                outcome = self._generate_batch(
+                    batch, project_spec, manifest, journal, cancel_token, budget
+                )
+                for component, file in zip(batch, outcome):
+                    self._journal_file(journal, component, file)
+                return outcome
+            outcome = self._generate_component(
+                components[node],
+                project_spec,
+                list(upstream.values()),
+                manifest,
+                journal,
+                cancel_token,
+                budget,
+            )
+            self._journal_file(journal, components[node], outcome)
+            return outcome
+
+        scheduler = DAGScheduler(max_workers=workers, thread_name_prefix="codegen")
+        try:
+            for node, outcome in scheduler.iter_run(dependencies, run, cancel_token):
+                if isinstance(node, tuple):
+                    if isinstance(outcome, Exception):
+                        outcome = [outcome] * len(batches[node[1]])
+                    yield from zip(batches[node[1]], outcome)
+                elif isinstance(outcome, DependencyFailedError):
+                    yield node, DependencyFailedError(name(node), name(outcome.dependency))
+                else:
+                    yield node, outcome
+        except CycleError as exc:
+            raise CycleError([name(index) for index in exc.cycle]) from None
+
+    def _plan_batches(
+        self,
+        components: List[Dict[str, Any]],
+        project_spec: Dict[str, Any],
+        dependencies: Dict[Any, List[Any]],
+    ) -> List[List[int]]:
+        """Group small components into batches generated by a single request.
+
+        A component is batched if it renders through a template, has no dependency
+        edges and does not opt out with ``"batch": false``. Batches never mix models.
+        """
+        if self.batch_size < 2:
+            return []
+        depended_on = {dep for deps in dependencies.values() for dep in deps}
+        by_model: Dict[str, List[int]] = {}
+        for index, component in enumerate(components):
+            component_type = component.get("type", "module")
+            template_name = self._get_template_for_component(
+                component_type, project_spec.get("type")
+            )
+            if (
+                component.get("batch", True)
+                and not dependencies[index]
+                and index not in depended_on
+                and template_name
+                and self.template_service.template_exists(template_name)
+            ):
+                model = self.model_router.select_model(component_type)
+                by_model.setdefault(model, []).append(index)
+
+        batches = []
+        for indices in by_model.values():
+            for start in range(0, len(indices), self.batch_size):
+                batch = indices[start : start + self.batch_size]
+                if len(batch) > 1:
+                    batches.append(batch)
+        return batches
+
+    def _generate_batch(
+        self,
+        components: List[Dict[str, Any]],
+        project_spec: Dict[str, Any],
+        manifest: Optional[GenerationManifest] = None,
+        journal: Optional[GenerationJournal] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        budget: Optional[GenerationBudget] = None,
+    ) -> List[Any]:
+        """Generate several components with one request, one outcome per component.
+
+        Components the response leaves out (or renders invalid) fall back to their own
+        request, as does the whole batch if the request fails.
+        """
+        outcomes: List[Any] = [None] * len(components)
+        pending: Dict[str, int] = {}
+        hashes: Dict[int, str] = {}
+        for position, component in enumerate(components):
+            model = self.model_router.select_model(component.get("type", "module"))
+            template_name = self._get_template_for_component(
+                component.get("type", "module"), project_spec.get("type")
+            )
+            prompt = self._create_project_prefix(project_spec) + self._create_generation_prompt(
+                component, project_spec, template_name
+            )
+            hashes[position] = self._input_hash(component, prompt, model, template_name)
+            reused = self._reuse_from_manifest(
+                manifest,
+                component.get("name", "generated_file"),
+                hashes[position],
+                project_spec,
+                template_name,
+            ) or self._resume_from_journal(
+                journal, component.get("name", "generated_file"), hashes[position]
+            )
+            if reused is not None:
+                outcomes[position] = reused
+            else:
+                pending[self._file_name(component, project_spec)] = position
+
+        if len(pending) > 1:
+            batch = [components[position] for position in pending.values()]
+            try:
+                for file in self._request_batch(batch, project_spec, cancel_token, budget):
+                    position = pending.pop(file.name, None)
+                    if position is None:
+                        logger.warning(f"Ignoring unrequested file {file.name} in batch")
+                        continue
+                    component = components[position]
+                    file.metadata.update(
+                        component_type=component.get("type", "module"),
+                        description=component.get("description", ""),
+                        input_hash=hashes[position],
+                    )
+                    outcomes[position] = file
+            except (OpenRouterError, BudgetExceededError) as exc:
+                logger.warning(f"Batch request failed, generating individually: {exc}")
+
+        for position in pending.values():
+            try:
+                outcomes[position] = self._generate_component(
+                    components[position],
+                    project_spec,
+                    manifest=manifest,
+                    journal=journal,
+                    cancel_token=cancel_token,
+                    budget=budget,
+                )
+            except Exception as exc:
+                outcomes[position] = exc
+        return outcomes
+
+    def _request_batch(
+        self,
+        components: List[Dict[str, Any]],
+        project_spec: Dict[str, Any],
+        cancel_token: Optional[CancellationToken] = None,
+        budget: Optional[GenerationBudget] = None,
+    ) -> List[GeneratedFile]:
+        """Stream one completion for ``components``, rendering files as they complete."""
+        model = self.model_router.select_model(components[0].get("type", "module"))
+        prefix = self._create_project_prefix(project_spec)
+        prompt = self._create_batch_prompt(components, project_spec)
+        language = project_spec.get("type", "python")
+        parser = JSONArrayStreamParser()
+        files: List[GeneratedFile] = []
+        max_tokens = min(16000, 2000 * len(components))
+
+        def collect(text: str) -> None:
+            for entry in parser.feed(text):
+                file = file_from_entry(entry, self.template_service, language)
+                if file is not None:
+                    logger.info(f"Batch produced {file.name}")
+                    files.append(file)
+
+        start = time.monotonic()
+        cached = self.openrouter.cached_completion(
+            prompt, model, max_tokens=max_tokens, temperature=0.1, prompt_prefix=prefix
+        )
+        with self._spend(budget, model, prefix + prompt, max_tokens) as spent:
+            if cached is not None:
+                logger.info(f"Batch of {len(components)} components served from the cache")
+                completion = cached
+                collect(completion.content)
+            else:
+                parts: List[str] = []
+                with self._model_slot(model):
+                    with self.openrouter.generate_code_stream(
+                        prompt,
+                        model,
+                        max_tokens=max_tokens,
+                        temperature=0.1,
+                        prompt_prefix=prefix,
+                        cancel_token=cancel_token,
+                    ) as stream:
+                        for delta in stream:
+                            parts.append(delta)
+                            collect(delta)
+                completion = CompletionResult.from_usage(
+                    "".join(parts), model, stream.usage, time.monotonic() - start
+                )
+                if files:
+                    self.openrouter.cache_completion(
+                        completion,
+                        prompt,
+                        model,
+                        max_tokens=max_tokens,
+                        temperature=0.1,
+                        prompt_prefix=prefix,
+                    )
+            latency = time.monotonic() - start
+            usage = self._usage_metadata(
+                [completion] if cached is not None or stream.usage else [],
+                prefix + prompt,
+                "".join(file.content for file in files),
+                model,
+                latency,
+            )
+            spent.update(usage)
+        logger.info(
+            f"Batch of {len(components)} components produced {len(files)} files "
+            f"({parser.skipped} malformed entries skipped)"
+        )
+
+        self._split_batch_usage(files, model, usage, latency)
+        return files
+
+    def _split_batch_usage(
+        self,
+        files: List[GeneratedFile],
+        model: str,
+        usage: Dict[str, Any],
+        latency: float,
+    ) -> None:
+        """Attribute one request's usage (from ``_usage_metadata``) to its files so
+        per-file shares add up; without reported usage the shares split the estimate."""
+        totals = {
+            key: usage[key] for key in ("prompt_tokens", "completion_tokens", "cached_tokens")
+        }
+        for position, file in enumerate(files):
+            shares = {}
+            for key, total in totals.items():
+                share, remainder = divmod(total, len(files))
+                shares[key] = share + (1 if position < remainder else 0)
+            file.metadata.update(
+                model_used=model,
+                model_id=usage["model_id"],
+                prompt_tokens=shares["prompt_tokens"],
+                completion_tokens=shares["completion_tokens"],
+                tokens_used=shares["prompt_tokens"] + shares["completion_tokens"],
+                cached_tokens=shares["cached_tokens"],
+                latency=latency,
+                requests=1 if position == 0 else 0,
+                batch_size=len(files),
+                cached=usage["cached"],
+                usage_reported=usage["usage_reported"],
+            )
+
+    def _component_dependencies(self, components: List[Dict[str, Any]]) -> Dict[int, List[int]]:
+        """Map component indices to the indices of the components they depend on."""
+        by_name = {component.get("name"): index for index, component in enumerate(components)}
+        dependencies: Dict[int, List[int]] = {}
+        for index, component in enumerate(components):
+            deps = []
+            for name in component.get("depends_on", []):
+                if name not in by_name:
+                    raise ValueError(
+                        f"Component {component.get('name', index)} depends on unknown "
+                        f"component {name}"
+                    )
+                deps.append(by_name[name])
+            dependencies[index] = deps
+        return dependencies
+
+    def _model_slot(self, model: str):
+        """Return a context manager bounding concurrent requests for ``model``."""
+        limit = self.model_concurrency.get(model)
+        if not limit:
+            return nullcontext()
+        with self._semaphore_lock:
+            semaphore = self._model_semaphores.get(model)
+            if semaphore is None:
+                semaphore = threading.Semaphore(limit)
+                self._model_semaphores[model] = semaphore
+        return semaphore
+
     def _generate_component(
         self,
         component: Dict[str, Any],
         project_spec: Dict[str, Any],
+        upstream: Optional[List[Optional[GeneratedFile]]] = None,
+        manifest: Optional[GenerationManifest] = None,
+        journal: Optional[GenerationJournal] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        budget: Optional[GenerationBudget] = None,
     ) -> Optional[GeneratedFile]:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
         component_type = component.get("type", "module")
         file_name = component.get("name", "generated_file")
         description = component.get("description", "")
 
         model = self.model_router.select_model(component_type)
         template_name = self._get_template_for_component(component_type, project_spec.get("type"))
-        prompt = self._create_generation_prompt(component, project_spec, template_name)
+        prefix = self._create_project_prefix(project_spec)
+        prompt = self._create_generation_prompt(component, project_spec, template_name, upstream)
+        input_hash = self._input_hash(component, prefix + prompt, model, template_name, upstream)
+
+        reused = self._reuse_from_manifest(
+            manifest, file_name, input_hash, project_spec, template_name
+        ) or self._resume_from_journal(journal, file_name, input_hash)
+        if reused is not None:
+            return reused
 
         try:
-            generated_code = self.openrouter.generate_code(
-                prompt=prompt,
-                model=model,
-                max_tokens=4000,
-                temperature=0.1,
-            )
+            completions: List[CompletionResult] = []
+            start = time.monotonic()
+            # Requests the cache or an identical in-flight call can answer are not hedged.
+            hedged = self.model_router.should_hedge(component_type)
+            if hedged and self.openrouter.can_reuse(
+                prompt, model, max_tokens=4000, temperature=0.1, prompt_prefix=prefix
+            ):
+                hedged = False
+            if hedged:
+                requested = model
+                completion, model = self.model_router.hedged_call(
+                    component_type,
+                    lambda candidate, attempt: self._stream_completion(
+                        prefix, prompt, candidate, attempt, budget
+                    ),
+                    cancel_token,
+                )
+                # Stored under the request as made, so a rerun is served from the cache.
+                self.openrouter.cache_completion(
+                    completion,
+                    prompt,
+                    requested,
+                    max_tokens=4000,
+                    temperature=0.1,
+                    prompt_prefix=prefix,
+                )
+                completions.append(completion)
+                generated_code = completion.content
+            else:
+                with self._spend(budget, model, prefix + prompt, 4000) as spent:
+                    with self._model_slot(model):
+                        generated_code = self.openrouter.generate_code(
+                            prompt=prompt,
+                            model=model,
+                            max_tokens=4000,
+                            temperature=0.1,
+                            on_completion=completions.append,
+                            prompt_prefix=prefix,
+                            cancel_token=cancel_token,
+                        )
+                    spent.update(
+                        self._usage_metadata(completions, prefix + prompt, generated_code, model, 0)
+                    )
+            latency = time.monotonic() - start
+            if not hedged and not (completions and completions[-1].cached):
+                self.model_router.record_latency(model, latency)
+            processed = process_code(generated_code, project_spec.get("type"))
             if template_name and self.template_service.template_exists(template_name):
-                template_vars = self._extract_template_vars(component, generated_code)
+                template_vars = self._extract_template_vars(component, processed)
                 final_code = self.template_service.render_template(template_name, template_vars)
             else:
-                final_code = generated_code
-
-            file_extension = self._get_file_extension(component_type, project_spec.get("type"))
-            full_name = file_name
-            if not file_name.endswith(f".{file_extension}"):
-                full_name = f"{file_name}.{file_extension}"
+                final_code = processed.code
 
             return GeneratedFile(
-                name=full_name,
+                name=self._file_name(component, project_spec),
                 content=final_code,
                 language=project_spec.get("type", "python"),
                 template=template_name or "none",
                 metadata={
                     "component_type": component_type,
                     "model_used": model,
-                    "tokens_used": len(generated_code.split()) * 1.3,
                     "description": description,
+                    "hedged": hedged,
+                    "input_hash": input_hash,
+                    "language_detected": processed.language,
+                    **self._usage_metadata(
+                        completions, prefix + prompt, generated_code, model, latency
+                    ),
                 },
             )
         except OpenRouterError as exc:
             logger.error(f"AI generation failed for {file_name}: {exc}")
             raise
 
+    def _input_hash(
+        self,
+        component: Dict[str, Any],
+        prompt: str,
+        model: str,
+        template_name: Optional[str],
+        upstream: Optional[List[Optional[GeneratedFile]]] = None,
+    ) -> str:
+        return component_input_hash(
+            component,
+            prompt,
+            model,
+            template_name,
+            self.template_service.template_source(template_name) if template_name else None,
+            [content_hash(file.content) for file in upstream or [] if file is not None],
+        )
+
+    def _reuse_from_manifest(
+        self,
+        manifest: Optional[GenerationManifest],
+        component_name: str,
+        input_hash: str,
+        project_spec: Dict[str, Any],
+        template_name: Optional[str],
+    ) -> Optional[GeneratedFile]:
+        """The file generated earlier for unchanged inputs, if it is still on disk."""
+        if manifest is None:
+            return None
+        content = manifest.fresh_content(component_name, input_hash)
+        entry = manifest.get(component_name)
+        if content is None or entry is None:
+            return None
+        logger.info(f"Reusing unchanged {entry.file}")
+        return GeneratedFile(
+            name=entry.file,
+            content=content,
+            language=project_spec.get("type", "python"),
+            template=template_name or "none",
+            metadata={**entry.metadata, "input_hash": input_hash, "reused": True},
+        )
+
+    def _resume_from_journal(
+        self,
+        journal: Optional[GenerationJournal],
+        component_name: str,
+        input_hash: str,
+    ) -> Optional[GeneratedFile]:
+        """The file an interrupted run already generated for unchanged inputs."""
+        if journal is None:
+            return None
+        record = journal.replay(component_name, input_hash)
+        if record is None:
+            return None
+        try:
+            file = GeneratedFile(**record)
+        except TypeError:
+            logger.warning(f"Ignoring malformed journal record for {component_name}")
+            return None
+        logger.info(f"Resuming {file.name} from the journal")
+        file.metadata = {**file.metadata, "resumed": True}
+        return file
+
+    def _journal_file(
+        self,
+        journal: Optional[GenerationJournal],
+        component: Dict[str, Any],
+        outcome: Any,
+    ) -> None:
+        """Append a newly generated file to ``journal`` so a crash cannot lose it."""
+        if journal is None or not isinstance(outcome, GeneratedFile):
+            return
+        if outcome.metadata.get("reused") or outcome.metadata.get("resumed"):
+            return
+        journal.record(
+            component.get("name", outcome.name), outcome.metadata["input_hash"], asdict(outcome)
+        )
+
+    def _file_name(self, component: Dict[str, Any], project_spec: Dict[str, Any]) -> str:
+        file_name = component.get("name", "generated_file")
+        file_extension = self._get_file_extension(
+            component.get("type", "module"), project_spec.get("type")
+        )
+        if file_name.endswith(f".{file_extension}"):
+            return file_name
+        return f"{file_name}.{file_extension}"
+
+    def _stream_completion(
+        self,
+        prefix: str,
+        prompt: str,
+        model: str,
+        attempt: CancellationToken,
+        budget: Optional[GenerationBudget] = None,
+    ) -> CompletionResult:
+        """Stream one hedged attempt; cancelling ``attempt`` closes its connection.
+
+        An abandoned attempt is still charged for what it received, then raises
+        ``CancelledError``.
+        """
+        start = time.monotonic()
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        with self._spend(budget, model, prefix + prompt, 4000) as spent:
+            with self._model_slot(model):
+                attempt.raise_if_cancelled()
+                try:
+                    with self.openrouter.generate_code_stream(
+                        prompt,
+                        model,
+                        max_tokens=4000,
+                        temperature=0.1,
+                        prompt_prefix=prefix,
+                        cancel_token=attempt,
+                    ) as stream:
+                        parts.extend(stream)
+                    usage = stream.usage or {}
+                except CancelledError:
+                    logger.debug(f"Abandoned hedged request to {model}")
+            completion = CompletionResult.from_usage(
+                "".join(parts), model, usage, time.monotonic() - start
+            )
+            spent.update(
+                self._usage_metadata(
+                    [completion] if usage else [], prefix + prompt, completion.content, model, 0
+                )
+            )
+        attempt.raise_if_cancelled()
+        return completion
+
+    @contextmanager
+    def _spend(
+        self, budget: Optional[GenerationBudget], model: str, prompt: str, max_tokens: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Reserve ``budget`` for one request and settle it with the usage the caller records.
+
+        The caller fills the yielded dict with ``prompt_tokens``, ``completion_tokens``
+        and ``cached``; failed and cache-served requests release their reservation.
+        """
+        if budget is None:
+            yield {}
+            return
+        reservation = budget.reserve(model, estimate_tokens(prompt), max_tokens)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        except BaseException:
+            budget.release(reservation)
+            raise
+        if usage.get("cached"):
+            budget.release(reservation)
+        else:
+            budget.reconcile(
+                reservation, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+            )
+
+    @staticmethod
+    def _skipped_by_budget(outcome: Any, by_name: Dict[Any, Any]) -> bool:
+        """Whether ``outcome`` (or the dependency it waited for) ran out of budget."""
+        seen = set()
+        while isinstance(outcome, DependencyFailedError) and outcome.dependency not in seen:
+            seen.add(outcome.dependency)
+            outcome = by_name.get(outcome.dependency)
+        return isinstance(outcome, BudgetExceededError)
+
+    def _usage_metadata(
+        self,
+        completions: List[CompletionResult],
+        prompt: str,
+        generated_code: str,
+        model: str,
+        latency: float,
+    ) -> Dict[str, Any]:
+        """Usage as reported by the API, or a flagged local estimate if none was reported."""
+        if completions:
+            completion = completions[-1]
+            return {
+                "model_id": completion.model,
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "tokens_used": completion.total_tokens,
+                "cached_tokens": completion.cached_tokens,
+                "latency": completion.latency,
+                "cached": completion.cached,
+                "usage_reported": True,
+            }
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(generated_code)
+        return {
+            "model_id": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_used": prompt_tokens + completion_tokens,
+            "cached_tokens": 0,
+            "latency": latency,
+            "cached": False,
+            "usage_reported": False,
+        }
+
+    def _create_project_prefix(self, project_spec: Dict[str, Any]) -> str:
+        """Prompt prefix shared by every request of a project.
+
+        Built only from project-level fields in a fixed order, so it is byte-identical
+        for all components and across runs and provider prompt caches can reuse it.
+        """
+        return build_project_prefix(
+            str(project_spec.get("type", "python")),
+            str(project_spec.get("architecture", "standard")),
+            tuple(str(dep) for dep in project_spec.get("dependencies", [])),
+        )
+
     def _create_generation_prompt(
         self,
         component: Dict[str, Any],
         project_spec: Dict[str, Any],
         template_name: Optional[str],
+        upstream: Optional[List[Optional[GeneratedFile]]] = None,
     ) -> str:
+        """Component-specific part of the prompt, sent after the project prefix."""
         project_type = project_spec.get("type", "python")
         component_type = component.get("type", "module")
         name = component.get("name", "component")
@@ -150,28 +1157,71 @@ Requirements:
 """
         for req in requirements:
             prompt += f"- {req}\n"
-
-        prompt += "\nProject Context:\n"
-        prompt += f"- Type: {project_type}\n"
-        arch = project_spec.get("architecture", "standard")
-        prompt += f"- Architecture: {arch}\n"
-        prompt += "- Dependencies:\n"
-        for dep in project_spec.get("dependencies", []):
-            prompt += f"  - {dep}\n"
         prompt += "\n"
 
+        upstream_files = [file for file in upstream or [] if file is not None]
+        if upstream_files:
+            prompt += "Interfaces of files this component depends on:\n"
+            for file in upstream_files:
+                prompt += f"--- {file.name} ---\n{self._extract_interface(file.content)}\n"
+            prompt += "Use these interfaces as-is; do not redefine them.\n\n"
+
+        prompt += "Generate ONLY the code, no explanations or markdown formatting.\n"
+        return prompt
+
+    def _create_batch_prompt(
+        self, components: List[Dict[str, Any]], project_spec: Dict[str, Any]
+    ) -> str:
+        """Batch-specific part of the prompt, sent after the project prefix."""
+        project_type = project_spec.get("type", "python")
+        prompt = f"Generate the following {len(components)} files of the project.\n\nFiles:\n"
+
+        for component in components:
+            template_name = self._get_template_for_component(
+                component.get("type", "module"), project_type
+            )
+            variables = ", ".join(self.template_service.template_variables(template_name))
+            prompt += (
+                f"\n- filename: {self._file_name(component, project_spec)}\n"
+                f"  template: {template_name}\n"
+                f"  context keys: {variables}\n"
+                f"  description: {component.get('description', '')}\n"
+            )
+            for req in component.get("requirements", []):
+                prompt += f"  requirement: {req}\n"
+
         prompt += (
-            "Code Requirements:\n"
-            "- Include comprehensive docstrings\n"
-            "- Add type hints where applicable\n"
-            "- Include error handling\n"
-            f"- Follow best practices for {project_type}\n"
-            "- Make code production-ready\n"
-            "- Add logging where appropriate\n\n"
-            "Generate ONLY the code, no explanations or markdown formatting.\n"
+            "\nRespond with ONLY a JSON array containing one object per file, in the order "
+            'listed: {"filename": ..., "template": ..., "context": {...}}. The context '
+            "maps each listed key to a string; put the code in the body key.\n"
         )
         return prompt
 
+    def _extract_interface(self, code: str) -> str:
+        """Reduce Python code to imports, signatures and docstrings.
+
+        Falls back to the top-level declaration lines for code that is not valid Python.
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return "\n".join(
+                line
+                for line in code.splitlines()
+                if line and not line[0].isspace() and not line.startswith(("#", "//"))
+            )
+
+        kept = [node for node in tree.body if isinstance(node, _INTERFACE_NODES)]
+        if not hasattr(ast, "unparse"):  # Python 3.8
+            return _interface_from_source(code, kept)
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                docstring = ast.get_docstring(node)
+                node.body = [ast.Expr(ast.Constant(docstring))] if docstring else []
+                node.body.append(ast.Expr(ast.Constant(...)))
+        tree.body = kept
+        return ast.unparse(tree)
+
     def _get_template_for_component(self, component_type: str, project_type: str) -> Optional[str]:
         template_map = {
             ("module", "python"): "python_module.j2",
@@ -198,45 +1248,76 @@ Requirements:
         return extension_map.get(project_type, "txt")
 
     def _extract_template_vars(
-        self, component: Dict[str, Any], generated_code: str
+        self, component: Dict[str, Any], processed: ProcessedCode
     ) -> Dict[str, Any]:
         return {
             "name": component.get("name", "component"),
             "description": component.get("description", ""),
-            "generated_code": generated_code,
-            "imports": self._extract_imports(generated_code),
-            "body": self._extract_body(generated_code),
+            "generated_code": processed.code,
+            "preamble": processed.preamble,
+            "docstring": processed.docstring,
+            "imports": processed.imports,
+            "body": processed.body,
         }
 
-    def _extract_imports(self, code: str) -> str:
-        lines = code.split("\n")
-        imports = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith(("import ", "from ")) and not stripped.startswith('"""'):
-                imports.append(line)
-        return "\n".join(imports)
-
-    def _extract_body(self, code: str) -> str:
-        lines = code.split("\n")
-        body_lines = []
-        skip_imports = True
-        for line in lines:
-            stripped = line.strip()
-            if skip_imports and (stripped.startswith(("import ", "from ")) or stripped == ""):
+    def _save_files(self, files: List[GeneratedFile], output_dir: str) -> List[str]:
+        """Write ``files`` and return an error message for each one that failed."""
+        result = write_files(output_dir, [(file.name, file.content) for file in files])
+        return [f"Failed to save {name}: {error}" for name, error in result.failed.items()]
+
+
+_INTERFACE_NODES = (
+    ast.Import,
+    ast.ImportFrom,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Assign,
+    ast.AnnAssign,
+)
+
+
+def _interface_from_source(code: str, statements: List[ast.stmt]) -> str:
+    """Slice ``statements`` out of ``code`` with function bodies cut to ``...``.
+
+    Stands in for ``ast.unparse``, which needs Python 3.9. Positions are taken from
+    the AST, whose column offsets count UTF-8 bytes.
+    """
+    lines = code.encode("utf-8").splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    source = b"".join(lines)
+
+    def position(line: int, column: int) -> int:
+        return offsets[line - 1] + column
+
+    parts = []
+    for statement in statements:
+        first = min(
+            [statement.lineno] + [d.lineno for d in getattr(statement, "decorator_list", [])]
+        )
+        start = position(first, 0)
+        end = position(statement.end_lineno, statement.end_col_offset)
+        cuts: List[Tuple[int, int, bytes]] = []
+        for node in ast.walk(statement):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 continue
-            skip_imports = False
-            body_lines.append(line)
-        return "\n".join(body_lines)
-
-    def _save_files(self, files: List[GeneratedFile], output_dir: str):
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        for file in files:
-            file_path = output_path / file.name
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(file.content)
-                logger.info(f"Saved {file.name} ({len(file.content)} chars)")
-            except Exception as exc:
-                logger.error(f"Failed to save {file.name}: {exc}")
+            body_end = position(node.end_lineno, node.end_col_offset)
+            rest = node.body[1:] if ast.get_docstring(node) is not None else node.body
+            if rest:
+                cut = (position(rest[0].lineno, rest[0].col_offset), body_end, b"...")
+            else:
+                indent = (
+                    node.body[0].col_offset
+                    if node.body[0].lineno > node.lineno
+                    else node.col_offset + 4
+                )
+                cut = (body_end, body_end, b"\n" + b" " * indent + b"...")
+            if not any(outer[0] <= cut[0] and cut[1] <= outer[1] for outer in cuts):
+                cuts.append(cut)
+        text = source[start:end]
+        for cut_start, cut_end, replacement in sorted(cuts, reverse=True):
+            text = text[: cut_start - start] + replacement + text[cut_end - start :]
+        parts.append(text.decode("utf-8"))
+    return "\n".join(parts)
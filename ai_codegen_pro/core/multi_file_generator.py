@@ -3,9 +3,11 @@
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from ..utils.file_writer import write_files
 from ..utils.logger_service import LoggerService
+from .dag_scheduler import topological_order
 
 
 @dataclass
@@ -51,7 +53,21 @@ class MultiFileGenerator:
         project_variables: Dict[str, Any],
         output_path: Optional[Path] = None,
     ) -> Dict[str, str]:
-        """Generate complete project with multiple files"""
+        """Generate complete project with multiple files
+
+        Files are generated after the files listed in their ``dependencies``.
+        """
+        generated_files = dict(self.iter_project(project_type, project_variables))
+
+        if output_path:
+            self._write_project_files(output_path, generated_files)
+
+        return generated_files
+
+    def iter_project(
+        self, project_type: str, project_variables: Dict[str, Any]
+    ) -> Iterator[Tuple[str, str]]:
+        """Yield ``(filename, content)`` for each project file as soon as it is generated"""
 
         if project_type not in self.project_templates:
             raise ValueError(f"Unknown project type: {project_type}")
@@ -59,23 +75,19 @@ class MultiFileGenerator:
         project_spec = self.project_templates[project_type]
         merged_vars = {**project_spec.project_variables, **project_variables}
 
-        generated_files = {}
-
         self.logger.info(
             f"Generating {project_type} project with " f"{len(project_spec.files)} files"
         )
 
-        for file_spec in project_spec.files:
-            self.logger.debug(f"Generating file: {file_spec.filename}")
+        specs = {file_spec.filename: file_spec for file_spec in project_spec.files}
+        for filename in topological_order(
+            {name: spec.dependencies for name, spec in specs.items()}
+        ):
+            file_spec = specs[filename]
+            self.logger.debug(f"Generating file: {filename}")
 
             file_vars = {**merged_vars, **file_spec.variables}
-            content = self._generate_file_content(file_spec, file_vars)
-            generated_files[file_spec.filename] = content
-
-        if output_path:
-            self._write_project_files(output_path, generated_files)
-
-        return generated_files
+            yield filename, self._generate_file_content(file_spec, file_vars)
 
     def _generate_file_content(self, file_spec: FileSpec, variables: Dict[str, Any]) -> str:
         """Generate content for a single file"""
@@ -97,16 +109,11 @@ if __name__ == "__main__":
 
     def _write_project_files(self, output_path: Path, generated_files: Dict[str, str]):
         """Write generated files to disk"""
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        for filename, content in generated_files.items():
-            file_path = output_path / filename
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
-
-            self.logger.debug(f"Written file: {file_path}")
+        result = write_files(output_path, generated_files)
+        if result.failed:
+            name, error = next(iter(result.failed.items()))
+            raise OSError(f"Failed to write {len(result.failed)} files, e.g. {name}: {error}")
+        self.logger.debug(f"Written {len(result.written)} files, {len(result.unchanged)} unchanged")
 
     def _get_fastapi_microservice_spec(self) -> ProjectSpec:
         """Get FastAPI microservice project specification"""
@@ -1,15 +1,44 @@
 """
 OpenRouter API Client with proper error handling and retry logic.
 """
+
+import json
 import logging
-from typing import Dict, List
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.http_transport import HTTPTransport, get_shared_transport
+from ai_codegen_pro.core.rate_limiter import (
+    RateLimiter,
+    estimate_request_tokens,
+    parse_retry_after,
+)
+from ai_codegen_pro.core.response_cache import ResponseCache, request_key
+from ai_codegen_pro.core.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "You are an expert programmer. Generate clean, well-documented, production-ready code."
+)
+
+CACHE_CONTROL_PROVIDERS = ("anthropic/", "google/")
+
 
 class OpenRouterError(Exception):
     """Custom exception for OpenRouter API errors."""
@@ -17,36 +46,404 @@ class OpenRouterError(Exception):
     pass
 
 
+class RateLimitError(OpenRouterError):
+    """Raised when the provider throttles a request (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def supports_cache_control(model: str) -> bool:
+    """Whether ``model`` honours explicit ``cache_control`` breakpoints.
+
+    Other providers (e.g. OpenAI) cache byte-identical prompt prefixes automatically.
+    """
+    return model.startswith(CACHE_CONTROL_PROVIDERS)
+
+
+def build_user_content(
+    prompt: str, model: str, prompt_prefix: Optional[str] = None
+) -> Union[str, List[Dict[str, object]]]:
+    """User message content with ``prompt_prefix`` first, marked cacheable if supported."""
+    if not prompt_prefix:
+        return prompt
+    if not supports_cache_control(model):
+        return prompt_prefix + prompt
+    return [
+        {"type": "text", "text": prompt_prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": prompt},
+    ]
+
+
+def build_chat_payload(
+    prompt: str,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    stream: bool = False,
+    system_prompt: Optional[str] = None,
+    prompt_prefix: Optional[str] = None,
+) -> Dict[str, object]:
+    """Build the chat/completions payload shared by the sync and async clients.
+
+    ``prompt_prefix`` is text shared by many requests (e.g. project context); it is
+    sent ahead of ``prompt`` so provider-side prompt caches can reuse it.
+    """
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt or SYSTEM_PROMPT},
+            {"role": "user", "content": build_user_content(prompt, model, prompt_prefix)},
+        ],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stream": stream,
+    }
+
+
+def extract_content(response: Dict[str, object]) -> str:
+    """Return the completion text of a chat/completions response."""
+    try:
+        return response["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError) as e:
+        raise OpenRouterError(f"Invalid response format: {e}")
+
+
+def completion_key(
+    prompt: str,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    system_prompt: Optional[str] = None,
+    prompt_prefix: Optional[str] = None,
+) -> str:
+    """Response cache key of a (non-streaming) chat completion request."""
+    return request_key(
+        build_chat_payload(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+    )
+
+
+@dataclass
+class CompletionResult:
+    """Completion text with the usage the provider reported for it."""
+
+    content: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    latency: float
+    cached: bool = False
+    cached_tokens: int = 0
+
+    @classmethod
+    def from_usage(
+        cls,
+        content: str,
+        model: str,
+        usage: Optional[Dict[str, object]],
+        latency: float,
+        cached: bool = False,
+    ) -> "CompletionResult":
+        """Build a result from an OpenAI-style usage block.
+
+        ``cached_tokens`` are the prompt tokens the provider served from its prompt cache.
+        """
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        details = usage.get("prompt_tokens_details") or {}
+        return cls(
+            content=content,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=int(usage.get("total_tokens") or prompt_tokens + completion_tokens),
+            latency=latency,
+            cached=cached,
+            cached_tokens=int(details.get("cached_tokens") or 0),
+        )
+
+    @classmethod
+    def from_response(
+        cls,
+        response: Dict[str, object],
+        requested_model: str,
+        latency: float,
+        cached: bool = False,
+    ) -> "CompletionResult":
+        return cls.from_usage(
+            extract_content(response),
+            str(response.get("model") or requested_model),
+            response.get("usage"),
+            latency,
+            cached,
+        )
+
+
+@dataclass
+class ModelListResponse:
+    """Result of a (conditional) request for the model list."""
+
+    models: List[Dict[str, object]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def format_http_error(status_code: int, error_data: object) -> str:
+    """Format an HTTP error status and OpenRouter error body as a message."""
+    error_msg = f"HTTP {status_code}"
+    if isinstance(error_data, dict):
+        error = error_data.get("error", {})
+        msg = error.get("message", "Unknown error") if isinstance(error, dict) else error
+        error_msg += f": {msg}"
+    return error_msg
+
+
+class SSEDecoder:
+    """Incremental decoder turning server-sent-event lines into data payloads."""
+
+    def __init__(self):
+        self.done = False
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[str]:
+        """Feed one line; return the event data once a blank line completes an event."""
+        if not line:
+            return self.flush()
+        if line.startswith(":"):
+            # Comment line, e.g. OpenRouter's ": OPENROUTER PROCESSING" keep-alives
+            return None
+        field_name, _, value = line.partition(":")
+        if field_name == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return buffered data of an unterminated event, if any."""
+        if not self._data:
+            return None
+        data = "\n".join(self._data)
+        self._data = []
+        if data == "[DONE]":
+            self.done = True
+            return None
+        return data
+
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the data payload of every event in a server-sent-event line stream."""
+    decoder = SSEDecoder()
+    for line in lines:
+        data = decoder.feed(line)
+        if data is not None:
+            yield data
+        if decoder.done:
+            return
+    data = decoder.flush()
+    if data is not None:
+        yield data
+
+
+def parse_stream_chunk(data: str) -> Tuple[str, Optional[Dict[str, object]]]:
+    """Return the text delta and the usage block (if present) of one stream chunk."""
+    try:
+        chunk = json.loads(data)
+    except ValueError:
+        logger.debug(f"Ignoring malformed stream chunk: {data[:80]!r}")
+        return "", None
+
+    if "error" in chunk:
+        error = chunk["error"]
+        msg = error.get("message", "Unknown error") if isinstance(error, dict) else error
+        raise OpenRouterError(f"Stream error: {msg}")
+
+    delta = ""
+    choices = chunk.get("choices") or []
+    if choices:
+        delta = (choices[0].get("delta") or {}).get("content") or ""
+    return delta, chunk.get("usage")
+
+
+ChunkParser = Callable[[str], Tuple[str, Optional[Dict[str, object]]]]
+
+
+class CompletionStream:
+    """Iterator over the text deltas of a streamed completion.
+
+    ``usage`` holds the final usage block once the stream has been consumed.
+    ``parser`` turns one event payload into ``(delta, usage)``; providers with a
+    different event format pass their own.
+    """
+
+    def __init__(self, chunks: Iterator[str], parser: Optional[ChunkParser] = None):
+        self.usage: Optional[Dict[str, object]] = None
+        self._chunks = chunks
+        self._parse = parser or parse_stream_chunk
+
+    def __iter__(self) -> "CompletionStream":
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            delta, usage = self._parse(next(self._chunks))
+            if usage:
+                self.usage = usage
+            if delta:
+                return delta
+
+    def __enter__(self) -> "CompletionStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop reading and release the underlying connection."""
+        close = getattr(self._chunks, "close", None)
+        if close:
+            close()
+
+
+class AsyncCompletionStream:
+    """Async iterator over the text deltas of a streamed completion."""
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self.usage: Optional[Dict[str, object]] = None
+        self._chunks = chunks
+
+    def __aiter__(self) -> "AsyncCompletionStream":
+        return self
+
+    async def __anext__(self) -> str:
+        while True:
+            delta, usage = parse_stream_chunk(await self._chunks.__anext__())
+            if usage:
+                self.usage = usage
+            if delta:
+                return delta
+
+    async def aclose(self) -> None:
+        """Stop reading and release the underlying connection."""
+        aclose = getattr(self._chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+
 class OpenRouterClient:
     """Production-ready OpenRouter API client."""
 
     BASE_URL = "https://openrouter.ai/api/v1"
 
-    def __init__(self, api_key: str, timeout: int = 30):
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 30,
+        base_url: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: Optional[int] = None,
+        transport: Optional[HTTPTransport] = None,
+    ):
         self.api_key = api_key
         self.timeout = timeout
-        self.session = self._create_session()
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.cache = cache
+        self.single_flight = single_flight or SingleFlight()
+        # Throttling is per client; the connection pool is shared either way.
+        self.transport = transport or get_shared_transport()
+        self.rate_limiter = self.transport.rate_limiter if rate_limiter is None else rate_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.session = self.transport.session
 
-    def _create_session(self) -> requests.Session:
-        """Create session with retry strategy."""
-        session = requests.Session()
+    def _make_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, object],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, object]:
+        """Make authenticated request with error handling."""
+        # Under a token the body is streamed so cancelling can close the connection.
+        response = self._post(endpoint, payload, cancel_token is not None, cancel_token)
+        with self._abort_on_cancel(response, cancel_token):
+            try:
+                return response.json()
+            except Exception as exc:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise CancelledError(cancel_token.reason) from None
+                raise OpenRouterError(f"Unexpected error: {str(exc)}")
 
-        retry_strategy = Retry(
-            total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST"],
-            backoff_factor=1,
-        )
+    def _stream_request(
+        self,
+        endpoint: str,
+        payload: Dict[str, object],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Iterator[str]:
+        """Make authenticated streaming request, yielding server-sent-event data."""
+        response = self._post(endpoint, payload, stream=True, cancel_token=cancel_token)
+        # text/event-stream defaults to ISO-8859-1 in requests; OpenRouter sends UTF-8
+        response.encoding = "utf-8"
+        with self._abort_on_cancel(response, cancel_token):
+            try:
+                yield from iter_sse_data(response.iter_lines(chunk_size=None, decode_unicode=True))
+            except Exception as exc:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise CancelledError(cancel_token.reason) from None
+                if isinstance(exc, requests.exceptions.RequestException):
+                    raise OpenRouterError(f"Stream interrupted: {exc}")
+                raise
+            finally:
+                response.close()
+            if cancel_token is not None and cancel_token.cancelled:
+                # A closed connection can also end the stream quietly.
+                raise CancelledError(cancel_token.reason)
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+    @staticmethod
+    @contextmanager
+    def _abort_on_cancel(
+        response: requests.Response, cancel_token: Optional[CancellationToken]
+    ) -> Iterator[None]:
+        """Close ``response`` (and its connection) if the token fires meanwhile."""
+        if cancel_token is None:
+            yield
+            return
+        handle = cancel_token.on_cancel(response.close)
+        try:
+            yield
+        finally:
+            cancel_token.remove_callback(handle)
 
-        return session
+    def _post(
+        self,
+        endpoint: str,
+        payload: Dict[str, object],
+        stream: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> requests.Response:
+        """POST to the API through the transport, translating errors to OpenRouterError.
 
-    def _make_request(self, endpoint: str, payload: Dict[str, object]) -> Dict[str, object]:
-        """Make authenticated request with error handling."""
-        url = f"{self.BASE_URL}/{endpoint}"
+        Throttled requests are retried by the transport; a 429 that survives its
+        retries is raised as ``RateLimitError``. With ``cancel_token`` the request
+        timeout is capped by the token's deadline and a cancelled token raises
+        ``CancelledError``.
+        """
+        timeout = self.timeout
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+            remaining = cancel_token.remaining()
+            if remaining is not None:
+                timeout = max(0.001, min(timeout, remaining))
+        url = f"{self.base_url}/{endpoint}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -54,28 +451,42 @@ class OpenRouterClient:
         }
 
         try:
-            response = self.session.post(
+            response = self.transport.post(
                 url,
+                api_key=self.api_key,
+                model=str(payload.get("model") or ""),
+                tokens=estimate_request_tokens(payload),
+                cancel_token=cancel_token,
+                rate_limiter=self.rate_limiter,
+                max_rate_limit_retries=self.max_rate_limit_retries,
                 json=payload,
                 headers=headers,
-                timeout=self.timeout,
+                timeout=timeout,
+                stream=stream,
             )
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+                raise RateLimitError("HTTP 429: Rate limit exceeded", retry_after)
             response.raise_for_status()
-            return response.json()
+            return response
 
+        except (OpenRouterError, CancelledError):
+            raise
         except requests.exceptions.Timeout:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise CancelledError(cancel_token.reason) from None
             raise OpenRouterError("Request timed out")
         except requests.exceptions.ConnectionError:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise CancelledError(cancel_token.reason) from None
             raise OpenRouterError("Connection error")
         except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP {e.response.status_code}"
             try:
                 error_data = e.response.json()
-                msg = error_data.get("error", {}).get("message", "Unknown error")
-                error_msg += f": {msg}"
             except Exception:
-                pass
-            raise OpenRouterError(error_msg)
+                error_data = None
+            raise OpenRouterError(format_http_error(e.response.status_code, error_data))
         except Exception as exc:
             raise OpenRouterError(f"Unexpected error: {str(exc)}")
 
@@ -85,51 +496,254 @@ class OpenRouterClient:
         model: str = "anthropic/claude-3-sonnet-20240229",
         max_tokens: int = 4000,
         temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        on_completion: Optional[Callable[[CompletionResult], None]] = None,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> str:
-        """Generate code using specified model."""
-        system_content = (
-            "You are an expert programmer. Generate clean, "
-            "well-documented, production-ready code."
+        """Generate code using specified model.
+
+        ``on_completion`` receives the full ``CompletionResult`` including usage.
+        """
+        completion = self.generate_completion(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt,
+            use_cache,
+            prompt_prefix,
+            cancel_token,
         )
+        if on_completion is not None:
+            on_completion(completion)
+        return completion.content
 
-        payload = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": system_content,
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "stream": False,
-        }
+    def generate_completion(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> CompletionResult:
+        """Generate code and return it with token usage, latency and serving model.
+
+        With a response cache configured, identical requests are answered from the
+        cache. ``use_cache=False`` skips the lookup but still stores the fresh result.
+        Cancelling ``cancel_token`` aborts the open connection with ``CancelledError``.
+        """
+        payload = build_chat_payload(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+        start = time.monotonic()
+        response, cached = self._complete(payload, use_cache, cancel_token)
+        completion = CompletionResult.from_response(
+            response, model, time.monotonic() - start, cached
+        )
+        logger.info(
+            f"Generated {len(completion.content)} characters of code "
+            f"({completion.prompt_tokens}+{completion.completion_tokens} tokens, "
+            f"{completion.cached_tokens} prompt tokens cached)"
+        )
+        return completion
 
-        logger.info(f"Generating code with model: {model}")
-        response = self._make_request("chat/completions", payload)
+    def _complete(
+        self,
+        payload: Dict[str, object],
+        use_cache: bool = True,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Tuple[Dict[str, object], bool]:
+        """Run a chat completion, consulting the response cache if configured.
+
+        Identical requests issued concurrently share a single upstream call; if that
+        call was cancelled by its own caller, the others run it again under their
+        own tokens. Returns the response and whether it was served from the cache.
+        """
+        key = request_key(payload)
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Cache hit for model: {payload['model']}")
+                return cached, True
+
+        while True:
+            try:
+                response = self.single_flight.do(
+                    key, lambda: self._fetch_completion(key, payload, cancel_token)
+                )
+            except CancelledError:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise
+                logger.debug(f"Shared request for {payload['model']} was cancelled, retrying")
+                continue
+            return response, False
+
+    def _fetch_completion(
+        self,
+        key: str,
+        payload: Dict[str, object],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, object]:
+        logger.info(f"Generating code with model: {payload['model']}")
+        response = self._make_request("chat/completions", payload, cancel_token)
+
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if self.rate_limiter is not None and isinstance(usage, dict):
+            charged = estimate_request_tokens(payload)
+            self.rate_limiter.record_usage(
+                self.api_key, str(payload["model"]), int(usage.get("total_tokens", 0)) - charged
+            )
+
+        if self.cache is not None:
+            extract_content(response)  # never cache malformed responses
+            try:
+                self.cache.put(key, response, model=payload["model"])
+            except Exception as exc:
+                logger.warning(f"Failed to cache response: {exc}")
+        return response
+
+    def can_reuse(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> bool:
+        """Whether ``generate_code`` would answer this from the cache or a shared call."""
+        key = completion_key(prompt, model, max_tokens, temperature, system_prompt, prompt_prefix)
+        return (self.cache is not None and key in self.cache) or self.single_flight.in_flight(key)
 
+    def cache_completion(
+        self,
+        completion: CompletionResult,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> None:
+        """Store a streamed ``completion`` where ``generate_code`` would look it up.
+
+        Streaming requests bypass the cache; callers store their final result here so
+        the same request is answered from the cache next time.
+        """
+        if self.cache is None:
+            return
+        response: Dict[str, object] = {
+            "model": completion.model,
+            "choices": [{"message": {"role": "assistant", "content": completion.content}}],
+        }
+        if completion.total_tokens:
+            response["usage"] = {
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "total_tokens": completion.total_tokens,
+                "prompt_tokens_details": {"cached_tokens": completion.cached_tokens},
+            }
+        key = completion_key(prompt, model, max_tokens, temperature, system_prompt, prompt_prefix)
+        try:
+            self.cache.put(key, response, model=model)
+        except Exception as exc:
+            logger.warning(f"Failed to cache response: {exc}")
+
+    def cached_completion(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> Optional[CompletionResult]:
+        """The cached result of this request, or None if the cache has none."""
+        if self.cache is None:
+            return None
+        key = completion_key(prompt, model, max_tokens, temperature, system_prompt, prompt_prefix)
+        response = self.cache.get(key)
+        if response is None:
+            return None
         try:
-            generated_code = response["choices"][0]["message"]["content"]
-            logger.info(f"Generated {len(generated_code)} characters of code")
-            return generated_code
-        except (KeyError, IndexError) as e:
-            raise OpenRouterError(f"Invalid response format: {e}")
+            return CompletionResult.from_response(response, model, 0.0, cached=True)
+        except OpenRouterError as exc:
+            logger.warning(f"Ignoring malformed cached response: {exc}")
+            return None
+
+    def generate_code_stream(
+        self,
+        prompt: str,
+        model: str = "anthropic/claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> CompletionStream:
+        """Stream generated code as text deltas while the completion is produced.
+
+        Cancelling ``cancel_token`` closes the connection; iteration then raises
+        ``CancelledError``.
+        """
+        payload = build_chat_payload(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            stream=True,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+
+        logger.info(f"Streaming code with model: {model}")
+        return CompletionStream(self._stream_request("chat/completions", payload, cancel_token))
 
     def get_available_models(self) -> List[Dict[str, object]]:
         """Get list of available models."""
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/models",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json().get("data", [])
+            return self.fetch_models().models
         except Exception as exc:
             logger.error(f"Failed to fetch models: {exc}")
             return []
 
+    def fetch_models(
+        self, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> ModelListResponse:
+        """Fetch the model list, revalidating with ``etag`` / ``last_modified`` if given."""
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        try:
+            response = self.transport.get(
+                f"{self.base_url}/models", headers=headers, timeout=self.timeout
+            )
+            if response.status_code == 304:
+                return ModelListResponse([], etag, last_modified, not_modified=True)
+            response.raise_for_status()
+            return ModelListResponse(
+                models=response.json().get("data", []),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        except requests.exceptions.RequestException as exc:
+            raise OpenRouterError(f"Failed to fetch models: {exc}")
+        except ValueError as exc:
+            raise OpenRouterError(f"Invalid response format: {exc}")
+
     def check_connection(self) -> bool:
         """Test API connectivity."""
         try:
@@ -0,0 +1,33 @@
+"""
+Model providers sharing one pooled HTTP transport.
+"""
+
+from typing import Dict, Type
+
+from ai_codegen_pro.core.providers.anthropic_provider import AnthropicProvider
+from ai_codegen_pro.core.providers.base import ModelProvider, ProviderError
+from ai_codegen_pro.core.providers.openrouter_provider import OpenRouterProvider
+
+PROVIDERS: Dict[str, Type[ModelProvider]] = {
+    OpenRouterProvider.name: OpenRouterProvider,
+    AnthropicProvider.name: AnthropicProvider,
+}
+
+
+def create_provider(name: str, api_key: str, **kwargs) -> ModelProvider:
+    """Instantiate the provider registered under ``name``."""
+    try:
+        provider_cls = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown provider: {name}")
+    return provider_cls(api_key, **kwargs)
+
+
+__all__ = [
+    "AnthropicProvider",
+    "ModelProvider",
+    "OpenRouterProvider",
+    "PROVIDERS",
+    "ProviderError",
+    "create_provider",
+]
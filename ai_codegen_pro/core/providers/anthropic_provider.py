@@ -0,0 +1,220 @@
+"""
+Anthropic Messages API backend for the provider interface.
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from ai_codegen_pro.core.http_transport import HTTPTransport
+from ai_codegen_pro.core.openrouter_client import (
+    CompletionResult,
+    CompletionStream,
+    iter_sse_data,
+)
+from ai_codegen_pro.core.providers.base import ModelProvider, ProviderError
+from ai_codegen_pro.core.rate_limiter import estimate_request_tokens
+
+logger = logging.getLogger(__name__)
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+ANTHROPIC_MODELS = [
+    "claude-3-opus-20240229",
+    "claude-3-sonnet-20240229",
+    "claude-3-haiku-20240307",
+    "claude-2.1",
+    "claude-2.0",
+]
+
+
+def normalize_usage(usage: Dict[str, object]) -> Dict[str, object]:
+    """Convert Messages API usage to an OpenAI-style usage block.
+
+    Anthropic reports cache reads and writes separately from ``input_tokens``; all
+    three count as prompt tokens, and cache reads are reported as cached tokens.
+    """
+    cache_read = int(usage.get("cache_read_input_tokens") or 0)
+    prompt_tokens = (
+        int(usage.get("input_tokens") or 0)
+        + cache_read
+        + int(usage.get("cache_creation_input_tokens") or 0)
+    )
+    completion_tokens = int(usage.get("output_tokens") or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": cache_read},
+    }
+
+
+class AnthropicStreamParser:
+    """Turn Messages API stream events into ``(delta, usage)`` pairs.
+
+    Input tokens arrive with ``message_start`` and output tokens with
+    ``message_delta``; the parser combines both into an OpenAI-style usage block.
+    """
+
+    def __init__(self):
+        self.usage: Dict[str, object] = {}
+
+    def __call__(self, data: str) -> Tuple[str, Optional[Dict[str, object]]]:
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.debug(f"Ignoring malformed stream event: {data[:80]!r}")
+            return "", None
+
+        kind = event.get("type")
+        if kind == "error":
+            error = event.get("error") or {}
+            raise ProviderError(f"Stream error: {error.get('message', 'Unknown error')}")
+        if kind == "content_block_delta":
+            return (event.get("delta") or {}).get("text") or "", None
+        if kind == "message_start":
+            self.usage.update((event.get("message") or {}).get("usage") or {})
+            return "", normalize_usage(self.usage)
+        if kind == "message_delta":
+            self.usage.update(event.get("usage") or {})
+            return "", normalize_usage(self.usage)
+        return "", None
+
+
+class AnthropicProvider(ModelProvider):
+    """Direct access to Anthropic's Messages API."""
+
+    name = "anthropic"
+    BASE_URL = "https://api.anthropic.com/v1"
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 60,
+        base_url: Optional[str] = None,
+        transport: Optional[HTTPTransport] = None,
+    ):
+        super().__init__(api_key, timeout, base_url, transport)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
+    def _payload(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: Optional[float],
+        system_prompt: Optional[str],
+        prompt_prefix: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, object]:
+        content: object = prompt
+        if prompt_prefix:
+            content = [
+                {"type": "text", "text": prompt_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": prompt},
+            ]
+        payload: Dict[str, object] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": content}],
+        }
+        # Left out unless given, so the API applies its own defaults.
+        if system_prompt is not None:
+            payload["system"] = system_prompt
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _post(self, payload: Dict[str, object], stream: bool = False) -> requests.Response:
+        headers = {
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+        }
+        try:
+            response = self.transport.post(
+                f"{self.base_url}/messages",
+                api_key=self.api_key,
+                model=str(payload["model"]),
+                tokens=estimate_request_tokens(payload),
+                json=payload,
+                headers=headers,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except requests.exceptions.Timeout:
+            raise ProviderError("Request timed out")
+        except requests.exceptions.RequestException as exc:
+            raise ProviderError(f"Connection error: {exc}")
+
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error", {}).get("message", "Unknown error")
+            except ValueError:
+                message = response.text[:200]
+            response.close()
+            raise ProviderError(f"HTTP {response.status_code}: {message}")
+        return response
+
+    def complete(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionResult:
+        payload = self._payload(
+            prompt, model, max_tokens, temperature, system_prompt, prompt_prefix
+        )
+        start = time.monotonic()
+        response = self._post(payload)
+        try:
+            data = response.json()
+            content = "".join(
+                block.get("text", "")
+                for block in data["content"]
+                if block.get("type", "text") == "text"
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ProviderError(f"Invalid response format: {exc}")
+
+        return CompletionResult.from_usage(
+            content,
+            str(data.get("model") or model),
+            normalize_usage(data.get("usage") or {}),
+            time.monotonic() - start,
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionStream:
+        payload = self._payload(
+            prompt, model, max_tokens, temperature, system_prompt, prompt_prefix, stream=True
+        )
+        return CompletionStream(self._stream_events(payload), parser=AnthropicStreamParser())
+
+    def _stream_events(self, payload: Dict[str, object]) -> Iterator[str]:
+        response = self._post(payload, stream=True)
+        response.encoding = "utf-8"
+        try:
+            yield from iter_sse_data(response.iter_lines(chunk_size=None, decode_unicode=True))
+        except requests.exceptions.RequestException as exc:
+            raise ProviderError(f"Stream interrupted: {exc}")
+        finally:
+            response.close()
+
+    def list_models(self) -> List[str]:
+        return list(ANTHROPIC_MODELS)
@@ -0,0 +1,72 @@
+"""
+Common interface for model backends sharing one pooled HTTP transport.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from ai_codegen_pro.core.http_transport import HTTPTransport, get_shared_transport
+from ai_codegen_pro.core.openrouter_client import (
+    CompletionResult,
+    CompletionStream,
+    OpenRouterError,
+)
+
+
+class ProviderError(OpenRouterError):
+    """Error raised by a provider backend.
+
+    Derives from ``OpenRouterError`` so existing error handling covers every provider.
+    """
+
+    pass
+
+
+class ModelProvider(ABC):
+    """A model backend: blocking completions, streamed completions and a model list."""
+
+    name = ""
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 60,
+        base_url: Optional[str] = None,
+        transport: Optional[HTTPTransport] = None,
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.base_url = base_url
+        self.transport = transport or get_shared_transport()
+
+    @abstractmethod
+    def complete(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionResult:
+        """Return the full completion together with token usage and latency.
+
+        ``prompt_prefix`` is sent ahead of ``prompt`` and marked for provider-side
+        prompt caching where the backend supports it.
+        """
+
+    @abstractmethod
+    def stream(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionStream:
+        """Stream the completion as text deltas."""
+
+    @abstractmethod
+    def list_models(self) -> List[str]:
+        """Return the ids of the models this provider serves."""
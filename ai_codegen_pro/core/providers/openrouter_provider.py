@@ -0,0 +1,75 @@
+"""
+OpenRouter backend for the provider interface.
+"""
+
+from typing import List, Optional
+
+from ai_codegen_pro.core.http_transport import HTTPTransport
+from ai_codegen_pro.core.openrouter_client import (
+    CompletionResult,
+    CompletionStream,
+    OpenRouterClient,
+)
+from ai_codegen_pro.core.providers.base import ModelProvider
+
+
+class OpenRouterProvider(ModelProvider):
+    """Provider adapter around ``OpenRouterClient``."""
+
+    name = "openrouter"
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 60,
+        base_url: Optional[str] = None,
+        transport: Optional[HTTPTransport] = None,
+        **client_options,
+    ):
+        super().__init__(api_key, timeout, base_url, transport)
+        self.client = OpenRouterClient(
+            api_key,
+            timeout=timeout,
+            base_url=base_url,
+            transport=self.transport,
+            **client_options,
+        )
+
+    def complete(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionResult:
+        return self.client.generate_completion(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.1,
+        system_prompt: Optional[str] = None,
+        prompt_prefix: Optional[str] = None,
+    ) -> CompletionStream:
+        return self.client.generate_code_stream(
+            prompt,
+            model,
+            max_tokens,
+            temperature,
+            system_prompt=system_prompt,
+            prompt_prefix=prompt_prefix,
+        )
+
+    def list_models(self) -> List[str]:
+        return [str(model.get("id", "")) for model in self.client.get_available_models()]
@@ -0,0 +1,265 @@
+"""
+Client-side token-bucket rate limiting per API key and model.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Mapping, Optional, Tuple
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (about four characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def estimate_request_tokens(payload: Mapping[str, object]) -> int:
+    """Estimate the prompt tokens of a chat/completions payload."""
+    total = 0
+    for message in payload.get("messages") or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content)
+        total += estimate_tokens(str(content))
+    return total
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse reset durations like ``1s``, ``6m0s`` or ``20ms``."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+@dataclass
+class RateLimit:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """Token bucket refilling continuously up to ``capacity``.
+
+    The level may go negative when actual usage exceeds what was reserved; callers
+    then wait until the debt has been refilled.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, now: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.level = capacity
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self.level = min(self.capacity, self.level + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def consume(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+
+class _Scope:
+    def __init__(self, limit: RateLimit, now: float):
+        self.requests = (
+            TokenBucket(limit.requests_per_minute, limit.requests_per_minute / 60.0, now)
+            if limit.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(limit.tokens_per_minute, limit.tokens_per_minute / 60.0, now)
+            if limit.tokens_per_minute
+            else None
+        )
+        self.blocked_until = 0.0
+        self.queue: Deque[object] = deque()
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        wait = max(0.0, self.blocked_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def consume(self, tokens: int, now: float) -> None:
+        if self.requests is not None:
+            self.requests.consume(1, now)
+        if self.tokens is not None and tokens:
+            self.tokens.consume(tokens, now)
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute limiter keyed by API key and model.
+
+    Every request must pass both the key-wide limit and the limit of its model.
+    Callers waiting on the same key and model are served strictly first come, first
+    served. Provider feedback (``Retry-After`` and rate-limit headers) pauses the
+    affected scope until the advertised reset instead of letting callers retry early.
+    """
+
+    def __init__(
+        self,
+        default_limit: Optional[RateLimit] = None,
+        model_limits: Optional[Dict[str, RateLimit]] = None,
+        key_limit: Optional[RateLimit] = None,
+        clock=time.monotonic,
+    ):
+        self.default_limit = default_limit or RateLimit()
+        self.model_limits = dict(model_limits or {})
+        self.key_limit = key_limit or RateLimit()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._scopes: Dict[Tuple[str, Optional[str]], _Scope] = {}
+
+    def _scope(self, api_key: str, model: Optional[str]) -> _Scope:
+        scope = self._scopes.get((api_key, model))
+        if scope is None:
+            if model is None:
+                limit = self.key_limit
+            else:
+                limit = self.model_limits.get(model, self.default_limit)
+            scope = _Scope(limit, self._clock())
+            self._scopes[(api_key, model)] = scope
+        return scope
+
+    def acquire(
+        self,
+        api_key: str,
+        model: str,
+        tokens: int = 0,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> float:
+        """Block until a request of ``tokens`` estimated tokens may be sent.
+
+        Returns the number of seconds spent waiting. Cancelling ``cancel_token``
+        ends the wait with ``CancelledError`` without consuming anything.
+        """
+        ticket = object()
+        start = self._clock()
+        handle = cancel_token.on_cancel(self._wake) if cancel_token is not None else None
+        with self._cond:
+            key_scope = self._scope(api_key, None)
+            model_scope = self._scope(api_key, model)
+            model_scope.queue.append(ticket)
+            try:
+                while True:
+                    if cancel_token is not None and cancel_token.cancelled:
+                        raise CancelledError(cancel_token.reason)
+                    timeout = None
+                    if model_scope.queue[0] is ticket:
+                        now = self._clock()
+                        timeout = max(
+                            key_scope.wait_time(tokens, now), model_scope.wait_time(tokens, now)
+                        )
+                        if timeout <= 0:
+                            key_scope.consume(tokens, now)
+                            model_scope.consume(tokens, now)
+                            waited = now - start
+                            if waited > 0.01:
+                                logger.debug(f"Rate limiter delayed {model} by {waited:.2f}s")
+                            return waited
+                    self._cond.wait(timeout)
+            finally:
+                model_scope.queue.remove(ticket)
+                self._cond.notify_all()
+                if handle is not None:
+                    cancel_token.remove_callback(handle)
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def record_usage(self, api_key: str, model: str, tokens: int) -> None:
+        """Charge tokens not covered by the estimate passed to ``acquire``.
+
+        Negative values refund an overestimate.
+        """
+        if not tokens:
+            return
+        with self._cond:
+            now = self._clock()
+            for scope in (self._scope(api_key, None), self._scope(api_key, model)):
+                if scope.tokens is not None:
+                    scope.tokens.consume(tokens, now)
+            self._cond.notify_all()
+
+    def penalize(self, api_key: str, model: Optional[str], seconds: float) -> None:
+        """Pause all requests for the scope for ``seconds``."""
+        with self._cond:
+            scope = self._scope(api_key, model)
+            scope.blocked_until = max(scope.blocked_until, self._clock() + seconds)
+            self._cond.notify_all()
+        logger.info(f"Rate limited: pausing {model or 'key'} for {seconds:.1f}s")
+
+    def update_from_headers(self, api_key: str, model: str, headers: Mapping[str, str]) -> None:
+        """Apply ``Retry-After`` and rate-limit headers from a provider response."""
+        if not headers:
+            return
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after:
+            self.penalize(api_key, model, retry_after)
+
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = headers.get(f"x-ratelimit-reset-{kind}")
+            if remaining is not None and reset and _is_exhausted(remaining):
+                seconds = _parse_duration(reset)
+                if seconds:
+                    self.penalize(api_key, None, seconds)
+
+        # OpenRouter reports the key-wide window with an epoch-milliseconds reset.
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset and _is_exhausted(remaining):
+            try:
+                seconds = float(reset) / 1000.0 - time.time()
+            except ValueError:
+                seconds = 0.0
+            if seconds > 0:
+                self.penalize(api_key, None, seconds)
+
+
+def _is_exhausted(remaining: str) -> bool:
+    try:
+        return float(remaining) <= 0
+    except ValueError:
+        return False
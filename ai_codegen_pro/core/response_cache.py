@@ -0,0 +1,185 @@
+"""
+Persistent, content-addressed cache for chat/completions responses.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".ai_codegen_pro" / "cache" / "responses.sqlite3"
+
+
+def request_key(payload: Dict[str, object]) -> str:
+    """Hash the parts of a chat/completions payload that determine its output."""
+    material = {
+        "model": payload.get("model"),
+        "messages": payload.get("messages"),
+        "temperature": payload.get("temperature"),
+        "max_tokens": payload.get("max_tokens"),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    entries: int
+    bytes: int
+    hit_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """SQLite-backed response cache with size- and age-based eviction.
+
+    Entries are keyed by ``request_key`` and hold the raw response JSON. Entries older
+    than ``max_age`` seconds are never served; once the stored payloads exceed
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._hit_bytes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        """Return the cached response for ``key`` or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[2], now):
+                self._misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._hits += 1
+            self._hit_bytes += row[1]
+        return json.loads(row[0])
+
+    def __contains__(self, key: str) -> bool:
+        """Whether ``key`` has a live entry; unlike ``get`` this is not counted as a lookup."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and not self._expired(row[0], time.time())
+
+    def put(self, key: str, response: Dict[str, object], model: Optional[str] = None) -> None:
+        """Store ``response`` under ``key`` and evict entries beyond the size limit."""
+        data = json.dumps(response, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, data, size, now, now),
+            )
+            self._stores += 1
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Remove expired entries and shrink the cache to ``max_bytes``."""
+        with self._lock:
+            removed = self._evict_locked(time.time())
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> CacheStats:
+        """Return hit/miss counters of this instance and the current cache size."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                stores=self._stores,
+                evictions=self._evictions,
+                entries=entries,
+                bytes=total,
+                hit_bytes=self._hit_bytes,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.max_age is not None and now - created > self.max_age
+
+    def _evict_locked(self, now: float) -> int:
+        removed = 0
+        if self.max_age is not None:
+            removed += self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.max_age,)
+            ).rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed ASC"
+            ).fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            removed += len(stale)
+
+        if removed:
+            self._evictions += removed
+            logger.debug(f"Evicted {removed} cached responses")
+        return removed
@@ -0,0 +1,115 @@
+"""
+Single-flight request coalescing: concurrent calls with the same key share one execution.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int
+    executions: int
+    collapsed: int
+    in_flight: int
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-based coalescing layer.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in flight
+    block and receive the same result or exception. Once the call completes the key
+    is released, so later calls execute again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._total = 0
+        self._executions = 0
+        self._collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+            else:
+                self._collapsed += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as exc:
+                call.error = exc
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._total,
+                executions=self._executions,
+                collapsed=self._collapsed,
+                in_flight=len(self._calls),
+            )
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of ``SingleFlight`` for use within one event loop.
+
+    Cancelling one waiter does not cancel the shared execution for the others.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, "asyncio.Future"] = {}
+        self._total = 0
+        self._executions = 0
+        self._collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self._total += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self._executions += 1
+        else:
+            self._collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._total,
+            executions=self._executions,
+            collapsed=self._collapsed,
+            in_flight=len(self._tasks),
+        )
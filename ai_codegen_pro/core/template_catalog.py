@@ -0,0 +1,131 @@
+"""
+Index of the templates available on disk, kept without compiling them.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+_IGNORED_SUFFIXES = (".py", ".pyc", ".tmp")
+
+
+@dataclass
+class TemplateEntry:
+    """A template file as of the scan that found it."""
+
+    name: str
+    path: Path
+    mtime_ns: int
+    size: int
+
+
+class TemplateCatalog:
+    """Name -> file index over one or more template directories.
+
+    The directories are scanned once; afterwards only a directory whose own mtime
+    changed (a file was added, removed or renamed in it) is rescanned, and those
+    checks run at most every ``check_interval`` seconds. Earlier search paths win
+    for names that exist in several, as with Jinja's ``FileSystemLoader``. Hidden
+    entries, ``__pycache__`` and Python files are not templates.
+    """
+
+    def __init__(self, search_paths: Sequence[Union[str, Path]], check_interval: float = 1.0):
+        self.search_paths = [Path(path) for path in search_paths]
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._directories: Dict[Path, int] = {}
+        self._files: Dict[Path, Dict[str, TemplateEntry]] = {}
+        self._entries: Dict[str, TemplateEntry] = {}
+        self._checked = 0.0
+        self.scans = 0
+
+    def get(self, name: str) -> Optional[TemplateEntry]:
+        self._refresh()
+        with self._lock:
+            return self._entries.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def names(self) -> List[str]:
+        self._refresh()
+        with self._lock:
+            return sorted(self._entries)
+
+    def invalidate(self) -> None:
+        """Check the directories again on the next lookup."""
+        with self._lock:
+            self._checked = 0.0
+
+    def _refresh(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._checked and now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            changed = False
+            for directory, mtime in list(self._directories.items()):
+                if self._directories.get(directory) != mtime:
+                    continue  # already rescanned with a changed parent
+                if _mtime(directory) != mtime:
+                    changed = True
+                    self._rescan(directory)
+            for root in self.search_paths:
+                if root not in self._directories and _mtime(root) is not None:
+                    changed = True
+                    self._scan(root, root)
+            if changed:
+                self._rebuild()
+
+    def _rescan(self, directory: Path) -> None:
+        """Forget ``directory`` and everything below it, then scan it again."""
+        for known in [d for d in self._directories if d == directory or directory in d.parents]:
+            del self._directories[known]
+            self._files.pop(known, None)
+        root = next((r for r in self.search_paths if r == directory or r in directory.parents))
+        self._scan(root, directory)
+
+    def _scan(self, root: Path, directory: Path) -> None:
+        self.scans += 1
+        mtime = _mtime(directory)
+        if mtime is None:
+            return
+        self._directories[directory] = mtime
+        files: Dict[str, TemplateEntry] = {}
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.name.startswith(".") or item.name == "__pycache__":
+                        continue
+                    if item.is_dir():
+                        self._scan(root, Path(item.path))
+                    elif item.is_file() and not item.name.endswith(_IGNORED_SUFFIXES):
+                        path = Path(item.path)
+                        stat = item.stat()
+                        name = path.relative_to(root).as_posix()
+                        files[name] = TemplateEntry(name, path, stat.st_mtime_ns, stat.st_size)
+        except OSError as exc:
+            logger.warning(f"Cannot scan template directory {directory}: {exc}")
+        self._files[directory] = files
+
+    def _rebuild(self) -> None:
+        entries: Dict[str, TemplateEntry] = {}
+        for root in reversed(self.search_paths):
+            for directory, files in self._files.items():
+                if directory == root or root in directory.parents:
+                    entries.update(files)
+        self._entries = entries
+        logger.debug(f"Template catalog holds {len(entries)} templates")
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
@@ -2,12 +2,51 @@
 Template Service based on Jinja2 with custom filters.
 """
 
+import io
 import logging
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import (
+    ChoiceLoader,
+    DictLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    TemplateNotFound,
+    meta,
+)
+from jinja2.bccache import Bucket
+
+from ai_codegen_pro.core.template_catalog import TemplateCatalog
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "templates"
+DEFAULT_CACHE_DIR = Path.home() / ".ai_codegen_pro" / "template_cache"
+# Compiled templates kept in memory per environment, least recently used evicted first.
+COMPILED_TEMPLATE_CACHE_SIZE = 1000
+# With processes > 1, render_many fans out to worker processes from this many contexts on.
+PARALLEL_RENDER_THRESHOLD = 200
+# Streamed output is written in pieces of about this many characters.
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def snake_case(value: str) -> str:
     import re
@@ -26,19 +65,161 @@ def pascal_case(value: str) -> str:
     return "".join(x.title() for x in components)
 
 
+class MtimeBytecodeCache(FileSystemBytecodeCache):
+    """On-disk bytecode cache whose entries stay valid while the template file keeps
+    its modification time and size, so a warm start neither hashes nor compiles.
+
+    Templates without a file fall back to Jinja's source checksum. ``compiled``
+    counts templates that had to be compiled, ``hits`` those loaded from disk.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        super().__init__(str(directory), "__ai_codegen_%s.cache")
+        self.compiled = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def get_bucket(
+        self, environment: Environment, name: str, filename: Optional[str], source: str
+    ) -> Bucket:
+        bucket = Bucket(
+            environment, self.get_cache_key(name, filename), self._checksum(filename, source)
+        )
+        self.load_bytecode(bucket)
+        if bucket.code is not None:
+            with self._lock:
+                self.hits += 1
+        return bucket
+
+    def set_bucket(self, bucket: Bucket) -> None:
+        with self._lock:
+            self.compiled += 1
+        super().set_bucket(bucket)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as exc:
+            logger.warning(f"Cannot write template bytecode cache: {exc}")
+
+    def _checksum(self, filename: Optional[str], source: str) -> str:
+        if filename:
+            try:
+                stat = os.stat(filename)
+                return f"{stat.st_mtime_ns}:{stat.st_size}"
+            except OSError:
+                pass
+        return self.get_source_checksum(source)
+
+
+_environments: Dict[Tuple[str, str], Environment] = {}
+_catalogs: Dict[str, TemplateCatalog] = {}
+_environments_lock = threading.Lock()
+
+
+def shared_environment(
+    template_path: Union[str, Path, None] = None, cache_dir: Union[str, Path, None] = None
+) -> Environment:
+    """The process-wide Jinja environment for ``template_path``.
+
+    Every ``TemplateService`` over the same directory shares one environment, so a
+    template is compiled at most once per process, and with a usable ``cache_dir``
+    at most once across processes until the file changes.
+
+    Its loader looks up templates registered from strings first and the files in
+    ``template_path`` second, so a registered template shadows a file of the same name.
+    """
+    template_path = _resolve(template_path)
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    key = (str(template_path), str(cache_dir))
+    with _environments_lock:
+        env = _environments.get(key)
+        if env is None:
+            env = Environment(
+                loader=ChoiceLoader([DictLoader({}), FileSystemLoader(str(template_path))]),
+                bytecode_cache=_bytecode_cache(cache_dir),
+                cache_size=COMPILED_TEMPLATE_CACHE_SIZE,
+            )
+            env.filters["snake_case"] = snake_case
+            env.filters["camel_case"] = camel_case
+            env.filters["pascal_case"] = pascal_case
+            _environments[key] = env
+        return env
+
+
+def shared_catalog(template_path: Union[str, Path, None] = None) -> TemplateCatalog:
+    """The process-wide index of the template files in ``template_path``."""
+    template_path = _resolve(template_path)
+    with _environments_lock:
+        catalog = _catalogs.get(str(template_path))
+        if catalog is None:
+            catalog = _catalogs[str(template_path)] = TemplateCatalog([template_path])
+        return catalog
+
+
+def _resolve(template_path: Union[str, Path, None]) -> Path:
+    return Path(template_path or DEFAULT_TEMPLATE_PATH).resolve()
+
+
+def _bytecode_cache(cache_dir: Path) -> Optional[MtimeBytecodeCache]:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        logger.warning(f"Template bytecode cache disabled, cannot create {cache_dir}: {exc}")
+        return None
+    return MtimeBytecodeCache(cache_dir)
+
+
 class TemplateService:
-    def __init__(self, template_path: str = "ai_codegen_pro/templates"):
-        self.env = Environment(loader=FileSystemLoader(template_path))
-        self.env.filters["snake_case"] = snake_case
-        self.env.filters["camel_case"] = camel_case
-        self.env.filters["pascal_case"] = pascal_case
+    def __init__(
+        self,
+        template_path: Union[str, Path, None] = None,
+        cache_dir: Union[str, Path, None] = None,
+    ):
+        self.template_path = template_path
+        self.cache_dir = cache_dir
+        self.env = shared_environment(template_path, cache_dir)
+        self.catalog = shared_catalog(template_path)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Templates compiled versus loaded from the bytecode cache in this process."""
+        cache = self.env.bytecode_cache
+        if not isinstance(cache, MtimeBytecodeCache):
+            return {"compiled": 0, "hits": 0}
+        with cache._lock:
+            return {"compiled": cache.compiled, "hits": cache.hits}
+
+    def register_template(self, name: str, source: str) -> None:
+        """Make ``source`` available as template ``name`` to every service on this directory.
+
+        Re-registering a name replaces its source; the compiled template is refreshed
+        on its next use.
+        """
+        self._registered()[name] = source
+        logger.debug(f"Registered template {name}")
+
+    def _registered(self) -> Dict[str, str]:
+        return self.env.loader.loaders[0].mapping
 
     def template_exists(self, template_name: str) -> bool:
+        """Whether ``template_name`` is registered or indexed, without compiling it."""
+        return template_name in self._registered() or template_name in self.catalog
+
+    def list_all_templates(self) -> List[str]:
+        return sorted(set(self._registered()) | set(self.catalog.names()))
+
+    def template_source(self, template_name: str) -> Optional[str]:
         try:
-            self.env.get_template(template_name)
-            return True
+            return self.env.loader.get_source(self.env, template_name)[0]
         except TemplateNotFound:
-            return False
+            return None
+
+    def template_variables(self, template_name: str) -> List[str]:
+        """Names of the variables a template reads from its context."""
+        source = self.template_source(template_name)
+        if source is None:
+            return []
+        return sorted(meta.find_undeclared_variables(self.env.parse(source)))
 
     def render_template(self, template_name: str, context: dict) -> str:
         try:
@@ -47,3 +228,143 @@ class TemplateService:
         except Exception as e:
             logger.error(f"Template rendering error for {template_name}: {e}")
             raise
+
+    def stream_template(
+        self, template_name: str, context: dict, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[str]:
+        """Render ``template_name`` piece by piece, joining Jinja's output events into
+        chunks of about ``chunk_size`` characters, so the full text is never held."""
+        try:
+            template = self.env.get_template(template_name)
+        except Exception as e:
+            logger.error(f"Template rendering error for {template_name}: {e}")
+            raise
+        pending: List[str] = []
+        size = 0
+        for piece in template.generate(**context):
+            pending.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(pending)
+                pending = []
+                size = 0
+        if pending:
+            yield "".join(pending)
+
+    def render_to(
+        self,
+        template_name: str,
+        context: dict,
+        target: Union[str, Path, IO, Any],
+        encoding: str = "utf-8",
+    ) -> int:
+        """Stream the rendered template into ``target`` and return the characters written.
+
+        ``target`` is a file path, a text or binary file object (a zip entry from
+        ``ZipFile.open(name, "w")`` works too), or a socket, which receives the
+        encoded chunks through ``sendall``.
+        """
+        if isinstance(target, (str, Path)):
+            with open(target, "w", encoding=encoding) as f:
+                return self.render_to(template_name, context, f, encoding)
+        write = _chunk_writer(target, encoding)
+        written = 0
+        for chunk in self.stream_template(template_name, context):
+            write(chunk)
+            written += len(chunk)
+        return written
+
+    def render_to_zip(
+        self,
+        template_name: str,
+        context: dict,
+        archive: zipfile.ZipFile,
+        arcname: str,
+        encoding: str = "utf-8",
+    ) -> int:
+        """Stream the rendered template into a new entry ``arcname`` of ``archive``."""
+        with archive.open(arcname, "w", force_zip64=True) as entry:
+            return self.render_to(template_name, context, entry, encoding)
+
+    def render_many(
+        self,
+        template_name: str,
+        contexts: Iterable[Dict[str, Any]],
+        processes: int = 1,
+        threshold: int = PARALLEL_RENDER_THRESHOLD,
+        chunksize: int = 16,
+    ) -> Iterator[str]:
+        """Render ``template_name`` once per context, yielding results in order.
+
+        The template is looked up and compiled once and rendered in-process by
+        default. With ``processes > 1`` a sequence of at least ``threshold`` contexts
+        is rendered on that many worker processes, which load the compiled template
+        from the bytecode cache; the contexts must then be picklable. Starting the
+        pool costs tens of milliseconds, so this only pays off for templates that
+        take around a millisecond or more per render; small templates are faster
+        in-process even for thousands of contexts.
+        """
+        try:
+            template = self.env.get_template(template_name)
+        except Exception as e:
+            logger.error(f"Template rendering error for {template_name}: {e}")
+            raise
+        if processes > 1 and isinstance(contexts, Sequence) and len(contexts) >= threshold:
+            yield from self._render_in_processes(template_name, contexts, processes, chunksize)
+            return
+        for context in contexts:
+            yield template.render(**context)
+
+    def _render_in_processes(
+        self,
+        template_name: str,
+        contexts: Sequence[Dict[str, Any]],
+        processes: int,
+        chunksize: int,
+    ) -> Iterator[str]:
+        logger.debug(
+            f"Rendering {len(contexts)} contexts of {template_name} in {processes} processes"
+        )
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_render_worker,
+            initargs=(self.template_path, self.cache_dir, dict(self._registered())),
+        )
+        futures = [
+            executor.submit(_render_in_worker, template_name, contexts[start : start + chunksize])
+            for start in range(0, len(contexts), chunksize)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()  # a consumer that stops early skips the remaining chunks
+            executor.shutdown(wait=True)
+
+
+def _chunk_writer(target: Any, encoding: str) -> Callable[[str], Any]:
+    if hasattr(target, "sendall"):
+        return lambda chunk: target.sendall(chunk.encode(encoding))
+    if isinstance(target, io.TextIOBase):
+        return target.write
+    return lambda chunk: target.write(chunk.encode(encoding))
+
+
+_worker_service: Optional[TemplateService] = None
+
+
+def _init_render_worker(
+    template_path: Union[str, Path, None],
+    cache_dir: Union[str, Path, None],
+    registered: Dict[str, str],
+) -> None:
+    global _worker_service
+    _worker_service = TemplateService(template_path, cache_dir)
+    for name, source in registered.items():
+        _worker_service.register_template(name, source)
+
+
+def _render_in_worker(template_name: str, contexts: Sequence[Dict[str, Any]]) -> List[str]:
+    template = _worker_service.env.get_template(template_name)
+    return [template.render(**context) for context in contexts]
@@ -4,6 +4,7 @@ import traceback
 from PySide6.QtCore import QThread, Signal, Slot
 from PySide6.QtWidgets import (
     QApplication,
+    QComboBox,
     QFileDialog,
     QHBoxLayout,
     QLabel,
@@ -16,12 +17,19 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from ai_codegen_pro.core.multi_file_codegen import GenerationResult, MultiFileCodeGenerator
+from ai_codegen_pro.core.cancellation import CancellationToken
+from ai_codegen_pro.core.multi_file_codegen import (
+    ComponentFailure,
+    GenerationResult,
+    MultiFileCodeGenerator,
+)
+from ai_codegen_pro.gui.model_loader_thread import ModelLoaderThread
 from ai_codegen_pro.utils.exporter import export_project_as_zip
 
 
 class CodeGenWorker(QThread):
     progress_signal = Signal(int)
+    file_signal = Signal(object)
     result_signal = Signal(object)
     error_signal = Signal(str)
 
@@ -29,26 +37,38 @@ class CodeGenWorker(QThread):
         super().__init__()
         self.api_key = api_key
         self.project_spec = project_spec
+        self.cancel_token = CancellationToken()
+
+    def cancel(self):
+        """Abort open requests; run() then emits the partial result."""
+        self.cancel_token.cancel("vom Benutzer abgebrochen")
 
     def run(self):
         try:
             generator = MultiFileCodeGenerator(self.api_key)
             self.progress_signal.emit(10)
-            result: GenerationResult = generator.generate_project(self.project_spec)
-            self.progress_signal.emit(100)
-            self.result_signal.emit(result)
+            total = max(1, len(self.project_spec.get("components", [])))
+            done = 0
+            for item in generator.iter_project(self.project_spec, cancel_token=self.cancel_token):
+                if isinstance(item, GenerationResult):
+                    self.progress_signal.emit(100)
+                    self.result_signal.emit(item)
+                else:
+                    done += 1
+                    self.progress_signal.emit(10 + 90 * done // total)
+                    self.file_signal.emit(item)
         except Exception as e:
             tb = traceback.format_exc()
             self.error_signal.emit(f"Fehler bei Code-Generierung:\n{e}\n{tb}")
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, api_key=None):
         super().__init__()
         self.setWindowTitle("AI CodeGen Pro")
         self.resize(800, 600)
 
-        self.api_key = None
+        self.api_key = api_key
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -58,6 +78,12 @@ class MainWindow(QMainWindow):
         self.status_label = QLabel("Status: Bereit")
         vbox.addWidget(self.status_label)
 
+        model_layout = QHBoxLayout()
+        vbox.addLayout(model_layout)
+        model_layout.addWidget(QLabel("Verfügbare Modelle:"))
+        self.model_combo = QComboBox()
+        model_layout.addWidget(self.model_combo, 1)
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
         vbox.addWidget(self.progress_bar)
@@ -73,6 +99,11 @@ class MainWindow(QMainWindow):
         self.gen_button.clicked.connect(self.on_generate_clicked)
         btn_layout.addWidget(self.gen_button)
 
+        self.cancel_button = QPushButton("Abbrechen")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.on_cancel_clicked)
+        btn_layout.addWidget(self.cancel_button)
+
         self.export_button = QPushButton("Als ZIP exportieren")
         self.export_button.setEnabled(False)
         self.export_button.clicked.connect(self.on_export_clicked)
@@ -81,6 +112,11 @@ class MainWindow(QMainWindow):
         self.generated_files = []
         self.worker = None
 
+        # Shows the cached catalog at once and refreshes it in the background.
+        self.model_loader = ModelLoaderThread(api_key=self.api_key)
+        self.model_loader.models_loaded.connect(self.on_models_loaded)
+        self.model_loader.start()
+
     def on_generate_clicked(self):
         if not self.api_key:
             QMessageBox.warning(
@@ -94,6 +130,7 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(0)
         self.output_edit.clear()
         self.gen_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.export_button.setEnabled(False)
         self.generated_files = []
 
@@ -114,32 +151,70 @@ class MainWindow(QMainWindow):
 
         self.worker = CodeGenWorker(self.api_key, project_spec)
         self.worker.progress_signal.connect(self.progress_bar.setValue)
+        self.worker.file_signal.connect(self.on_file_generated)
         self.worker.result_signal.connect(self.on_generation_done)
         self.worker.error_signal.connect(self.on_generation_error)
         self.worker.start()
 
+    def on_cancel_clicked(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.status_label.setText("Status: Breche ab...")
+            self.cancel_button.setEnabled(False)
+            self.worker.cancel()
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait(5000)
+        if self.model_loader.isRunning():
+            self.model_loader.wait(5000)
+        super().closeEvent(event)
+
+    @Slot(list)
+    def on_models_loaded(self, models):
+        current = self.model_combo.currentText()
+        self.model_combo.clear()
+        self.model_combo.addItems([model["name"] for model in models])
+        if current:
+            self.model_combo.setCurrentText(current)
+
+    @Slot(object)
+    def on_file_generated(self, item):
+        if isinstance(item, ComponentFailure):
+            self.output_edit.append(f"Fehler: {item.message}\n{'-'*40}")
+            return
+        self.generated_files.append(item)
+        self.status_label.setText(f"Status: {item.name} generiert")
+        self.output_edit.append(f"Datei: {item.name}\n{item.content}\n{'-'*40}")
+
     @Slot(object)
     def on_generation_done(self, result: GenerationResult):
-        self.status_label.setText("Status: Fertig")
+        self.status_label.setText("Status: Abgebrochen" if result.cancelled else "Status: Fertig")
         self.progress_bar.setValue(100)
         self.gen_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         self.generated_files = result.files
 
         if result.success:
             self.output_edit.append("=== Generation erfolgreich! ===")
-            for file in result.files:
-                self.output_edit.append(f"Datei: {file.name}\n{file.content}\n{'-'*40}")
+            self.output_edit.append(
+                f"Tokens: {result.prompt_tokens} Prompt / "
+                f"{result.completion_tokens} Completion ({result.total_tokens} gesamt, "
+                f"{result.cached_tokens} Prompt-Tokens aus dem Cache)"
+            )
             self.export_button.setEnabled(True)
         else:
             self.output_edit.append("=== Fehler bei der Generation: ===")
             for err in result.errors:
                 self.output_edit.append(err)
-            self.export_button.setEnabled(False)
+            # Partial results of a cancelled run can still be exported.
+            self.export_button.setEnabled(result.cancelled and bool(result.files))
 
     @Slot(str)
     def on_generation_error(self, error_msg):
         self.status_label.setText("Status: Fehler")
         self.gen_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         self.export_button.setEnabled(False)
 
         dlg = QMessageBox(self)
@@ -170,10 +245,9 @@ class MainWindow(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
-    window = MainWindow()
     import os
 
-    window.api_key = os.getenv("OPENROUTER_API_KEY")
+    window = MainWindow(os.getenv("OPENROUTER_API_KEY"))
     window.show()
     sys.exit(app.exec())
 
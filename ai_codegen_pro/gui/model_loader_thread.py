@@ -1,28 +1,53 @@
 import logging
-import time
 
 from PySide6.QtCore import QThread, Signal
 
+from ai_codegen_pro.core.model_catalog import FALLBACK_MODEL_IDS, ModelCatalog
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient
+
 log = logging.getLogger(__name__)
 
 
+def _as_entries(catalog: ModelCatalog):
+    return [
+        {
+            "name": model.id,
+            "provider": model.provider,
+            "context_length": model.context_length,
+            "prompt_price": model.prompt_price,
+        }
+        for model in catalog.models()
+    ]
+
+
+def _fallback_entries():
+    return [
+        {"name": model_id, "provider": model_id.split("/", 1)[0]} for model_id in FALLBACK_MODEL_IDS
+    ]
+
+
 class ModelLoaderThread(QThread):
+    """Emit the cached model catalog at once, then again after a background refresh."""
+
     models_loaded = Signal(list)
 
-    def __init__(self, model_source=None):
+    def __init__(self, model_source=None, api_key=None):
         super().__init__()
         self.model_source = model_source
+        self.api_key = api_key
 
     def run(self):
         log.info("ModelLoaderThread gestartet")
         try:
-            time.sleep(1)
-            dummy_models = [
-                {"name": "openai/gpt-4", "provider": "OpenAI"},
-                {"name": "mistral-7b", "provider": "OpenRouter"},
-                {"name": "deepseek-coder", "provider": "DeepSeek"},
-            ]
-            self.models_loaded.emit(dummy_models)
+            catalog = self.model_source or ModelCatalog(
+                OpenRouterClient(self.api_key) if self.api_key else None
+            )
+            if catalog.load_cached():
+                self.models_loaded.emit(_as_entries(catalog))
+            if catalog.refresh():
+                self.models_loaded.emit(_as_entries(catalog))
+            elif not catalog.models():
+                self.models_loaded.emit(_fallback_entries())
         except Exception as e:
             log.error(f"Fehler beim Laden der Modelle: {e}")
-            self.models_loaded.emit([])
+            self.models_loaded.emit(_fallback_entries())
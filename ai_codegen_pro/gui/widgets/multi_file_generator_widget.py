@@ -5,6 +5,7 @@ from typing import Any, Dict
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
+    QApplication,
     QCheckBox,
     QComboBox,
     QFormLayout,
@@ -220,17 +221,17 @@ class MultiFileGeneratorWidget(QWidget):
         variables = self.get_project_variables()
 
         try:
-            # Generate project files
-            files = self.generator.generate_project_structure(project_type, variables)
-
-            # Update UI
-            self.generated_files = files
-            self.update_files_table()
+            # Fill the table live while the files are generated
+            self.clear_results()
+            for filename, content in self.generator.iter_project(project_type, variables):
+                self.generated_files[filename] = content
+                self.add_file_row(filename)
+                QApplication.processEvents()
 
             QMessageBox.information(
                 self,
                 "Erfolg",
-                f"Projekt erfolgreich generiert!\n{len(files)} Dateien erstellt.",
+                f"Projekt erfolgreich generiert!\n{len(self.generated_files)} Dateien erstellt.",
             )
 
         except Exception as e:
@@ -244,6 +245,13 @@ class MultiFileGeneratorWidget(QWidget):
             self.files_table.setItem(row, 0, QTableWidgetItem(filename))
             self.files_table.setItem(row, 1, QTableWidgetItem("✅ Generiert"))
 
+    def add_file_row(self, filename: str):
+        """Append a single generated file to the files table"""
+        row = self.files_table.rowCount()
+        self.files_table.insertRow(row)
+        self.files_table.setItem(row, 0, QTableWidgetItem(filename))
+        self.files_table.setItem(row, 1, QTableWidgetItem("✅ Generiert"))
+
     def on_file_selected(self):
         """Handle file selection in table"""
         selected_items = self.files_table.selectedItems()
@@ -2,8 +2,8 @@
 
 from typing import List
 
-import requests
-
+from ...core.providers.anthropic_provider import ANTHROPIC_MODELS, AnthropicProvider
+from ...core.providers.base import ProviderError
 from ..base import ModelPlugin, PluginMetadata
 
 
@@ -13,7 +13,8 @@ class AnthropicModelPlugin(ModelPlugin):
     def __init__(self):
         super().__init__()
         self.api_key = None
-        self.base_url = "https://api.anthropic.com/v1"
+        self.base_url = AnthropicProvider.BASE_URL
+        self.provider = None
 
     @property
     def metadata(self) -> PluginMetadata:
@@ -42,99 +43,48 @@ class AnthropicModelPlugin(ModelPlugin):
 
     def cleanup(self) -> None:
         self.api_key = None
+        self.provider = None
         self.logger.info("Anthropic Plugin bereinigt")
 
     def get_available_models(self) -> List[str]:
-        return [
-            "claude-3-opus-20240229",
-            "claude-3-sonnet-20240229",
-            "claude-3-haiku-20240307",
-            "claude-2.1",
-            "claude-2.0",
-        ]
+        return list(ANTHROPIC_MODELS)
 
-    def generate_code(self, model: str, prompt: str, **kwargs) -> str:
-        """Generiert Code mit Anthropic Claude"""
+    def _get_provider(self) -> AnthropicProvider:
         if not self.api_key:
             raise Exception("Anthropic API Key nicht konfiguriert")
+        if self.provider is None or self.provider.api_key != self.api_key:
+            self.provider = AnthropicProvider(self.api_key, base_url=self.base_url)
+        return self.provider
 
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-        }
-
-        data = {
-            "model": model,
-            "max_tokens": kwargs.get("max_tokens", 2048),
-            "messages": [{"role": "user", "content": prompt}],
-        }
-
-        # System prompt falls vorhanden
-        if "system_prompt" in kwargs:
-            data["system"] = kwargs["system_prompt"]
-
-        # Weitere Parameter
-        if "temperature" in kwargs:
-            data["temperature"] = kwargs["temperature"]
-
-        response = requests.post(
-            f"{self.base_url}/messages", headers=headers, json=data, timeout=60
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"Anthropic API Fehler: {response.text}")
-
-        result = response.json()
-        return result["content"][0]["text"]
+    def generate_code(self, model: str, prompt: str, **kwargs) -> str:
+        """Generiert Code mit Anthropic Claude"""
+        provider = self._get_provider()
+        try:
+            result = provider.complete(
+                prompt,
+                model,
+                max_tokens=kwargs.get("max_tokens", 2048),
+                temperature=kwargs.get("temperature"),
+                system_prompt=kwargs.get("system_prompt"),
+            )
+        except ProviderError as e:
+            raise Exception(f"Anthropic API Fehler: {e}")
+        return result.content
 
     def supports_streaming(self) -> bool:
         return True
 
     def generate_code_stream(self, model: str, prompt: str, **kwargs):
         """Generiert Code als Stream"""
-        if not self.api_key:
-            raise Exception("Anthropic API Key nicht konfiguriert")
-
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-        }
-
-        data = {
-            "model": model,
-            "max_tokens": kwargs.get("max_tokens", 2048),
-            "messages": [{"role": "user", "content": prompt}],
-            "stream": True,
-        }
-
-        if "system_prompt" in kwargs:
-            data["system"] = kwargs["system_prompt"]
-
-        if "temperature" in kwargs:
-            data["temperature"] = kwargs["temperature"]
-
-        with requests.post(
-            f"{self.base_url}/messages",
-            headers=headers,
-            json=data,
-            stream=True,
-            timeout=120,
-        ) as response:
-            if response.status_code != 200:
-                raise Exception(f"Anthropic API Fehler: {response.text}")
-
-            for line in response.iter_lines(decode_unicode=True):
-                if line.startswith("data: "):
-                    try:
-                        import json
-
-                        data = json.loads(line[6:])
-
-                        if data.get("type") == "content_block_delta":
-                            delta = data.get("delta", {})
-                            if "text" in delta:
-                                yield delta["text"]
-                    except Exception:
-                        continue
+        provider = self._get_provider()
+        try:
+            with provider.stream(
+                prompt,
+                model,
+                max_tokens=kwargs.get("max_tokens", 2048),
+                temperature=kwargs.get("temperature"),
+                system_prompt=kwargs.get("system_prompt"),
+            ) as stream:
+                yield from stream
+        except ProviderError as e:
+            raise Exception(f"Anthropic API Fehler: {e}")
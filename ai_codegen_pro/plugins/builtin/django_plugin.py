@@ -1,6 +1,6 @@
 """Django Plugin für AI CodeGen Pro"""
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from ...core.template_service import TemplateService
 from ...utils.logger_service import LoggerService
@@ -52,6 +52,20 @@ class DjangoPlugin(BasePlugin):
 
         return self.template_service.render_template("django_model", template_vars)
 
+    def generate_models(self, models: Dict[str, Dict[str, str]], **kwargs) -> Iterator[str]:
+        """Mehrere Django Models in einem Batch generieren (Reihenfolge wie ``models``)"""
+        contexts = [
+            {
+                "model_name": model_name,
+                "fields": fields,
+                "meta_options": kwargs.get("meta_options", {}),
+                "imports": kwargs.get("imports", []),
+            }
+            for model_name, fields in models.items()
+        ]
+
+        return self.template_service.render_many("django_model", contexts)
+
     def generate_view(self, view_type: str, model_name: str, **kwargs) -> str:
         """Django View generieren"""
         template_vars = {
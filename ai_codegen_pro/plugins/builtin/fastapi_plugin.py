@@ -1,6 +1,6 @@
 """FastAPI Plugin für AI CodeGen Pro"""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 from ...core.template_service import TemplateService
 from ...utils.logger_service import LoggerService
@@ -62,6 +62,22 @@ class FastAPIPlugin(BasePlugin):
 
         return self.template_service.render_template("fastapi_model", template_vars)
 
+    def generate_pydantic_models(
+        self, models: Dict[str, Dict[str, str]], **kwargs
+    ) -> Iterator[str]:
+        """Mehrere Pydantic Models in einem Batch generieren (Reihenfolge wie ``models``)"""
+        contexts = [
+            {
+                "model_name": model_name,
+                "fields": fields,
+                "base_model": kwargs.get("base_model", "BaseModel"),
+                "config": kwargs.get("config", {}),
+            }
+            for model_name, fields in models.items()
+        ]
+
+        return self.template_service.render_many("fastapi_model", contexts)
+
     def generate_router(self, router_name: str, endpoints: List[Dict], **kwargs) -> str:
         """FastAPI Router generieren"""
         template_vars = {
@@ -0,0 +1,182 @@
+"""
+Shared fixtures: a local stand-in for the OpenRouter (and Anthropic) HTTP API.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (timeouts, cancellation) are expected in tests.
+        pass
+
+
+class StubOpenRouter:
+    """Minimal OpenRouter stand-in that echoes prompts and records requests.
+
+    ``/messages`` answers in the Anthropic Messages API format.
+    """
+
+    def __init__(self):
+        self.delay = 0.0
+        self.model_delays = {}
+        self.stream_delay = 0.0
+        self.throttle_count = 0
+        self.retry_after = "0.1"
+        self.requests = []
+        self.client_ports = set()
+        self.models = [{"id": "stub/model", "name": "Stub Model", "context_length": 8192}]
+        self.models_etag = '"v1"'
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.server = _QuietServer(("127.0.0.1", 0), self._handler_class())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def completion(self, payload):
+        prompt = payload["messages"][-1]["content"]
+        return {
+            "id": "gen-stub",
+            "model": payload.get("model"),
+            "choices": [{"message": {"role": "assistant", "content": f"echo: {prompt}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+
+    def stream_events(self, payload):
+        text = self.completion(payload)["choices"][0]["message"]["content"]
+        for word in text.split(" "):
+            yield {"choices": [{"delta": {"content": word + " "}}]}
+        yield {
+            "choices": [{"delta": {}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
+
+    def anthropic_message(self, payload):
+        prompt = payload["messages"][-1]["content"]
+        return {
+            "id": "msg-stub",
+            "type": "message",
+            "model": payload.get("model"),
+            "content": [{"type": "text", "text": f"echo: {prompt}"}],
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }
+
+    def anthropic_events(self, payload):
+        text = self.anthropic_message(payload)["content"][0]["text"]
+        yield {"type": "message_start", "message": {"usage": {"input_tokens": 10}}}
+        for word in text.split(" "):
+            yield {
+                "type": "content_block_delta",
+                "delta": {"type": "text_delta", "text": word + " "},
+            }
+        yield {"type": "message_delta", "usage": {"output_tokens": 5}}
+        yield {"type": "message_stop"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_chunk(self, data):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_stream(self, events):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._send_chunk(b": OPENROUTER PROCESSING\n\n")
+                for event in events:
+                    time.sleep(stub.stream_delay)
+                    self._send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self._send_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                if self.path.endswith("/models"):
+                    with stub._lock:
+                        stub.requests.append({"path": self.path, "headers": dict(self.headers)})
+                    if self.headers.get("If-None-Match") == stub.models_etag:
+                        self.send_response(304)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                    else:
+                        self._send_json(200, {"data": stub.models}, {"ETag": stub.models_etag})
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append({"path": self.path, "payload": payload})
+                    stub.client_ports.add(self.client_address[1])
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                try:
+                    time.sleep(stub.model_delays.get(payload.get("model"), stub.delay))
+                    with stub._lock:
+                        throttled = stub.throttle_count > 0
+                        stub.throttle_count -= int(throttled)
+                    if throttled:
+                        self._send_json(
+                            429,
+                            {"error": {"message": "Rate limit exceeded"}},
+                            {"Retry-After": stub.retry_after},
+                        )
+                    elif self.path.endswith("/messages"):
+                        if payload.get("stream"):
+                            self._send_stream(stub.anthropic_events(payload))
+                        else:
+                            self._send_json(200, stub.anthropic_message(payload))
+                    elif not self.path.endswith("/chat/completions"):
+                        self._send_json(404, {"error": {"message": "Not found"}})
+                    elif payload.get("stream"):
+                        self._send_stream(stub.stream_events(payload))
+                    else:
+                        self._send_json(200, stub.completion(payload))
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+        return Handler
+
+
+@pytest.fixture
+def openrouter_stub():
+    stub = StubOpenRouter()
+    stub.start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,138 @@
+"""
+Tests for the asyncio OpenRouter client against a local stand-in server.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_codegen_pro.core.async_openrouter_client import AsyncOpenRouterClient
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.openrouter_client import OpenRouterError, RateLimitError
+from ai_codegen_pro.core.rate_limiter import RateLimiter
+
+
+def test_generate_code(openrouter_stub):
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            return await client.generate_code("hello", model="stub/model")
+
+    assert asyncio.run(scenario()) == "echo: hello"
+    payload = openrouter_stub.requests[0]["payload"]
+    assert payload["model"] == "stub/model"
+    assert payload["stream"] is False
+
+
+def test_get_available_models(openrouter_stub):
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            return await client.get_available_models()
+
+    assert asyncio.run(scenario()) == openrouter_stub.models
+
+
+def test_concurrency_limit(openrouter_stub):
+    openrouter_stub.delay = 0.05
+
+    async def scenario():
+        async with AsyncOpenRouterClient(
+            "test-key", base_url=openrouter_stub.base_url, max_concurrency=3
+        ) as client:
+            return await asyncio.gather(
+                *(client.generate_code(f"p{i}", model="stub/model") for i in range(9))
+            )
+
+    results = asyncio.run(scenario())
+    assert results == [f"echo: p{i}" for i in range(9)]
+    assert openrouter_stub.peak == 3
+
+
+def test_per_request_timeout(openrouter_stub):
+    openrouter_stub.delay = 0.5
+
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            await client.generate_code("slow", timeout=0.05)
+
+    with pytest.raises(OpenRouterError, match="timed out"):
+        asyncio.run(scenario())
+
+
+def test_http_error_is_wrapped(openrouter_stub):
+    async def scenario():
+        client = AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url + "/missing")
+        try:
+            await client._request("POST", "nowhere", {})
+        finally:
+            await client.aclose()
+
+    with pytest.raises(OpenRouterError, match="HTTP 404: Not found"):
+        asyncio.run(scenario())
+
+
+def test_throttled_requests_are_retried_through_rate_limiter(openrouter_stub):
+    openrouter_stub.throttle_count = 2
+    limiter = RateLimiter()
+
+    async def scenario():
+        async with AsyncOpenRouterClient(
+            "test-key", base_url=openrouter_stub.base_url, rate_limiter=limiter
+        ) as client:
+            return await client.generate_code("hi", model="stub/model")
+
+    start = time.monotonic()
+    assert asyncio.run(scenario()) == "echo: hi"
+    assert time.monotonic() - start >= 0.2
+    assert len(openrouter_stub.requests) == 3
+
+
+def test_gives_up_after_max_rate_limit_retries(openrouter_stub):
+    openrouter_stub.throttle_count = 5
+    openrouter_stub.retry_after = "0"
+
+    async def scenario():
+        async with AsyncOpenRouterClient(
+            "test-key", base_url=openrouter_stub.base_url, max_rate_limit_retries=1
+        ) as client:
+            await client.generate_code("hi")
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(scenario())
+    assert len(openrouter_stub.requests) == 2
+
+
+def test_cancel_token_abandons_request(openrouter_stub):
+    openrouter_stub.delay = 3.0
+    token = CancellationToken()
+
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            timer = threading.Timer(0.2, token.cancel)
+            timer.start()
+            try:
+                await client.generate_code("slow", cancel_token=token)
+            finally:
+                timer.cancel()
+
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        asyncio.run(scenario())
+    assert time.monotonic() - start < 1.0
+
+
+def test_cancel_token_stops_stream(openrouter_stub):
+    openrouter_stub.stream_delay = 0.5
+    token = CancellationToken()
+
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            stream = client.generate_code_stream("one two three four five", cancel_token=token)
+            async for _ in stream:
+                token.cancel()
+
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        asyncio.run(scenario())
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from ai_codegen_pro.core.budget import BudgetExceededError, GenerationBudget
+
+
+def test_reservations_count_until_reconciled():
+    budget = GenerationBudget(max_tokens=1000)
+    first = budget.reserve("m", 100, 400)
+    reserved = []
+
+    waiter = threading.Thread(target=lambda: reserved.append(budget.reserve("m", 100, 500)))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive()  # fits the spend, but not next to the open reservation
+
+    budget.reconcile(first, 100, 50)
+    waiter.join(1)
+
+    assert not waiter.is_alive()
+    assert not budget.exhausted
+    assert budget.spent.tokens == 150
+    assert budget.reserved.tokens == 600
+
+
+def test_overrun_on_actual_spend_exhausts_the_budget():
+    budget = GenerationBudget(max_tokens=1000)
+    budget.reconcile(budget.reserve("m", 100, 400), 100, 800)
+
+    with pytest.raises(BudgetExceededError):
+        budget.reserve("m", 100, 100)
+    assert budget.exhausted
+    with pytest.raises(BudgetExceededError):
+        budget.reserve("m", 1, 1)  # stays exhausted once a reservation was refused
+
+
+def test_release_returns_the_reservation():
+    budget = GenerationBudget(max_requests=1)
+    budget.release(budget.reserve("m", 10, 10))
+
+    budget.reserve("m", 10, 10)
+
+    assert budget.reserved.requests == 1
+    assert budget.spent.requests == 0
+
+
+def test_cost_limit_uses_per_token_prices():
+    budget = GenerationBudget(max_cost=0.01, prices={"m": (0.000001, 0.000002)})
+    reservation = budget.reserve("m", 1000, 4000)
+    assert reservation.cost == pytest.approx(0.009)
+
+    budget.reconcile(reservation, 1000, 500)
+    assert budget.spent.cost == pytest.approx(0.002)
+
+    with pytest.raises(BudgetExceededError, match="cost"):
+        budget.reserve("m", 1000, 4000)
+
+
+def test_unpriced_models_are_free():
+    budget = GenerationBudget(max_cost=0.0)
+
+    assert budget.reserve("unknown/model", 100, 100).cost == 0.0
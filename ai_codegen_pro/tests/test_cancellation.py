@@ -0,0 +1,124 @@
+"""
+Tests for cancellation tokens and their use by the client and scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.dag_scheduler import DAGScheduler
+from ai_codegen_pro.core.multi_file_codegen import MultiFileCodeGenerator
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient
+
+
+def test_cancel_runs_callbacks_once_and_propagates_to_children():
+    parent = CancellationToken()
+    child = CancellationToken(parent=parent)
+    calls = []
+    child.on_cancel(lambda: calls.append("child"))
+    removed = child.on_cancel(lambda: calls.append("removed"))
+    child.remove_callback(removed)
+
+    parent.cancel("stop")
+    parent.cancel("again")
+
+    assert child.cancelled and child.reason == "stop"
+    assert calls == ["child"]
+    with pytest.raises(CancelledError):
+        child.raise_if_cancelled()
+
+
+def test_deadline_cancels_token():
+    token = CancellationToken(timeout=0.05)
+    fired = threading.Event()
+    token.on_cancel(fired.set)
+
+    assert fired.wait(1)
+    assert token.reason == "deadline exceeded"
+    assert token.remaining() == 0.0
+
+
+def test_cancel_aborts_open_stream(openrouter_stub):
+    openrouter_stub.stream_delay = 0.2
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+    token = CancellationToken()
+    stream = client.generate_code_stream("one two three four five six", cancel_token=token)
+    next(stream)
+
+    start = time.monotonic()
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(CancelledError):
+        list(stream)
+
+    assert time.monotonic() - start < 0.5
+
+
+def test_deadline_bounds_blocking_request(openrouter_stub):
+    openrouter_stub.delay = 2.0
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        client.generate_code("hello", cancel_token=CancellationToken(timeout=0.2))
+
+    assert time.monotonic() - start < 1.0
+
+
+def test_scheduler_drops_unfinished_nodes_on_cancel():
+    token = CancellationToken()
+
+    def task(node, upstream):
+        if node == "slow":
+            time.sleep(1)
+        else:
+            token.cancel()
+        return node
+
+    start = time.monotonic()
+    outcomes = dict(
+        DAGScheduler(max_workers=2).iter_run(
+            {"slow": [], "fast": [], "after_slow": ["slow"]}, task, token
+        )
+    )
+
+    assert time.monotonic() - start < 0.8
+    assert outcomes["fast"] == "fast"
+    assert isinstance(outcomes["slow"], CancelledError)
+    assert isinstance(outcomes["after_slow"], CancelledError)
+
+
+def test_cancel_aborts_request_waiting_for_headers(openrouter_stub):
+    openrouter_stub.delay = 3.0
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        client.generate_code("hello", cancel_token=token)
+
+    assert time.monotonic() - start < 1.0
+    openrouter_stub.delay = 0.0
+    assert client.generate_code("again") == "echo: again"  # the pool is still usable
+
+
+def test_sequential_generation_cancels_promptly(openrouter_stub):
+    openrouter_stub.delay = 3.0
+    generator = MultiFileCodeGenerator("key")  # max_workers=1 runs nodes inline
+    generator.openrouter.base_url = openrouter_stub.base_url
+    spec = {
+        "name": "p",
+        "type": "python",
+        "components": [{"name": "a", "type": "module"}, {"name": "b", "type": "module"}],
+    }
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+
+    start = time.monotonic()
+    result = generator.generate_project(spec, cancel_token=token)
+
+    assert result.cancelled
+    assert result.files == []
+    assert time.monotonic() - start < 1.0
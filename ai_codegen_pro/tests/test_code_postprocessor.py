@@ -0,0 +1,140 @@
+from ai_codegen_pro.core.code_postprocessor import CodePostProcessor, process_code
+from ai_codegen_pro.core.template_service import TemplateService
+
+FENCED = '''Here is the module:
+
+```python
+"""Greeting helpers."""
+
+# standard library
+import os
+from typing import (
+    Dict,
+    List,
+)
+from pathlib import \\
+    Path
+
+
+def greet(name):
+    return f"Hello {name}"
+```
+
+Let me know if you need anything else.
+'''
+
+
+def test_strips_fences_and_surrounding_prose():
+    processed = process_code(FENCED)
+
+    assert processed.fenced
+    assert processed.language == "python"
+    assert not processed.code.startswith("Here")
+    assert "```" not in processed.code
+    assert "Let me know" not in processed.code
+    assert processed.code.startswith('"""Greeting helpers."""')
+
+
+def test_multi_line_imports_stay_together():
+    processed = process_code(FENCED)
+
+    assert processed.imports == (
+        "# standard library\n"
+        "import os\n"
+        "from typing import (\n"
+        "    Dict,\n"
+        "    List,\n"
+        ")\n"
+        "from pathlib import \\\n"
+        "    Path"
+    )
+    assert processed.docstring == "Greeting helpers."
+    assert processed.body == '\n\ndef greet(name):\n    return f"Hello {name}"\n'
+
+
+def test_sections_rebuild_the_code():
+    processed = process_code(FENCED)
+    start = FENCED.index('"""')
+    end = FENCED.rindex("```")
+
+    assert processed.code == FENCED[start:end]
+
+
+def test_multi_line_docstring_text():
+    processed = process_code('#!/usr/bin/env python\n"""\nFirst.\n\nSecond.\n"""\nx = 1\n')
+
+    assert processed.docstring == "\nFirst.\n\nSecond.\n"
+    assert processed.preamble == "#!/usr/bin/env python"
+    assert processed.imports == ""
+    assert processed.body == "x = 1\n"
+
+
+def test_leading_comments_stay_out_of_imports():
+    code = (
+        "#!/usr/bin/env python\n"
+        "# -*- coding: utf-8 -*-\n"
+        "# Copyright header\n"
+        "\n"
+        "# standard library\n"
+        "import os\n"
+        "\n"
+        "print(os.name)\n"
+    )
+    processed = process_code(code)
+
+    assert processed.preamble == (
+        "#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n# Copyright header"
+    )
+    assert processed.imports == "# standard library\nimport os"
+    assert processed.code == code
+    assert process_code("#!/usr/bin/env python\nimport os\n").imports == "import os"
+    assert process_code("#!/usr/bin/env python\nx = 1\n").body == "x = 1\n"
+
+
+def test_rendered_module_keeps_shebang_first():
+    processed = process_code("#!/usr/bin/env python\nimport os\n\nprint(os.name)\n")
+    rendered = TemplateService().render_template(
+        "python_module.j2",
+        {
+            "name": "tool",
+            "preamble": processed.preamble,
+            "docstring": processed.docstring,
+            "imports": processed.imports,
+            "body": processed.body,
+        },
+    )
+
+    assert rendered.startswith("#!/usr/bin/env python\n# tool.py\n")
+    assert rendered.index('"""') < rendered.index("import os")
+
+
+def test_incremental_feeding_matches_one_pass():
+    processor = CodePostProcessor()
+    for start in range(0, len(FENCED), 3):
+        processor.feed(FENCED[start : start + 3])
+
+    assert processor.finish() == process_code(FENCED)
+
+
+def test_unfenced_output_is_kept_whole():
+    processed = process_code("import os\n\nprint(os.name)\n")
+
+    assert not processed.fenced
+    assert processed.code == "import os\n\nprint(os.name)\n"
+    assert processed.imports == "import os"
+    assert processed.body == "\nprint(os.name)\n"
+
+
+def test_detects_language_without_a_hint():
+    assert process_code("#!/bin/bash\nset -e\necho hi\n").language == "bash"
+    assert process_code("package main\n\nfunc main() {}\n").language == "go"
+    assert process_code("const fs = require('fs');\n").language == "javascript"
+    assert process_code("```js\nimport x from 'x';\n```\n").language == "javascript"
+
+
+def test_other_languages_have_no_import_split():
+    processed = process_code("import fs from 'fs';\nexport default fs;\n", "node")
+
+    assert processed.language == "javascript"
+    assert processed.imports == ""
+    assert processed.body.startswith("import fs from 'fs';")
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from ai_codegen_pro.core.dag_scheduler import (
+    CycleError,
+    DAGScheduler,
+    DependencyFailedError,
+    topological_order,
+)
+
+
+def test_topological_order_respects_dependencies_and_input_order():
+    graph = {"app": ["db", "config"], "db": ["config"], "config": [], "cli": []}
+
+    order = topological_order(graph)
+
+    assert order.index("config") < order.index("db") < order.index("app")
+    assert order == ["config", "db", "app", "cli"]
+
+
+def test_cycle_is_reported_with_its_path():
+    with pytest.raises(CycleError) as info:
+        topological_order({"a": ["b"], "b": ["c"], "c": ["a"], "d": []})
+
+    assert info.value.cycle == ["a", "b", "c", "a"]
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(KeyError):
+        topological_order({"a": ["missing"]})
+
+
+def test_cycle_detected_before_any_task_runs():
+    calls = []
+    with pytest.raises(CycleError):
+        DAGScheduler(max_workers=4).run(
+            {"ok": [], "a": ["b"], "b": ["a"]}, lambda node, upstream: calls.append(node)
+        )
+    assert calls == []
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_upstream_results_are_passed_to_dependents(workers):
+    graph = {"c": ["a", "b"], "a": [], "b": ["a"]}
+
+    outcomes = DAGScheduler(max_workers=workers).run(
+        graph, lambda node, upstream: node + "".join(sorted(upstream.values()))
+    )
+
+    assert outcomes == {"c": "caba", "a": "a", "b": "ba"}
+    assert list(outcomes) == ["c", "a", "b"]
+
+
+def test_dependent_starts_as_soon_as_its_inputs_finish():
+    started = {}
+    begin = time.monotonic()
+    delays = {"fast": 0.01, "slow": 0.2, "after_fast": 0.01}
+
+    def task(node, upstream):
+        started[node] = time.monotonic() - begin
+        time.sleep(delays[node])
+        return node
+
+    DAGScheduler(max_workers=3).run({"fast": [], "slow": [], "after_fast": ["fast"]}, task)
+
+    assert started["after_fast"] < 0.15
+
+
+def test_independent_nodes_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=2)
+
+    def task(node, upstream):
+        barrier.wait()
+        return node
+
+    outcomes = DAGScheduler(max_workers=3).run({"a": [], "b": [], "c": []}, task)
+    assert outcomes == {"a": "a", "b": "b", "c": "c"}
+
+
+def test_failures_propagate_to_dependents_only():
+    def task(node, upstream):
+        if node == "bad":
+            raise RuntimeError("boom")
+        return node
+
+    outcomes = DAGScheduler(max_workers=2).run(
+        {"bad": [], "child": ["bad"], "grandchild": ["child"], "other": []}, task
+    )
+
+    assert isinstance(outcomes["bad"], RuntimeError)
+    assert isinstance(outcomes["child"], DependencyFailedError)
+    assert outcomes["grandchild"].dependency == "child"
+    assert outcomes["other"] == "other"
+
+
+def test_iter_run_yields_nodes_as_they_finish():
+    def task(node, upstream):
+        time.sleep({"slow": 0.2}.get(node, 0))
+        return node
+
+    finished = [
+        node
+        for node, _ in DAGScheduler(max_workers=2).iter_run(
+            {"slow": [], "fast": [], "after_fast": ["fast"]}, task
+        )
+    ]
+
+    assert finished == ["fast", "after_fast", "slow"]
@@ -0,0 +1,47 @@
+import os
+from unittest.mock import patch
+
+from ai_codegen_pro.utils.file_writer import ProjectWriter, write_files
+
+
+def test_writes_files_into_nested_directories(tmp_path):
+    result = write_files(tmp_path, {"a.py": "a = 1\n", "pkg/sub/b.py": "b = 2\n"})
+
+    assert sorted(result.written) == ["a.py", "pkg/sub/b.py"]
+    assert (tmp_path / "pkg" / "sub" / "b.py").read_text(encoding="utf-8") == "b = 2\n"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_unchanged_files_are_not_rewritten(tmp_path):
+    write_files(tmp_path, {"a.py": "a = 1\n", "b.py": "b = 2\n"})
+    before = os.stat(tmp_path / "a.py").st_ino
+
+    result = write_files(tmp_path, {"a.py": "a = 1\n", "b.py": "b = 3\n"})
+
+    assert result.unchanged == ["a.py"]
+    assert result.written == ["b.py"]
+    assert os.stat(tmp_path / "a.py").st_ino == before
+    assert (tmp_path / "b.py").read_text(encoding="utf-8") == "b = 3\n"
+
+
+def test_failed_write_keeps_previous_content(tmp_path):
+    (tmp_path / "a.py").write_text("old\n", encoding="utf-8")
+
+    with patch("ai_codegen_pro.utils.file_writer.os.replace", side_effect=OSError("disk full")):
+        result = ProjectWriter(tmp_path).write([("a.py", "new\n")])
+
+    assert result.failed == {"a.py": "disk full"}
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "old\n"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_fsync_syncs_files_and_each_directory_once(tmp_path):
+    files = {f"pkg/m{i}.py": f"x = {i}\n" for i in range(5)}
+
+    with patch("ai_codegen_pro.utils.file_writer._fsync_directory") as sync_dir, patch(
+        "ai_codegen_pro.utils.file_writer.os.fsync"
+    ) as sync_file:
+        ProjectWriter(tmp_path, fsync=True).write(files)
+
+    assert sync_file.call_count == 5
+    sync_dir.assert_called_once_with(tmp_path / "pkg")
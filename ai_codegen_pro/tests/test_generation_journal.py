@@ -0,0 +1,47 @@
+from ai_codegen_pro.core.generation_journal import GenerationJournal
+
+
+def test_records_survive_reload(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = GenerationJournal(path)
+    journal.start(resume=False)
+    journal.record("a", "hash-a", {"name": "a.py", "content": "x = 1"})
+    journal.close()
+
+    loaded = GenerationJournal.load(path)
+
+    assert loaded.replay("a", "hash-a") == {"name": "a.py", "content": "x = 1"}
+    assert loaded.replay("a", "changed") is None
+    assert loaded.replay("b", "hash-a") is None
+
+
+def test_truncated_last_line_is_ignored_and_terminated(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = GenerationJournal(path)
+    journal.start(resume=False)
+    journal.record("a", "h", {"name": "a.py"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"name": "b", "input_')
+
+    journal = GenerationJournal.load(path)
+    assert list(journal.records) == ["a"]
+    journal.start(resume=True)
+    journal.record("c", "h", {"name": "c.py"})
+    journal.close()
+
+    assert sorted(GenerationJournal.load(path).records) == ["a", "c"]
+
+
+def test_fresh_start_and_discard(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = GenerationJournal(path)
+    journal.start(resume=False)
+    journal.record("a", "h", {})
+    journal.close()
+
+    journal = GenerationJournal.load(path)
+    journal.start(resume=False)
+    assert journal.replay("a", "h") is None
+    journal.discard()
+    assert not path.exists()
@@ -0,0 +1,59 @@
+import json
+
+from ai_codegen_pro.core.generation_manifest import (
+    MANIFEST_NAME,
+    GenerationManifest,
+    component_input_hash,
+)
+
+
+def test_input_hash_covers_every_input():
+    base = ({"name": "a"}, "prompt", "model", "t.j2", "source", ["h1"])
+    reference = component_input_hash(*base)
+
+    assert component_input_hash(*base) == reference
+    for index, changed in enumerate(({"name": "b"}, "p2", "m2", "u.j2", "src2", ["h2"])):
+        args = list(base)
+        args[index] = changed
+        assert component_input_hash(*args) != reference
+
+
+def test_manifest_round_trip_and_freshness(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1", encoding="utf-8")
+    manifest = GenerationManifest(tmp_path)
+    manifest.record("a", "hash-a", "a.py", "x = 1", {"model_used": "m"})
+    manifest.save()
+
+    loaded = GenerationManifest.load(tmp_path)
+
+    assert loaded.get("a").metadata == {"model_used": "m"}
+    assert loaded.fresh_content("a", "hash-a") == "x = 1"
+    assert loaded.fresh_content("a", "other") is None
+
+
+def test_edited_or_missing_files_are_not_fresh(tmp_path):
+    manifest = GenerationManifest(tmp_path)
+    manifest.record("a", "h", "a.py", "x = 1")
+    manifest.record("b", "h", "b.py", "y = 2")
+    (tmp_path / "a.py").write_text("x = 2", encoding="utf-8")
+
+    assert manifest.fresh_content("a", "h") is None
+    assert manifest.fresh_content("b", "h") is None
+
+
+def test_unreadable_or_outdated_manifest_is_ignored(tmp_path):
+    (tmp_path / MANIFEST_NAME).write_text("{not json", encoding="utf-8")
+    assert GenerationManifest.load(tmp_path).entries == {}
+
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps({"version": 0}), encoding="utf-8")
+    assert GenerationManifest.load(tmp_path).entries == {}
+
+
+def test_retain_drops_removed_components(tmp_path):
+    manifest = GenerationManifest(tmp_path)
+    manifest.record("a", "h", "a.py", "")
+    manifest.record("b", "h", "b.py", "")
+
+    manifest.retain(["b"])
+
+    assert list(manifest.entries) == ["b"]
@@ -0,0 +1,32 @@
+import json
+
+from ai_codegen_pro.core.json_stream import JSONArrayStreamParser, iter_json_array
+
+
+def test_elements_complete_as_soon_as_they_close():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed('```json\n[{"a": 1}, {"b": ') == [{"a": 1}]
+    assert parser.feed('"x, ]}"}') == [{"b": "x, ]}"}]
+    assert parser.feed(", 3, [4]]\n```") == [3, [4]]
+    assert parser.finished
+
+
+def test_split_at_every_character():
+    elements = [{"filename": "a.py", "context": {"body": 'print("[}\\\\")'}}, {"n": [1, 2]}]
+    text = json.dumps(elements)
+
+    assert list(iter_json_array(iter(text))) == elements
+
+
+def test_malformed_element_is_skipped():
+    parser = JSONArrayStreamParser()
+
+    elements = parser.feed('[{"ok": 1}, {"bad": }, {"ok": 2}]')
+
+    assert elements == [{"ok": 1}, {"ok": 2}]
+    assert parser.skipped == 1
+
+
+def test_text_without_array_yields_nothing():
+    assert list(iter_json_array(["not a json"])) == []
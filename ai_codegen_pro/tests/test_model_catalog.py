@@ -0,0 +1,111 @@
+"""
+Tests for the cached model catalog.
+"""
+
+import json
+
+import pytest
+
+from ai_codegen_pro.core.model_catalog import ModelCatalog
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient
+
+MODELS = [
+    {
+        "id": "openai/gpt-4o-mini",
+        "name": "GPT-4o mini",
+        "context_length": 128000,
+        "pricing": {"prompt": "0.00000015", "completion": "0.0000006"},
+    },
+    {
+        "id": "anthropic/claude-3-haiku",
+        "name": "Claude 3 Haiku",
+        "context_length": 200000,
+        "pricing": {"prompt": "0.00000025", "completion": "0.00000125"},
+    },
+    {
+        "id": "mistralai/mistral-7b-instruct",
+        "name": "Mistral 7B",
+        "context_length": 32768,
+        "pricing": {"prompt": "0.00000003", "completion": "0.00000005"},
+    },
+]
+
+
+@pytest.fixture
+def stub(openrouter_stub):
+    openrouter_stub.models = MODELS
+    return openrouter_stub
+
+
+@pytest.fixture
+def catalog(stub, tmp_path):
+    client = OpenRouterClient("key", base_url=stub.base_url)
+    return ModelCatalog(client, path=tmp_path / "models.json", ttl=60)
+
+
+def _model_requests(stub):
+    return [r for r in stub.requests if r["path"].endswith("/models")]
+
+
+def test_refresh_fetches_and_persists(catalog, stub):
+    assert catalog.is_stale()
+    assert catalog.refresh()
+
+    assert [m.id for m in catalog.models()] == [m["id"] for m in MODELS]
+    data = json.loads(catalog.path.read_text())
+    assert data["etag"] == '"v1"'
+    assert len(data["models"]) == 3
+
+
+def test_cached_catalog_is_used_without_network(catalog, stub, tmp_path):
+    catalog.refresh()
+    stub.requests.clear()
+
+    reloaded = ModelCatalog(catalog.client, path=catalog.path, ttl=60)
+    assert reloaded.load_cached()
+    assert not reloaded.is_stale()
+    assert not reloaded.refresh()
+    assert reloaded.get("anthropic/claude-3-haiku").context_length == 200000
+    assert _model_requests(stub) == []
+
+
+def test_stale_catalog_revalidates_with_etag(catalog, stub):
+    catalog.refresh()
+    catalog.fetched_at = 0.0
+
+    assert not catalog.refresh()  # 304: unchanged
+    assert _model_requests(stub)[-1]["headers"]["If-None-Match"] == '"v1"'
+    assert len(catalog.models()) == 3
+    assert not catalog.is_stale()
+
+
+def test_index_queries(catalog):
+    catalog.refresh()
+
+    assert [m.id for m in catalog.by_provider("openai")] == ["openai/gpt-4o-mini"]
+    assert catalog.providers() == ["anthropic", "mistralai", "openai"]
+    assert [m.id for m in catalog.find(min_context=100000)] == [
+        "openai/gpt-4o-mini",
+        "anthropic/claude-3-haiku",
+    ]
+    assert [m.id for m in catalog.find(max_prompt_price=0.0000002)] == [
+        "mistralai/mistral-7b-instruct",
+        "openai/gpt-4o-mini",
+    ]
+    assert catalog.get("missing/model") is None
+
+
+def test_refresh_failure_keeps_cached_models(catalog, stub):
+    catalog.refresh()
+    stub.stop()
+    catalog.fetched_at = 0.0
+
+    assert not catalog.refresh()
+    assert len(catalog.models()) == 3
+
+
+def test_load_cached_without_file(tmp_path):
+    catalog = ModelCatalog(path=tmp_path / "missing.json")
+    assert not catalog.load_cached()
+    assert not catalog.refresh()
+    assert catalog.models() == []
@@ -0,0 +1,198 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.model_router import LatencyHistogram, ModelRouter
+from ai_codegen_pro.core.multi_file_codegen import MultiFileCodeGenerator
+from ai_codegen_pro.core.openrouter_client import CompletionStream
+from ai_codegen_pro.core.response_cache import ResponseCache
+
+PRIMARY = "primary/model"
+FALLBACK = "fallback/model"
+
+
+@pytest.fixture
+def router():
+    router = ModelRouter(
+        fallback_map={PRIMARY: FALLBACK}, hedge_percentile=0.9, initial_hedge_delay=0.05
+    )
+    router.model_map["default"] = PRIMARY
+    return router
+
+
+def test_histogram_percentile_within_one_bucket():
+    histogram = LatencyHistogram()
+    for i in range(1, 101):
+        histogram.record(i / 100)
+
+    assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.2)
+    assert histogram.percentile(0.9) == pytest.approx(0.9, rel=0.2)
+    assert LatencyHistogram().percentile(0.9) is None
+
+
+def test_histogram_decays_old_samples():
+    histogram = LatencyHistogram(max_samples=100)
+    for _ in range(100):
+        histogram.record(5.0)
+    for _ in range(200):
+        histogram.record(0.1)
+
+    assert histogram.percentile(0.9) == pytest.approx(0.1, rel=0.2)
+
+
+def test_hedging_disabled_by_default():
+    router = ModelRouter()
+    assert router.select_model("module") == "anthropic/claude-3-sonnet-20240229"
+    assert not router.should_hedge("module")
+
+
+def test_hedge_delay_follows_observed_latency(router):
+    assert router.hedge_delay(PRIMARY) == 0.05
+    for _ in range(router.min_samples):
+        router.record_latency(PRIMARY, 2.0)
+
+    assert router.hedge_delay(PRIMARY) == pytest.approx(2.0, rel=0.2)
+    assert router.hedge_delay(FALLBACK) is None
+
+
+def test_fast_primary_is_not_hedged(router):
+    calls = []
+
+    def call(model, cancelled):
+        calls.append(model)
+        return model
+
+    assert router.hedged_call("default", call) == (PRIMARY, PRIMARY)
+    assert calls == [PRIMARY]
+    assert router.hedge_stats().hedged == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled(router):
+    primary_cancelled = threading.Event()
+
+    def call(model, cancelled):
+        if model == PRIMARY:
+            if cancelled.wait(2):
+                primary_cancelled.set()
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    result, model = router.hedged_call("default", call)
+
+    assert (result, model) == ("fast", FALLBACK)
+    assert time.monotonic() - start < 1
+    assert primary_cancelled.wait(1)
+    stats = router.hedge_stats()
+    assert (stats.calls, stats.hedged, stats.fallback_wins) == (1, 1, 1)
+
+
+def test_cancelling_the_run_cancels_every_attempt(router):
+    token = CancellationToken()
+
+    def call(model, attempt):
+        if model == FALLBACK:
+            token.cancel()
+        attempt.wait(2)
+        attempt.raise_if_cancelled()
+        return model
+
+    with pytest.raises(CancelledError):
+        router.hedged_call("default", call, token)
+
+
+def test_failed_primary_falls_back(router):
+    def call(model, cancelled):
+        if model == PRIMARY:
+            raise RuntimeError("primary down")
+        return "fallback"
+
+    assert router.hedged_call("default", call) == ("fallback", FALLBACK)
+
+
+def test_all_models_failing_raises_primary_error(router):
+    def call(model, cancelled):
+        raise RuntimeError(f"{model} down")
+
+    with pytest.raises(RuntimeError, match="primary/model down"):
+        router.hedged_call("default", call)
+
+
+def test_generator_hedges_slow_component(openrouter_stub, router):
+    openrouter_stub.model_delays[PRIMARY] = 1.0
+    generator = MultiFileCodeGenerator("key", model_router=router)
+    generator.openrouter.base_url = openrouter_stub.base_url
+
+    result = generator.generate_project(
+        {"name": "p", "type": "python", "components": [{"name": "main", "type": "script"}]}
+    )
+
+    assert result.success, result.errors
+    metadata = result.files[0].metadata
+    assert metadata["hedged"] is True
+    assert metadata["model_id"] == FALLBACK
+    assert metadata["tokens_used"] == 15
+
+
+def test_generator_aborts_the_losing_request(router):
+    generator = MultiFileCodeGenerator("key", model_router=router)
+    aborted = []
+
+    def generate_code_stream(prompt, model, cancel_token=None, **kwargs):
+        if model == PRIMARY:
+            # Still waiting for the first token when the fallback wins.
+            if cancel_token.wait(5):
+                aborted.append(model)
+            cancel_token.raise_if_cancelled()
+        return CompletionStream(iter(["print('fast')"]), lambda data: (data, None))
+
+    start = time.monotonic()
+    with patch.object(generator.openrouter, "generate_code_stream", generate_code_stream):
+        result = generator.generate_project(
+            {"name": "p", "type": "python", "components": [{"name": "main", "type": "script"}]}
+        )
+        deadline = time.monotonic() + 1
+        while not aborted and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert result.success, result.errors
+    assert result.files[0].metadata["model_id"] == FALLBACK
+    assert aborted == [PRIMARY]
+    assert time.monotonic() - start < 2
+
+
+def test_cached_component_is_not_hedged(openrouter_stub, router, tmp_path):
+    generator = MultiFileCodeGenerator(
+        "key", cache=ResponseCache(tmp_path / "cache.sqlite3"), model_router=router
+    )
+    generator.openrouter.base_url = openrouter_stub.base_url
+    spec = {"name": "p", "type": "python", "components": [{"name": "main", "type": "script"}]}
+    router.hedge_percentile = None
+    generator.generate_project(spec)
+    router.hedge_percentile = 0.9
+
+    result = generator.generate_project(spec)
+
+    metadata = result.files[0].metadata
+    assert metadata["hedged"] is False
+    assert metadata["cached"] is True
+    assert len(openrouter_stub.requests) == 1
+
+
+def test_hedged_result_is_cached_for_reruns(openrouter_stub, router, tmp_path):
+    generator = MultiFileCodeGenerator(
+        "key", cache=ResponseCache(tmp_path / "cache.sqlite3"), model_router=router
+    )
+    generator.openrouter.base_url = openrouter_stub.base_url
+    spec = {"name": "p", "type": "python", "components": [{"name": "main", "type": "script"}]}
+    assert generator.generate_project(spec).files[0].metadata["hedged"] is True
+    calls = len(openrouter_stub.requests)
+
+    result = generator.generate_project(spec)
+
+    metadata = result.files[0].metadata
+    assert (metadata["hedged"], metadata["cached"]) == (False, True)
+    assert len(openrouter_stub.requests) == calls
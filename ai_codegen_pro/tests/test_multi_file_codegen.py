@@ -2,11 +2,24 @@
 Unit tests for multi-file code generator.
 """
 
+import asyncio
+import json
+import os
+import threading
+import time
 from unittest.mock import patch
 
 import pytest
 
-from ai_codegen_pro.core.multi_file_codegen import GeneratedFile, MultiFileCodeGenerator
+from ai_codegen_pro.core.budget import GenerationBudget
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.multi_file_codegen import (
+    ComponentFailure,
+    GeneratedFile,
+    GenerationResult,
+    MultiFileCodeGenerator,
+)
+from ai_codegen_pro.core.openrouter_client import CompletionResult, OpenRouterError
 
 
 class TestMultiFileCodeGenerator:
@@ -46,3 +59,653 @@ class TestMultiFileCodeGenerator:
         assert result.success
         assert len(result.files) == 1
         assert result.files[0].name == "main.py"
+
+
+COMPONENT_TYPES = {"python": "module", "bash": "script"}
+
+
+@pytest.fixture
+def generator():
+    """A generator with a mocked client whose model router always picks model "m"."""
+    with patch("ai_codegen_pro.core.multi_file_codegen.OpenRouterClient"):
+        generator = MultiFileCodeGenerator("test-api-key")
+    generator.model_router.select_model = lambda task_type: "m"
+    return generator
+
+
+def project_spec(*names, project_type="bash", depends_on=None, descriptions=None, **extra):
+    """A spec with one component per name; ``depends_on`` maps a name to its dependencies."""
+    components = []
+    for name in names:
+        component = {
+            "type": COMPONENT_TYPES[project_type],
+            "name": name,
+            "description": (descriptions or {}).get(name, name),
+        }
+        if depends_on and name in depends_on:
+            component["depends_on"] = depends_on[name]
+        components.append(component)
+    return {"type": project_type, "components": components, **extra}
+
+
+def component_name(prompt):
+    """The component a generation prompt asks for."""
+    return prompt.split("'")[1]
+
+
+def echo_name(prompt, **kwargs):
+    return "# " + component_name(prompt)
+
+
+class TestConcurrentGeneration:
+    @staticmethod
+    def _spec(count):
+        return project_spec(*[f"mod{i}" for i in range(count)], project_type="python")
+
+    def test_files_keep_spec_order(self, generator):
+        def fake_generate(prompt, model, max_tokens, temperature, **kwargs):
+            index = int(component_name(prompt)[3:])
+            time.sleep(0.05 * (5 - index))
+            return f"value = {index}"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+
+        result = generator.generate_project(self._spec(5))
+        assert result.success
+        assert [f.name for f in result.files] == [f"mod{i}.py" for i in range(5)]
+
+    def test_requests_run_in_parallel(self, generator):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_generate(**kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return "pass"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+        generator.generate_project(self._spec(8))
+        assert max(peak) == 4
+
+    def test_failure_does_not_cancel_siblings(self, generator):
+        def fake_generate(prompt, **kwargs):
+            if "'mod1'" in prompt:
+                raise OpenRouterError("HTTP 500")
+            return "pass"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+
+        result = generator.generate_project(self._spec(3))
+        assert not result.success
+        assert [f.name for f in result.files] == ["mod0.py", "mod2.py"]
+        assert len(result.errors) == 1
+        assert "mod1" in result.errors[0]
+
+    def test_per_model_limit(self, generator):
+        generator.max_workers = 4
+        generator.model_concurrency = {"limited-model": 1}
+        generator.model_router.select_model = lambda task_type: "limited-model"
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_generate(**kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return "pass"
+
+        generator.openrouter.generate_code.side_effect = fake_generate
+        result = generator.generate_project(self._spec(4))
+        assert len(result.files) == 4
+        assert max(peak) == 1
+
+
+class TestUsageAccounting:
+    def test_reported_usage_is_recorded_and_aggregated(self, generator):
+        def fake_generate(prompt, model, on_completion=None, **kwargs):
+            tokens = {"module": (100, 40), "script": (200, 60)}
+            kind = "script" if "script" in prompt.split("\n")[0] else "module"
+            on_completion(
+                CompletionResult(
+                    content="x = 1",
+                    model=f"{model}-served",
+                    prompt_tokens=tokens[kind][0],
+                    completion_tokens=tokens[kind][1],
+                    total_tokens=sum(tokens[kind]),
+                    latency=0.5,
+                )
+            )
+            return "x = 1"
+
+        generator.openrouter.generate_code.side_effect = fake_generate
+        generator.model_router.select_model = lambda task_type: task_type + "-model"
+
+        result = generator.generate_project(
+            {
+                "type": "python",
+                "components": [
+                    {"type": "module", "name": "a"},
+                    {"type": "module", "name": "b"},
+                    {"type": "script", "name": "c"},
+                ],
+            }
+        )
+
+        metadata = result.files[0].metadata
+        assert metadata["prompt_tokens"] == 100
+        assert metadata["completion_tokens"] == 40
+        assert metadata["model_id"] == "module-model-served"
+        assert metadata["usage_reported"] is True
+        assert result.prompt_tokens == 400
+        assert result.completion_tokens == 140
+        assert result.total_tokens == 540
+        module_usage = result.model_usage["module-model-served"]
+        assert (module_usage.requests, module_usage.total_tokens) == (2, 280)
+        assert module_usage.average_latency == 0.5
+
+    def test_missing_usage_falls_back_to_flagged_estimate(self, generator):
+        generator.openrouter.generate_code.return_value = "y = 2"
+
+        result = generator.generate_project({"components": [{"type": "module", "name": "a"}]})
+
+        metadata = result.files[0].metadata
+        assert metadata["usage_reported"] is False
+        assert isinstance(result.total_tokens, int)
+        assert result.total_tokens == metadata["prompt_tokens"] + metadata["completion_tokens"]
+
+
+class TestDependencyScheduling:
+    def test_dependents_see_upstream_interfaces(self, generator):
+        prompts = {}
+
+        def fake_generate(prompt, **kwargs):
+            name = component_name(prompt)
+            prompts[name] = prompt
+            if name == "models":
+                return (
+                    "class User:\n"
+                    "    def greet(self) -> str:\n"
+                    '        """Say hi."""\n'
+                    '        return "hi"\n'
+                )
+            return "x = 1"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+        result = generator.generate_project(
+            project_spec("api", "models", project_type="python", depends_on={"api": ["models"]})
+        )
+
+        assert result.success
+        assert [f.name for f in result.files] == ["api.py", "models.py"]
+        assert "--- models.py ---" in prompts["api"]
+        assert "def greet(self) -> str:" in prompts["api"]
+        assert 'return "hi"' not in prompts["api"]
+        assert "depends on" not in prompts["models"]
+
+    def test_interface_without_ast_unparse(self, generator, monkeypatch):
+        monkeypatch.delattr("ast.unparse", raising=False)  # as on Python 3.8
+
+        interface = generator._extract_interface(
+            "import os\n\n"
+            "class User:\n"
+            "    def greet(self) -> str:\n"
+            '        """Say hi."""\n'
+            '        return "hi"\n\n'
+            "main()\n"
+        )
+
+        assert interface == (
+            "import os\n"
+            "class User:\n"
+            "    def greet(self) -> str:\n"
+            '        """Say hi."""\n'
+            "        ..."
+        )
+
+    def test_dependents_wait_while_independent_components_overlap(self, generator):
+        events = []
+        lock = threading.Lock()
+
+        def fake_generate(prompt, **kwargs):
+            name = component_name(prompt)
+            with lock:
+                events.append(("start", name))
+            time.sleep(0.05)
+            with lock:
+                events.append(("end", name))
+            return "x = 1"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+        spec = project_spec("a", "b", "c", project_type="python", depends_on={"c": ["a", "b"]})
+        result = generator.generate_project(spec)
+
+        assert result.success
+        assert events[:2] == [("start", "a"), ("start", "b")] or events[:2] == [
+            ("start", "b"),
+            ("start", "a"),
+        ]
+        assert events.index(("start", "c")) > events.index(("end", "a"))
+        assert events.index(("start", "c")) > events.index(("end", "b"))
+
+    def test_failed_dependency_skips_dependents(self, generator):
+        def fake_generate(prompt, **kwargs):
+            if "'a'" in prompt:
+                raise OpenRouterError("HTTP 500")
+            return "x = 1"
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = fake_generate
+        spec = project_spec("a", "b", "c", project_type="python", depends_on={"b": ["a"]})
+        result = generator.generate_project(spec)
+
+        assert [f.name for f in result.files] == ["c.py"]
+        assert len(result.errors) == 2
+        assert "Skipped b: dependency a failed" in result.errors[1]
+
+    def test_cycles_fail_before_any_request(self, generator):
+        spec = project_spec("a", "b", project_type="python", depends_on={"a": ["b"], "b": ["a"]})
+        result = generator.generate_project(spec)
+
+        assert not result.success
+        assert "cycle: a -> b -> a" in result.errors[0]
+        generator.openrouter.generate_code.assert_not_called()
+
+
+class TestIncrementalRegeneration:
+    def test_unchanged_components_are_reused(self, generator, tmp_path):
+        generator.openrouter.generate_code.side_effect = echo_name
+        spec = project_spec("a", "b", "c")
+        generator.generate_project(spec, str(tmp_path))
+        assert generator.openrouter.generate_code.call_count == 3
+
+        spec["components"][1]["description"] = "b, edited"
+        result = generator.generate_project(spec, str(tmp_path))
+
+        assert generator.openrouter.generate_code.call_count == 4
+        assert result.success
+        assert sorted(result.reused) == ["a.sh", "c.sh"]
+        assert [f.name for f in result.files] == ["a.sh", "b.sh", "c.sh"]
+        assert (tmp_path / "a.sh").read_text().endswith("# a")
+
+    def test_dependency_change_regenerates_dependents(self, generator, tmp_path):
+        generator.openrouter.generate_code.side_effect = echo_name
+        spec = project_spec("a", "b", depends_on={"b": ["a"]})
+        generator.generate_project(spec, str(tmp_path))
+
+        spec["components"][0]["description"] = "a, edited"
+        generator.openrouter.generate_code.side_effect = lambda prompt, **kwargs: (
+            "# v2 " + component_name(prompt)
+        )
+        result = generator.generate_project(spec, str(tmp_path))
+
+        assert result.reused == []
+        assert (tmp_path / "b.sh").read_text().endswith("# v2 b")
+
+    def test_hand_edited_file_and_force_regenerate(self, generator, tmp_path):
+        generator.openrouter.generate_code.side_effect = echo_name
+        spec = project_spec("a", "b")
+        generator.generate_project(spec, str(tmp_path))
+        (tmp_path / "a.sh").write_text("# edited by hand")
+
+        result = generator.generate_project(spec, str(tmp_path))
+        assert result.reused == ["b.sh"]
+        assert (tmp_path / "a.sh").read_text().endswith("# a")
+
+        result = generator.generate_project(spec, str(tmp_path), force=True)
+        assert result.reused == []
+        assert generator.openrouter.generate_code.call_count == 5
+
+
+class TestResumableGeneration:
+    def test_resume_replays_completed_components(self, generator, tmp_path):
+        def flaky(prompt, **kwargs):
+            if component_name(prompt) == "c":
+                raise OpenRouterError("provider down")
+            return echo_name(prompt)
+
+        generator.openrouter.generate_code.side_effect = flaky
+        journal = tmp_path / "run.jsonl"
+        result = generator.generate_project(project_spec("a", "b", "c"), journal_path=journal)
+        assert not result.success
+        assert len(journal.read_text().splitlines()) == 2
+
+        generator.openrouter.generate_code.side_effect = echo_name
+        result = generator.resume(
+            project_spec("a", "b", "c"), str(tmp_path / "out"), journal_path=journal
+        )
+
+        assert result.success
+        assert generator.openrouter.generate_code.call_count == 4
+        assert sorted(result.resumed) == ["a.sh", "b.sh"]
+        assert (tmp_path / "out" / "a.sh").read_text().endswith("# a")
+        assert not journal.exists()
+
+    def test_fresh_run_ignores_old_journal(self, generator, tmp_path):
+        generator.openrouter.generate_code.return_value = "# x"
+        journal = tmp_path / "run.jsonl"
+        journal.write_text(json.dumps({"name": "a", "input_hash": "stale", "file": {}}) + "\n")
+
+        result = generator.generate_project(project_spec("a", "b", "c"), journal_path=journal)
+
+        assert result.resumed == []
+        assert generator.openrouter.generate_code.call_count == 3
+        assert not journal.exists()
+
+    def test_write_failure_keeps_the_journal(self, generator, tmp_path):
+        generator.openrouter.generate_code.side_effect = echo_name
+        real_replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith("b.sh"):
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        with patch("ai_codegen_pro.utils.file_writer.os.replace", side_effect=failing_replace):
+            result = generator.generate_project(project_spec("a", "b"), str(tmp_path))
+
+        assert not result.success
+        assert result.errors == ["Failed to save b.sh: disk full"]
+        assert (tmp_path / ".ai_codegen_journal.jsonl").exists()
+
+
+class TestProgressiveGeneration:
+    @staticmethod
+    def _slow_fast_broken(prompt, **kwargs):
+        name = component_name(prompt)
+        if name == "broken":
+            raise OpenRouterError("bad gateway")
+        time.sleep({"slow": 0.2}.get(name, 0))
+        return "# " + name
+
+    def test_iter_project_yields_components_as_they_finish(self, generator):
+        generator.max_workers = 3
+        generator.openrouter.generate_code.side_effect = self._slow_fast_broken
+
+        items = list(generator.iter_project(project_spec("slow", "fast", "broken")))
+
+        assert isinstance(items[-1], GenerationResult)
+        assert items[-2].name == "slow.sh"
+        assert {type(item) for item in items[:2]} == {GeneratedFile, ComponentFailure}
+        failure = next(item for item in items if isinstance(item, ComponentFailure))
+        assert failure.name == "broken"
+        assert items[-1].errors == [failure.message]
+        assert [f.name for f in items[-1].files] == ["slow.sh", "fast.sh"]
+
+    def test_aiter_project_matches_iter_project(self, generator):
+        generator.max_workers = 3
+        generator.openrouter.generate_code.side_effect = self._slow_fast_broken
+
+        async def collect():
+            spec = project_spec("slow", "fast", "broken")
+            return [item async for item in generator.aiter_project(spec)]
+
+        items = asyncio.run(collect())
+
+        assert len(items) == 4
+        assert items[-1].files[1].content.endswith("# fast")
+
+    def test_aiter_project_stops_generating_when_the_consumer_stops(self, generator):
+        def slow_echo(prompt, cancel_token=None, **kwargs):
+            if cancel_token.wait(0.05):
+                raise CancelledError(cancel_token.reason)
+            return echo_name(prompt)
+
+        generator.openrouter.generate_code.side_effect = slow_echo
+
+        async def first():
+            spec = project_spec(*"abcdef")
+            async for item in generator.aiter_project(spec):
+                return item
+
+        item = asyncio.run(first())
+
+        assert item.name == "a.sh"
+        assert generator.openrouter.generate_code.call_count <= 2
+
+
+class TestCancellation:
+    @staticmethod
+    def _slow_waits_for_cancel(prompt, cancel_token=None, **kwargs):
+        name = component_name(prompt)
+        if name == "slow" and cancel_token.wait(5):
+            raise CancelledError(cancel_token.reason)
+        return "# " + name
+
+    def test_timeout_returns_partial_result(self, generator, tmp_path):
+        generator.max_workers = 2
+        generator.openrouter.generate_code.side_effect = self._slow_waits_for_cancel
+        spec = project_spec("slow", "fast", "after", depends_on={"after": ["slow"]})
+
+        start = time.monotonic()
+        result = generator.generate_project(spec, str(tmp_path), timeout=0.3)
+
+        assert time.monotonic() - start < 2
+        assert result.cancelled and not result.success
+        assert [f.name for f in result.files] == ["fast.sh"]
+        assert "slow, after" in result.errors[0]
+        assert (tmp_path / "fast.sh").exists()
+        assert (tmp_path / ".ai_codegen_journal.jsonl").exists()
+
+    def test_cancelled_token_generates_nothing(self, generator):
+        generator.openrouter.generate_code.side_effect = self._slow_waits_for_cancel
+        token = CancellationToken()
+        token.cancel()
+
+        result = generator.generate_project(project_spec("fast"), cancel_token=token)
+
+        assert result.cancelled
+        assert generator.openrouter.generate_code.call_count == 0
+
+
+class TestBudget:
+    @staticmethod
+    def _report_usage(prompt, on_completion=None, **kwargs):
+        on_completion(CompletionResult("# code", "m", 100, 20, 120, 0.01))
+        return "# code"
+
+    @staticmethod
+    def _spec():
+        return project_spec("a", "b", "c", "d", depends_on={"d": ["c"]})
+
+    def test_generation_stops_when_budget_is_exhausted(self, generator):
+        generator.openrouter.generate_code.side_effect = self._report_usage
+        budget = GenerationBudget(max_requests=2)
+
+        result = generator.generate_project(self._spec(), budget=budget)
+
+        assert generator.openrouter.generate_code.call_count == 2
+        assert [f.name for f in result.files] == ["a.sh", "b.sh"]
+        assert result.skipped == ["c", "d"]
+        assert not result.success
+        assert result.errors == [f"Budget exhausted ({budget.exhausted_reason}), skipped: c, d"]
+        assert budget.spent.tokens == 240
+        assert budget.reserved.requests == 0
+
+    def test_reservations_use_prompt_estimate_and_max_tokens(self, generator):
+        generator.openrouter.generate_code.side_effect = self._report_usage
+        budget = GenerationBudget(max_tokens=4100)
+
+        result = generator.generate_project(self._spec(), budget=budget)
+
+        assert generator.openrouter.generate_code.call_count == 0
+        assert result.skipped == ["a", "b", "c", "d"]
+
+    def test_open_reservations_delay_instead_of_exhausting(self, generator):
+        def slow_usage(prompt, **kwargs):
+            time.sleep(0.05)
+            return self._report_usage(prompt, **kwargs)
+
+        generator.max_workers = 4
+        generator.openrouter.generate_code.side_effect = slow_usage
+        budget = GenerationBudget(max_tokens=6000)  # room for one reservation at a time
+
+        result = generator.generate_project(self._spec(), budget=budget)
+
+        assert result.success, result.errors
+        assert generator.openrouter.generate_code.call_count == 4
+        assert not budget.exhausted
+        assert budget.spent.tokens == 480
+
+
+class FakeStream:
+    def __init__(self, chunks, usage=None):
+        self._chunks = iter(chunks)
+        self.usage = usage
+
+    def __iter__(self):
+        return self._chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class TestBatchedGeneration:
+    @pytest.fixture(autouse=True)
+    def batching(self, generator):
+        generator.batch_size = 10
+        generator.openrouter.generate_code.return_value = "echo single"
+        generator.openrouter.cached_completion.return_value = None
+
+    @staticmethod
+    def _spec(count):
+        return project_spec(*[f"mod{i}" for i in range(count)], project_type="python")
+
+    @staticmethod
+    def _entry(name, body):
+        return {
+            "filename": name,
+            "template": "python_module.j2",
+            "context": {"name": name[:-3], "docstring": "Doc", "imports": "", "body": body},
+        }
+
+    def test_small_components_share_one_request(self, generator):
+        payload = json.dumps([self._entry(f"mod{i}.py", f"X = {i}") for i in range(4)])
+        chunks = [payload[i : i + 7] for i in range(0, len(payload), 7)]
+        generator.openrouter.generate_code_stream.return_value = FakeStream(
+            chunks, {"prompt_tokens": 101, "completion_tokens": 40, "total_tokens": 141}
+        )
+
+        result = generator.generate_project(self._spec(4))
+
+        assert result.success, result.errors
+        assert generator.openrouter.generate_code_stream.call_count == 1
+        generator.openrouter.generate_code.assert_not_called()
+        prompt = generator.openrouter.generate_code_stream.call_args[0][0]
+        assert prompt.count("filename: mod") == 4
+        assert [f.name for f in result.files] == [f"mod{i}.py" for i in range(4)]
+        assert "X = 2" in result.files[2].content
+        assert result.files[0].metadata["batch_size"] == 4
+        assert (result.prompt_tokens, result.completion_tokens) == (101, 40)
+        assert result.model_usage["m"].requests == 1
+
+    def test_batch_response_is_cached_and_reused(self, generator):
+        payload = json.dumps([self._entry(f"mod{i}.py", f"X = {i}") for i in range(2)])
+        generator.openrouter.generate_code_stream.return_value = FakeStream([payload])
+        generator.generate_project(self._spec(2))
+
+        stored = generator.openrouter.cache_completion.call_args
+        assert stored[0][0].content == payload
+        assert stored[0][1:] == generator.openrouter.generate_code_stream.call_args[0]
+        generator.openrouter.cached_completion.return_value = CompletionResult(
+            payload, "m", 0, 0, 0, 0.0, cached=True
+        )
+
+        result = generator.generate_project(self._spec(2))
+
+        assert result.success, result.errors
+        assert generator.openrouter.generate_code_stream.call_count == 1
+        assert [f.name for f in result.files] == ["mod0.py", "mod1.py"]
+        assert all(f.metadata["cached"] for f in result.files)
+
+    def test_malformed_and_missing_entries_fall_back(self, generator):
+        entries = [
+            self._entry("mod0.py", "A = 0"),
+            {"filename": "mod1.py", "template": "nope.j2", "context": {}},
+        ]
+        payload = json.dumps(entries)[:-1] + ', {"filename": }]'
+        generator.openrouter.generate_code_stream.return_value = FakeStream([payload])
+
+        result = generator.generate_project(self._spec(3))
+
+        assert result.success, result.errors
+        assert [f.name for f in result.files] == ["mod0.py", "mod1.py", "mod2.py"]
+        assert generator.openrouter.generate_code.call_count == 2
+        assert result.files[0].metadata["usage_reported"] is False
+
+    def test_unreported_usage_is_estimated_and_fences_are_stripped(self, generator):
+        entries = [self._entry(f"mod{i}.py", f"```python\nX = {i}\n```") for i in range(2)]
+        generator.openrouter.generate_code_stream.return_value = FakeStream([json.dumps(entries)])
+
+        result = generator.generate_project(self._spec(2))
+
+        assert result.success, result.errors
+        assert "```" not in result.files[0].content
+        assert "X = 0" in result.files[0].content
+        metadata = result.files[0].metadata
+        assert metadata["usage_reported"] is False
+        assert metadata["prompt_tokens"] > 0 and metadata["completion_tokens"] > 0
+        assert result.total_tokens == sum(f.metadata["tokens_used"] for f in result.files)
+
+    def test_failed_batch_request_falls_back_to_single_requests(self, generator):
+        generator.openrouter.generate_code_stream.side_effect = OpenRouterError("HTTP 500")
+
+        result = generator.generate_project(self._spec(3))
+
+        assert result.success
+        assert generator.openrouter.generate_code.call_count == 3
+
+    def test_components_with_dependencies_are_not_batched(self, generator):
+        spec = self._spec(3)
+        spec["components"][1]["depends_on"] = ["mod0"]
+        payload = json.dumps([self._entry("mod2.py", "Z = 2")])
+        generator.openrouter.generate_code_stream.return_value = FakeStream([payload])
+
+        result = generator.generate_project(spec)
+
+        assert result.success
+        generator.openrouter.generate_code_stream.assert_not_called()
+        assert generator.openrouter.generate_code.call_count == 3
+
+
+class TestPromptPrefix:
+    def test_components_share_a_byte_identical_prefix(self, generator):
+        calls = []
+
+        def fake_generate(prompt, prompt_prefix=None, on_completion=None, **kwargs):
+            calls.append((prompt_prefix, prompt))
+            on_completion(CompletionResult("x = 1", "m", 100, 10, 110, 0.1, cached_tokens=80))
+            return "x = 1"
+
+        generator.openrouter.generate_code.side_effect = fake_generate
+        spec = project_spec(
+            "a",
+            "b",
+            project_type="python",
+            descriptions={"a": "First", "b": "Second"},
+            dependencies=["fastapi"],
+        )
+        result = generator.generate_project(spec)
+
+        (prefix_a, prompt_a), (prefix_b, prompt_b) = calls
+        assert prefix_a == prefix_b
+        assert "fastapi" in prefix_a and "First" not in prefix_a
+        assert prompt_a.startswith("Generate a python module named 'a'")
+        assert result.files[0].metadata["cached_tokens"] == 80
+        assert result.cached_tokens == 160
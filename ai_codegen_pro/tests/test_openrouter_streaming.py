@@ -0,0 +1,89 @@
+"""
+Tests for server-sent-event streaming of completions.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from ai_codegen_pro.core.async_openrouter_client import AsyncOpenRouterClient
+from ai_codegen_pro.core.openrouter_client import (
+    CompletionStream,
+    OpenRouterClient,
+    OpenRouterError,
+    iter_sse_data,
+)
+
+
+def test_iter_sse_data_handles_comments_multiline_and_done():
+    lines = [
+        ": OPENROUTER PROCESSING",
+        "",
+        'data: {"a": 1}',
+        "",
+        "data: first",
+        "data:second",
+        "",
+        "data: [DONE]",
+        "",
+        "data: ignored",
+        "",
+    ]
+    assert list(iter_sse_data(lines)) == ['{"a": 1}', "first\nsecond"]
+
+
+def test_completion_stream_collects_usage():
+    chunks = iter(
+        [
+            '{"choices": [{"delta": {"role": "assistant"}}]}',
+            '{"choices": [{"delta": {"content": "def "}}]}',
+            "not json",
+            '{"choices": [{"delta": {"content": "f(): pass"}}]}',
+            '{"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 4}}',
+        ]
+    )
+    stream = CompletionStream(chunks)
+    assert "".join(stream) == "def f(): pass"
+    assert stream.usage == {"prompt_tokens": 3, "completion_tokens": 4}
+
+
+def test_completion_stream_raises_on_error_chunk():
+    stream = CompletionStream(iter(['{"error": {"code": 502, "message": "upstream"}}']))
+    with pytest.raises(OpenRouterError, match="upstream"):
+        next(stream)
+
+
+def test_generate_code_stream(openrouter_stub):
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+    stream = client.generate_code_stream("say hi", model="stub/model")
+
+    assert "".join(stream).strip() == "echo: say hi"
+    assert stream.usage["completion_tokens"] == 5
+    assert openrouter_stub.requests[0]["payload"]["stream"] is True
+
+
+def test_first_delta_arrives_before_completion_finishes(openrouter_stub):
+    openrouter_stub.stream_delay = 0.1
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+
+    start = time.monotonic()
+    stream = client.generate_code_stream("one two three four five")
+    next(stream)
+    first_delta = time.monotonic() - start
+    list(stream)
+    total = time.monotonic() - start
+
+    assert first_delta < total / 2
+
+
+def test_async_generate_code_stream(openrouter_stub):
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            stream = client.generate_code_stream("async hi")
+            parts = [delta async for delta in stream]
+            return "".join(parts), stream.usage
+
+    text, usage = asyncio.run(scenario())
+    assert text.strip() == "echo: async hi"
+    assert usage["total_tokens"] == 15
@@ -0,0 +1,50 @@
+from ai_codegen_pro.core.openrouter_client import CompletionResult, build_chat_payload
+from ai_codegen_pro.core.providers.anthropic_provider import normalize_usage
+
+
+def test_prompt_prefix_is_marked_cacheable_where_supported():
+    anthropic = build_chat_payload(
+        "component", "anthropic/claude-3-haiku", 100, 0.1, prompt_prefix="project"
+    )
+    openai = build_chat_payload(
+        "component", "openai/gpt-4o-mini", 100, 0.1, prompt_prefix="project"
+    )
+
+    assert anthropic["messages"][1]["content"] == [
+        {"type": "text", "text": "project", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "component"},
+    ]
+    assert openai["messages"][1]["content"] == "projectcomponent"
+
+
+def test_cached_tokens_are_read_from_usage():
+    result = CompletionResult.from_response(
+        {
+            "choices": [{"message": {"content": "x"}}],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": 5,
+                "prompt_tokens_details": {"cached_tokens": 64},
+            },
+        },
+        "m",
+        0.1,
+    )
+
+    assert result.cached_tokens == 64
+    assert result.total_tokens == 105
+
+
+def test_anthropic_cache_reads_count_as_cached_prompt_tokens():
+    usage = normalize_usage(
+        {
+            "input_tokens": 20,
+            "cache_read_input_tokens": 900,
+            "cache_creation_input_tokens": 0,
+            "output_tokens": 50,
+        }
+    )
+
+    result = CompletionResult.from_usage("x", "claude", usage, 0.1)
+
+    assert (result.prompt_tokens, result.cached_tokens, result.total_tokens) == (920, 900, 970)
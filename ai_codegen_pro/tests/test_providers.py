@@ -0,0 +1,128 @@
+from ai_codegen_pro.core.http_transport import HTTPTransport, get_shared_transport
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient
+from ai_codegen_pro.core.providers import (
+    AnthropicProvider,
+    OpenRouterProvider,
+    ProviderError,
+    create_provider,
+)
+from ai_codegen_pro.core.providers.anthropic_provider import AnthropicStreamParser
+from ai_codegen_pro.core.rate_limiter import RateLimiter
+from ai_codegen_pro.core.providers.openrouter_client import (
+    OpenRouterClient as LegacyOpenRouterClient,
+)
+
+
+def test_clients_share_transport_by_default():
+    first = OpenRouterClient("key")
+    second = OpenRouterClient("other")
+
+    assert first.transport is get_shared_transport()
+    assert first.session is second.session
+
+
+def test_rate_limit_options_keep_shared_transport():
+    limiter = RateLimiter()
+    client = OpenRouterClient("key", rate_limiter=limiter, max_rate_limit_retries=0)
+
+    assert client.transport is get_shared_transport()
+    assert client.transport.rate_limiter is None
+    assert client.rate_limiter is limiter
+    assert client.max_rate_limit_retries == 0
+
+
+def test_legacy_import_path_is_same_client():
+    assert LegacyOpenRouterClient is OpenRouterClient
+
+
+def test_openrouter_provider_complete_and_stream(openrouter_stub):
+    provider = OpenRouterProvider("key", base_url=openrouter_stub.base_url)
+
+    result = provider.complete("hello", "stub/model")
+    with provider.stream("hello", "stub/model") as stream:
+        text = "".join(stream)
+
+    assert result.content == "echo: hello"
+    assert result.total_tokens == 15
+    assert text.strip() == "echo: hello"
+    assert stream.usage["total_tokens"] == 15
+    assert provider.list_models() == ["stub/model"]
+
+
+def test_anthropic_provider_complete(openrouter_stub):
+    provider = AnthropicProvider("key", base_url=openrouter_stub.base_url)
+
+    result = provider.complete("hello", "claude-3-haiku-20240307", system_prompt="Be brief")
+
+    assert result.content == "echo: hello"
+    assert (result.prompt_tokens, result.completion_tokens, result.total_tokens) == (10, 5, 15)
+    payload = openrouter_stub.requests[-1]["payload"]
+    assert openrouter_stub.requests[-1]["path"] == "/messages"
+    assert payload["system"] == "Be brief"
+    assert "temperature" not in payload
+
+
+def test_anthropic_provider_leaves_defaults_to_the_api(openrouter_stub):
+    provider = AnthropicProvider("key", base_url=openrouter_stub.base_url)
+
+    provider.complete("hello", "claude-3-haiku-20240307")
+
+    payload = openrouter_stub.requests[-1]["payload"]
+    assert "system" not in payload
+    assert "temperature" not in payload
+
+
+def test_anthropic_provider_stream(openrouter_stub):
+    provider = AnthropicProvider("key", base_url=openrouter_stub.base_url)
+
+    with provider.stream("hello", "claude-3-haiku-20240307") as stream:
+        text = "".join(stream)
+
+    assert text.strip() == "echo: hello"
+    assert stream.usage["prompt_tokens"] == 10
+    assert stream.usage["completion_tokens"] == 5
+    assert stream.usage["total_tokens"] == 15
+
+
+def test_anthropic_provider_raises_on_http_error(openrouter_stub):
+    openrouter_stub.throttle_count = 1
+    provider = AnthropicProvider(
+        "key",
+        base_url=openrouter_stub.base_url,
+        transport=HTTPTransport(max_rate_limit_retries=0),
+    )
+
+    try:
+        provider.complete("hello", "claude-3-haiku-20240307")
+    except ProviderError as exc:
+        assert "429" in str(exc)
+    else:
+        raise AssertionError("expected ProviderError")
+
+
+def test_anthropic_stream_parser_reports_errors():
+    parser = AnthropicStreamParser()
+
+    try:
+        parser('{"type": "error", "error": {"message": "overloaded"}}')
+    except ProviderError as exc:
+        assert "overloaded" in str(exc)
+    else:
+        raise AssertionError("expected ProviderError")
+
+
+def test_providers_reuse_pooled_connections(openrouter_stub):
+    transport = HTTPTransport()
+    openrouter = create_provider(
+        "openrouter", "key", base_url=openrouter_stub.base_url, transport=transport
+    )
+    anthropic = create_provider(
+        "anthropic", "key", base_url=openrouter_stub.base_url, transport=transport
+    )
+
+    for _ in range(3):
+        openrouter.complete("hello", "stub/model")
+        anthropic.complete("hello", "claude-3-haiku-20240307")
+
+    assert len(openrouter_stub.requests) == 6
+    assert len(openrouter_stub.client_ports) == 1
@@ -0,0 +1,140 @@
+"""
+Tests for the client-side rate limiter.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient, RateLimitError
+from ai_codegen_pro.core.rate_limiter import (
+    RateLimit,
+    RateLimiter,
+    TokenBucket,
+    estimate_request_tokens,
+    parse_retry_after,
+)
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(capacity=10, refill_per_second=5, now=0.0)
+    bucket.consume(10, now=0.0)
+    assert bucket.wait_time(5, now=0.0) == pytest.approx(1.0)
+    assert bucket.wait_time(5, now=1.0) == 0.0
+    assert bucket.wait_time(100, now=10.0) == 0.0  # capped at capacity
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_estimate_request_tokens_counts_all_messages():
+    payload = {"messages": [{"content": "x" * 40}, {"content": [{"text": "y" * 80}]}]}
+    assert estimate_request_tokens(payload) == 30
+
+
+def test_tokens_per_minute_delays_callers():
+    limiter = RateLimiter(default_limit=RateLimit(tokens_per_minute=600))
+    assert limiter.acquire("key", "m", tokens=600) < 0.01
+    waited = limiter.acquire("key", "m", tokens=2)
+    assert waited == pytest.approx(0.2, abs=0.1)
+
+
+def test_limits_are_separate_per_model_and_key():
+    limiter = RateLimiter(default_limit=RateLimit(requests_per_minute=1))
+    limiter.acquire("key", "a")
+    assert limiter.acquire("key", "b") < 0.01
+    assert limiter.acquire("other-key", "a") < 0.01
+
+
+def test_key_limit_applies_across_models():
+    limiter = RateLimiter(key_limit=RateLimit(tokens_per_minute=600))
+    limiter.acquire("key", "a", tokens=600)
+    assert limiter.acquire("key", "b", tokens=2) == pytest.approx(0.2, abs=0.1)
+
+
+def test_waiters_are_served_in_arrival_order():
+    limiter = RateLimiter(default_limit=RateLimit(tokens_per_minute=1200))
+    limiter.acquire("key", "m", tokens=1200)
+    order = []
+
+    def worker(index, tokens):
+        limiter.acquire("key", "m", tokens=tokens)
+        order.append(index)
+
+    threads = []
+    for index, tokens in enumerate([10, 1, 1]):
+        thread = threading.Thread(target=worker, args=(index, tokens))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2]
+
+
+def test_retry_after_header_pauses_scope():
+    limiter = RateLimiter()
+    limiter.update_from_headers("key", "m", {"Retry-After": "0.2"})
+    assert limiter.acquire("key", "m") == pytest.approx(0.2, abs=0.1)
+    assert limiter.acquire("key", "other") < 0.01
+
+
+def test_exhausted_window_headers_pause_key():
+    limiter = RateLimiter()
+    limiter.update_from_headers(
+        "key",
+        "m",
+        {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "200ms"},
+    )
+    assert limiter.acquire("key", "other") == pytest.approx(0.2, abs=0.1)
+
+
+def test_cancel_ends_a_throttled_wait():
+    limiter = RateLimiter()
+    limiter.penalize("key", "m", 60)
+    token = CancellationToken()
+    errors = []
+
+    def wait():
+        try:
+            limiter.acquire("key", "m", cancel_token=token)
+        except CancelledError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.05)
+    token.cancel()
+    thread.join(1.0)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert not limiter._scope("key", "m").queue
+
+
+def test_client_retries_throttled_requests(openrouter_stub):
+    openrouter_stub.throttle_count = 2
+    limiter = RateLimiter()
+    client = OpenRouterClient("key", base_url=openrouter_stub.base_url, rate_limiter=limiter)
+
+    start = time.monotonic()
+    assert client.generate_code("hi", model="stub/model") == "echo: hi"
+    assert time.monotonic() - start >= 0.2
+    assert len(openrouter_stub.requests) == 3
+
+
+def test_client_gives_up_after_max_retries(openrouter_stub):
+    openrouter_stub.throttle_count = 5
+    openrouter_stub.retry_after = "0"
+    client = OpenRouterClient("key", base_url=openrouter_stub.base_url, max_rate_limit_retries=1)
+
+    with pytest.raises(RateLimitError):
+        client.generate_code("hi")
+    assert len(openrouter_stub.requests) == 2
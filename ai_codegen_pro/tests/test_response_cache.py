@@ -0,0 +1,87 @@
+"""
+Tests for the persistent response cache.
+"""
+
+import time
+
+import pytest
+
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient, build_chat_payload
+from ai_codegen_pro.core.response_cache import ResponseCache, request_key
+
+
+def _response(text):
+    return {"choices": [{"message": {"content": text}}]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_request_key_depends_on_output_relevant_fields():
+    payload = build_chat_payload("prompt", "m", 100, 0.1)
+    assert request_key(payload) == request_key(dict(payload, stream=True))
+    assert request_key(payload) != request_key(build_chat_payload("prompt", "m", 100, 0.2))
+    assert request_key(payload) != request_key(build_chat_payload("other", "m", 100, 0.1))
+
+
+def test_get_put_and_stats(cache):
+    assert cache.get("k") is None
+    cache.put("k", _response("code"), model="m")
+    assert cache.get("k") == _response("code")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.stores, stats.entries) == (1, 1, 1, 1)
+    assert stats.bytes > 0
+    assert stats.hit_bytes == stats.bytes
+    assert stats.hit_rate == 0.5
+
+
+def test_persists_across_instances(tmp_path):
+    first = ResponseCache(tmp_path / "c.sqlite3")
+    first.put("k", _response("persisted"))
+    first.close()
+
+    second = ResponseCache(tmp_path / "c.sqlite3")
+    assert second.get("k") == _response("persisted")
+    second.close()
+
+
+def test_age_based_eviction(tmp_path):
+    cache = ResponseCache(tmp_path / "c.sqlite3", max_age=0.05)
+    cache.put("k", _response("old"))
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.evict() == 1
+    assert cache.stats().entries == 0
+    cache.close()
+
+
+def test_size_based_eviction_drops_least_recently_used(tmp_path):
+    entry_size = len('{"choices": [{"message": {"content": "xxxx"}}]}')
+    cache = ResponseCache(tmp_path / "c.sqlite3", max_bytes=entry_size * 2)
+    cache.put("a", _response("aaaa"))
+    cache.put("b", _response("bbbb"))
+    cache.get("a")
+    cache.put("c", _response("cccc"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats().evictions == 1
+    cache.close()
+
+
+def test_client_serves_repeated_requests_from_cache(openrouter_stub, cache):
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url, cache=cache)
+
+    assert client.generate_code("same", model="stub/model") == "echo: same"
+    assert client.generate_code("same", model="stub/model") == "echo: same"
+    assert len(openrouter_stub.requests) == 1
+
+    client.generate_code("same", model="stub/model", use_cache=False)
+    assert len(openrouter_stub.requests) == 2
+    assert cache.stats().hits == 1
@@ -0,0 +1,150 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+import threading
+import time
+
+from ai_codegen_pro.core.async_openrouter_client import AsyncOpenRouterClient
+from ai_codegen_pro.core.cancellation import CancellationToken, CancelledError
+from ai_codegen_pro.core.openrouter_client import OpenRouterClient
+from ai_codegen_pro.core.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def _run_concurrently(count, target):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    def fn():
+        executions.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    results = _run_concurrently(5, lambda: flight.do("key", fn))
+
+    assert results == ["result"] * 5
+    assert len(executions) == 1
+    stats = flight.stats()
+    assert (stats.calls, stats.executions, stats.collapsed, stats.in_flight) == (5, 1, 4, 0)
+
+
+def test_error_is_delivered_to_all_waiters():
+    flight = SingleFlight()
+
+    def fn():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results = _run_concurrently(3, lambda: flight.do("key", fn))
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats().executions == 1
+
+
+def test_sequential_calls_execute_again():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats().collapsed == 0
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    executions = []
+
+    async def fn():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return "shared"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(4)))
+
+    assert asyncio.run(scenario()) == ["shared"] * 4
+    assert len(executions) == 1
+    assert flight.stats().collapsed == 3
+
+
+def test_client_collapses_identical_prompts(openrouter_stub):
+    openrouter_stub.delay = 0.1
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+
+    results = _run_concurrently(4, lambda: client.generate_code("same", model="stub/model"))
+
+    assert results == ["echo: same"] * 4
+    assert len(openrouter_stub.requests) == 1
+    assert client.single_flight.stats().collapsed == 3
+
+
+def test_async_client_collapses_identical_prompts(openrouter_stub):
+    openrouter_stub.delay = 0.05
+
+    async def scenario():
+        async with AsyncOpenRouterClient("test-key", base_url=openrouter_stub.base_url) as client:
+            results = await asyncio.gather(*(client.generate_code("same") for _ in range(3)))
+            return results, client.single_flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["echo: same"] * 3
+    assert stats.collapsed == 2
+    assert len(openrouter_stub.requests) == 1
+
+
+def test_different_prompts_are_not_collapsed(openrouter_stub):
+    openrouter_stub.delay = 0.05
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+    prompts = iter(["a", "b"])
+    lock = threading.Lock()
+
+    def next_prompt():
+        with lock:
+            return next(prompts)
+
+    _run_concurrently(2, lambda: client.generate_code(next_prompt()))
+    assert len(openrouter_stub.requests) == 2
+
+
+def test_cancelled_leader_does_not_fail_other_callers(openrouter_stub):
+    openrouter_stub.delay = 0.3
+    client = OpenRouterClient("test-key", base_url=openrouter_stub.base_url)
+    token = CancellationToken()
+    results = {}
+
+    def call(name, **kwargs):
+        try:
+            results[name] = client.generate_code("same", model="stub/model", **kwargs)
+        except Exception as exc:
+            results[name] = exc
+
+    leader = threading.Thread(target=call, args=("leader",), kwargs={"cancel_token": token})
+    follower = threading.Thread(target=call, args=("follower",))
+    leader.start()
+    time.sleep(0.05)
+    follower.start()
+    time.sleep(0.05)
+    token.cancel()
+    leader.join()
+    follower.join()
+
+    assert isinstance(results["leader"], CancelledError)
+    assert results["follower"] == "echo: same"
+    assert client.single_flight.stats().collapsed == 1
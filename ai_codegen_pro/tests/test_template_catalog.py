@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+
+from ai_codegen_pro.core.template_catalog import TemplateCatalog
+from ai_codegen_pro.core.template_service import TemplateService
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    directory = tmp_path / "templates"
+    (directory / "python").mkdir(parents=True)
+    (directory / "module.j2").write_text("{{ name }}", encoding="utf-8")
+    (directory / "python" / "class.j2").write_text("class {{ name }}", encoding="utf-8")
+    (directory / "__init__.py").write_text("", encoding="utf-8")
+    (directory / ".hidden.j2").write_text("", encoding="utf-8")
+    return directory
+
+
+def test_indexes_nested_templates(template_dir):
+    catalog = TemplateCatalog([template_dir], check_interval=0)
+
+    assert catalog.names() == ["module.j2", "python/class.j2"]
+    entry = catalog.get("python/class.j2")
+    assert entry.path == template_dir / "python" / "class.j2"
+    assert entry.size == len("class {{ name }}")
+    assert "missing.j2" not in catalog
+
+
+def test_only_changed_directories_are_rescanned(template_dir):
+    catalog = TemplateCatalog([template_dir], check_interval=0)
+    catalog.names()
+    scans = catalog.scans
+
+    (template_dir / "python" / "func.j2").write_text("def f(): pass", encoding="utf-8")
+
+    assert "python/func.j2" in catalog
+    assert catalog.scans == scans + 1
+    (template_dir / "module.j2").unlink()
+    assert "module.j2" not in catalog
+
+
+def test_checks_are_throttled(template_dir):
+    catalog = TemplateCatalog([template_dir], check_interval=60)
+    catalog.names()
+    (template_dir / "new.j2").write_text("", encoding="utf-8")
+
+    assert "new.j2" not in catalog
+    catalog.invalidate()
+    assert "new.j2" in catalog
+
+
+def test_earlier_search_paths_win(template_dir, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "module.j2").write_text("other", encoding="utf-8")
+
+    catalog = TemplateCatalog([other, template_dir])
+
+    assert catalog.get("module.j2").path == other / "module.j2"
+
+
+def test_service_checks_existence_without_compiling(template_dir, tmp_path):
+    service = TemplateService(template_dir, tmp_path / "cache")
+    service.register_template("plugin_model", "x")
+
+    with patch.object(service.env, "get_template") as get_template:
+        assert service.template_exists("python/class.j2")
+        assert service.template_exists("plugin_model")
+        assert not service.template_exists("__init__.py")
+        assert service.list_all_templates() == ["module.j2", "plugin_model", "python/class.j2"]
+    get_template.assert_not_called()
@@ -0,0 +1,184 @@
+import io
+import os
+import socket
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from jinja2 import TemplateNotFound
+
+from ai_codegen_pro.core import template_service as template_module
+from ai_codegen_pro.core.template_service import TemplateService
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    (directory / "greet.j2").write_text("Hello {{ name | pascal_case }}", encoding="utf-8")
+    return directory
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+def _new_process():
+    """Forget the shared environments, as a fresh process would."""
+    template_module._environments.clear()
+
+
+def test_services_share_one_environment(template_dir, cache_dir):
+    first = TemplateService(template_dir, cache_dir)
+    second = TemplateService(str(template_dir), cache_dir)
+
+    assert first.env is second.env
+    assert first.render_template("greet.j2", {"name": "big_world"}) == "Hello BigWorld"
+    second.render_template("greet.j2", {"name": "x"})
+    assert second.cache_stats() == {"compiled": 1, "hits": 0}
+
+
+def test_bytecode_survives_a_new_process(template_dir, cache_dir):
+    TemplateService(template_dir, cache_dir).render_template("greet.j2", {"name": "a"})
+    _new_process()
+
+    service = TemplateService(template_dir, cache_dir)
+
+    assert service.render_template("greet.j2", {"name": "a"}) == "Hello A"
+    assert service.cache_stats() == {"compiled": 0, "hits": 1}
+
+
+def test_changed_template_is_recompiled(template_dir, cache_dir):
+    TemplateService(template_dir, cache_dir).render_template("greet.j2", {"name": "a"})
+    _new_process()
+    path = template_dir / "greet.j2"
+    path.write_text("Bye {{ name }}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    service = TemplateService(template_dir, cache_dir)
+
+    assert service.render_template("greet.j2", {"name": "a"}) == "Bye a"
+    assert service.cache_stats() == {"compiled": 1, "hits": 0}
+
+
+def test_unwritable_cache_dir_disables_bytecode_cache(template_dir, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+
+    service = TemplateService(template_dir, blocker / "cache")
+
+    assert service.env.bytecode_cache is None
+    assert service.render_template("greet.j2", {"name": "a"}) == "Hello A"
+
+
+def test_registered_templates_shadow_files(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    service.register_template("model", "class {{ name }}: pass")
+    service.register_template("greet.j2", "Hi {{ name }}")
+
+    other = TemplateService(template_dir, cache_dir)
+
+    assert other.render_template("model", {"name": "User"}) == "class User: pass"
+    assert other.render_template("greet.j2", {"name": "a"}) == "Hi a"
+    assert other.template_exists("model")
+
+
+def test_compiled_templates_are_reused_until_reregistered(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    service.register_template("t", "one")
+
+    assert service.env.get_template("t") is service.env.get_template("t")
+    assert service.cache_stats()["compiled"] == 1
+
+    service.register_template("t", "two")
+
+    assert service.render_template("t", {}) == "two"
+    assert service.cache_stats()["compiled"] == 2
+
+
+def test_render_many_compiles_once_and_keeps_order(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    contexts = [{"name": f"item_{i}"} for i in range(5)]
+
+    results = service.render_many("greet.j2", iter(contexts))
+
+    assert list(results) == [f"Hello Item{i}" for i in range(5)]
+    assert service.cache_stats()["compiled"] == 1
+
+
+def test_render_many_fans_out_to_processes(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    service.register_template("row", "{{ n }}:{{ name | snake_case }}")
+    contexts = [{"n": i, "name": "RowName"} for i in range(40)]
+
+    results = list(service.render_many("row", contexts, processes=2, threshold=10, chunksize=4))
+
+    assert results == [f"{i}:row_name" for i in range(40)]
+
+
+def test_render_many_stays_in_process_by_default(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    contexts = [{"name": "a"}] * 500
+
+    with patch.object(template_module, "ProcessPoolExecutor") as pool:
+        results = list(service.render_many("greet.j2", contexts))
+
+    assert results == ["Hello A"] * 500
+    pool.assert_not_called()
+
+
+def test_render_many_reports_missing_template(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+
+    with pytest.raises(TemplateNotFound):
+        next(service.render_many("missing.j2", [{}]))
+
+
+@pytest.fixture
+def big_template(template_dir, cache_dir):
+    service = TemplateService(template_dir, cache_dir)
+    service.register_template("rows", "{% for i in range(count) %}row {{ i }}\n{% endfor %}")
+    return service
+
+
+def _expected_rows(count):
+    return "".join(f"row {i}\n" for i in range(count))
+
+
+def test_stream_template_yields_bounded_chunks(big_template):
+    chunks = list(big_template.stream_template("rows", {"count": 5000}, chunk_size=1000))
+
+    assert "".join(chunks) == _expected_rows(5000)
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < 1100
+
+
+def test_render_to_file_and_path(big_template, tmp_path):
+    path = tmp_path / "rows.txt"
+    written = big_template.render_to("rows", {"count": 100}, path)
+    assert path.read_text(encoding="utf-8") == _expected_rows(100)
+    assert written == len(_expected_rows(100))
+
+    buffer = io.BytesIO()
+    big_template.render_to("rows", {"count": 3}, buffer)
+    assert buffer.getvalue() == _expected_rows(3).encode("utf-8")
+
+
+def test_render_to_zip_entry(big_template, tmp_path):
+    with zipfile.ZipFile(tmp_path / "out.zip", "w") as archive:
+        big_template.render_to_zip("rows", {"count": 2000}, archive, "pkg/rows.txt")
+
+    with zipfile.ZipFile(tmp_path / "out.zip") as archive:
+        assert archive.read("pkg/rows.txt").decode("utf-8") == _expected_rows(2000)
+
+
+def test_render_to_socket(big_template):
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        big_template.render_to("rows", {"count": 10}, sender)
+        sender.shutdown(socket.SHUT_WR)
+        received = b"".join(iter(lambda: receiver.recv(4096), b""))
+
+    assert received.decode("utf-8") == _expected_rows(10)
@@ -0,0 +1,158 @@
+"""
+Atomic, parallel writing of generated project files.
+"""
+
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _read_umask() -> int:
+    """The process umask, read once at import and without changing it where possible."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    # Elsewhere it can only be read by setting it; the stricter 022 meanwhile never
+    # lets another thread create a file more permissive than intended.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Permissions of a newly created file (mkstemp itself only grants 0600).
+_NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+@dataclass
+class WriteResult:
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class ProjectWriter:
+    """Writes a set of files below ``output_dir`` on a thread pool.
+
+    Each file is written to a temporary file in its target directory and renamed
+    over the target, so a crash leaves either the old or the new content, never a
+    partial file. Every directory is created once before the writes start, and a
+    file whose content on disk is already identical is not touched at all.
+
+    With ``fsync`` each file is flushed to disk before its rename and each
+    affected directory is synced once after all renames, instead of per file.
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        max_workers: int = 8,
+        fsync: bool = False,
+        skip_unchanged: bool = True,
+    ):
+        self.output_dir = Path(output_dir)
+        self.max_workers = max(1, max_workers)
+        self.fsync = fsync
+        self.skip_unchanged = skip_unchanged
+
+    def write(self, files: Union[Mapping[str, str], Iterable[Tuple[str, str]]]) -> WriteResult:
+        """Write ``{relative name: content}`` and report what happened to each file."""
+        items = list(files.items() if isinstance(files, Mapping) else files)
+        result = WriteResult()
+        if not items:
+            return result
+
+        directories = {(self.output_dir / name).parent for name, _ in items}
+        for directory in sorted(directories, key=lambda path: len(path.parts)):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer") as executor:
+            outcomes = executor.map(lambda item: self._write_one(*item), items)
+            for (name, content), outcome in zip(items, outcomes):
+                if outcome is None:
+                    result.written.append(name)
+                    logger.info(f"Saved {name} ({len(content)} chars)")
+                elif outcome == "":
+                    result.unchanged.append(name)
+                    logger.debug(f"Unchanged {name}")
+                else:
+                    result.failed[name] = outcome
+                    logger.error(f"Failed to save {name}: {outcome}")
+
+        if self.fsync and result.written:
+            for directory in {(self.output_dir / name).parent for name in result.written}:
+                _fsync_directory(directory)
+        return result
+
+    def _write_one(self, name: str, content: str) -> Optional[str]:
+        """Write one file; None if written, "" if unchanged, else the error message."""
+        path = self.output_dir / name
+        data = content.encode("utf-8")
+        try:
+            if self.skip_unchanged and _same_content(path, data):
+                return ""
+            fd, temp_name = tempfile.mkstemp(
+                dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+            )
+        except OSError as exc:
+            return str(exc)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            try:
+                os.chmod(temp_name, path.stat().st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(temp_name, _NEW_FILE_MODE)
+            os.replace(temp_name, path)
+        except OSError as exc:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            return str(exc)
+        return None
+
+
+def write_files(
+    output_dir: Union[str, Path],
+    files: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+    **options,
+) -> WriteResult:
+    """Write files with a one-off ``ProjectWriter``; ``options`` go to its constructor."""
+    return ProjectWriter(output_dir, **options).write(files)
+
+
+def _same_content(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist the renames in ``directory``; not supported on every platform."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError as exc:
+        logger.debug(f"Cannot sync directory {directory}: {exc}")
+    finally:
+        os.close(fd)
@@ -0,0 +1,18 @@
+"""
+Fixtures shared by every test suite in the repository.
+"""
+
+import pytest
+
+from ai_codegen_pro.core import template_service
+
+
+@pytest.fixture(scope="session")
+def _template_cache_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("template_cache")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_template_cache(monkeypatch, _template_cache_dir):
+    """Keep the bytecode of default TemplateServices out of the home directory."""
+    monkeypatch.setattr(template_service, "DEFAULT_CACHE_DIR", _template_cache_dir)